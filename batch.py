@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Fuel Management headless batch router.
+Reads itineraries from csv or jsonl, routes them in a process pool and
+streams results compatible with DataStore HEADERS. Usage:
+    python batch.py itineraries.csv -o results.csv -j 4
+@since:19/10/2026
+@author:Tirdad Kiafar
+'''
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from data.data_storage import HEADERS
+from data.router import set_stats
+from data.itinerary import Datasets, read_rows, parse_row, serialize, \
+    file_format, FORMAT_CSV, FORMAT_JSONL
+
+# datasets of the current process, shared by all of its jobs
+_datasets = None
+
+
+def _init_worker(settings_path, route_stats=False):
+    '''Loads datasets once per worker. Forked workers inherit the ones
+    already loaded by the parent. route_stats prints the stats of every
+    routing to stderr, see data.router.set_stats.'''
+    global _datasets
+    if route_stats:
+        set_stats(True, sys.stderr)
+    if _datasets is None:
+        _datasets = Datasets(settings_path)
+
+
+def _solve(job) -> tuple:
+    '''Parses and routes one itinerary row in the current process.
+
+    Args:
+        job (tuple): (line number, row), see read_rows.
+    Returns:
+        tuple: (line number, record or None, error message or None,
+            latency in sec)'''
+    start = time.perf_counter()
+    line, row = job
+    try:
+        record = _datasets.record(parse_row(row))
+        error = None
+    except (KeyError, ValueError) as err:
+        record, error = None, err.args[0] if err.args else str(err)
+    return line, record, error, time.perf_counter() - start
+
+
+def _percentile(values, pct) -> float:
+    '''Returns the nearest rank percentile of sorted values.'''
+    if not values:
+        return 0
+    idx = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[idx]
+
+
+def run(source, output, fmt=None, in_fmt=None, jobs=None, chunksize=4,
+        settings_path=r'./data/settings.ini', route_stats=False) -> dict:
+    '''Routes every itinerary in source and streams results to output.
+
+    Args:
+        source (str): itineraries file, csv or jsonl.
+        output (file): writable text file for results.
+        fmt (str): output format, "csv" or "jsonl".
+        in_fmt (str): input format, guessed by extension if None.
+        jobs (int): worker processes, 0 routes in this process.
+            None uses one per cpu.
+        chunksize (int): itineraries sent to a worker at once.
+        settings_path (str): settings file listing the data files.
+        route_stats (bool): print routing phase timings and counters.
+    Returns:
+        dict: throughput and latency stats.'''
+    fmt = fmt or FORMAT_CSV
+    start = time.perf_counter()
+    # load once in parent, forked workers reuse these
+    _init_worker(settings_path, route_stats)
+    load_time = time.perf_counter() - start
+    if fmt == FORMAT_CSV:
+        writer = csv.DictWriter(output, fieldnames=HEADERS,
+                                lineterminator='\n')
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(rec):
+            output.write(json.dumps(rec) + '\n')
+    # rows are parsed by _solve, a bad row fails alone
+    rows = read_rows(source, in_fmt)
+    pool = None
+    latencies = []
+    failed = 0
+    try:
+        if jobs == 0:
+            results = map(_solve, rows)
+        else:
+            pool = ProcessPoolExecutor(max_workers=jobs,
+                                       initializer=_init_worker,
+                                       initargs=(settings_path, route_stats))
+            results = pool.map(_solve, rows, chunksize=chunksize)
+        for line, record, error, latency in results:
+            latencies.append(latency)
+            if error is not None:
+                failed += 1
+                print('line {}: {}'.format(line, error), file=sys.stderr)
+                continue
+            write(serialize(record, fmt))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    count = len(latencies)
+    return {'itineraries': count,
+            'failed': failed,
+            'load_sec': load_time,
+            'wall_sec': elapsed,
+            'per_sec': count / elapsed if elapsed else 0,
+            'mean_ms': 1000 * sum(latencies) / count if count else 0,
+            'p50_ms': 1000 * _percentile(latencies, 50),
+            'p95_ms': 1000 * _percentile(latencies, 95),
+            'max_ms': 1000 * (latencies[-1] if latencies else 0)}
+
+
+def print_stats(stats, file=sys.stderr):
+    '''Prints run stats in a human readable form.'''
+    print('{itineraries} itineraries ({failed} failed) in {wall_sec:.2f}s, '
+          'datasets loaded in {load_sec:.3f}s'.format(**stats), file=file)
+    print('throughput: {per_sec:.1f}/s  latency: mean {mean_ms:.1f}ms, '
+          'p50 {p50_ms:.1f}ms, p95 {p95_ms:.1f}ms, '
+          'max {max_ms:.1f}ms'.format(**stats), file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('source', help='itineraries, csv or jsonl')
+    parser.add_argument('-o', '--output',
+                        help='results file, stdout if missing')
+    parser.add_argument('-f', '--format', choices=(FORMAT_CSV, FORMAT_JSONL),
+                        help='output format, guessed by output extension')
+    parser.add_argument('--input-format', choices=(FORMAT_CSV, FORMAT_JSONL),
+                        help='input format, guessed by source extension')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes, 0 to run inline')
+    parser.add_argument('--chunksize', type=int, default=4)
+    parser.add_argument('--settings', default=r'./data/settings.ini')
+    parser.add_argument('--route-stats', action='store_true',
+                        help='print timings and counters of every routing')
+    args = parser.parse_args(argv)
+    fmt = args.format or (file_format(args.output) if args.output
+                          else FORMAT_CSV)
+    if args.output:
+        output = open(args.output, 'w', encoding='utf-8')
+    else:
+        output = sys.stdout
+    try:
+        stats = run(args.source, output, fmt, args.input_format,
+                    args.jobs, args.chunksize, args.settings,
+                    args.route_stats)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print_stats(stats)
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of fuel management hot paths, runnable without a display.
+Usage:
+    python -m benchmarks -o results.json --baseline baseline.json
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
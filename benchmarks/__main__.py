@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Runs the benchmarks, see benchmarks.harness. Usage:
+    python -m benchmarks --quick
+    python -m benchmarks -o results.json --baseline baseline.json
+    python -m benchmarks route complex_route --save-baseline baseline.json
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import argparse
+import sys
+from benchmarks import harness
+# registers the benchmarks
+from benchmarks import hotpaths  # noqa: F401
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*',
+                        help='benchmarks to run, all if missing')
+    parser.add_argument('--list', action='store_true',
+                        help='list benchmarks and exit')
+    parser.add_argument('--quick', action='store_true',
+                        help='smallest sizes only')
+    parser.add_argument('--repeat', type=int, default=harness.REPEAT)
+    parser.add_argument('--min-time', type=float, default=harness.MIN_TIME,
+                        help='minimum seconds of a timed repeat')
+    parser.add_argument('-o', '--output', help='results json file')
+    parser.add_argument('--baseline', help='results json to compare with')
+    parser.add_argument('--save-baseline', metavar='FILE',
+                        help='also store results as a baseline')
+    parser.add_argument('--fail-above', type=float, metavar='PERCENT',
+                        help='exit with 1 if any benchmark is slower than '
+                        'the baseline by more than PERCENT')
+    args = parser.parse_args(argv)
+    if args.list:
+        for name, bench in harness.BENCHMARKS.items():
+            sizes = ', '.join(str(size) for size in bench.sizes
+                              if size is not None)
+            print('{:<16} {}{}'.format(name, bench.doc,
+                                       ' ({})'.format(sizes) if sizes
+                                       else ''))
+        return 0
+    baseline = harness.load(args.baseline) if args.baseline else None
+    results = harness.run(args.names or None, args.quick, args.repeat,
+                          args.min_time, log=sys.stderr)
+    for path in (args.output, args.save_baseline):
+        if path:
+            harness.save(results, path)
+    comparison = harness.compare(results, baseline) if baseline else None
+    harness.report(results, comparison)
+    if comparison and args.fail_above is not None:
+        slower = [key for key, base, now, change in comparison
+                  if change > args.fail_above]
+        if slower:
+            print('slower than baseline: ' + ', '.join(slower),
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
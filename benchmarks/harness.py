@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+harness module times registered benchmarks, stores results as JSON and
+compares them against a baseline.
+A benchmark is a function taking an input size and returning the
+callable to time, so setup is left out of the timings:
+
+    @benchmark('find_closest', sizes=(100, 1000))
+    def find_closest(size):
+        atlas = ...
+        return lambda: atlas.find_closest(53.4, -6.2)
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from data.fileIO import IO
+# registered benchmarks by name, in registration order
+BENCHMARKS = OrderedDict()
+# timing repeats and minimum duration of one repeat in seconds
+REPEAT = 5
+MIN_TIME = 0.05
+RESULTS_VERSION = 1
+
+
+###############################################################################
+class Benchmark:
+    '''A registered benchmark, see benchmark()'''
+    def __init__(self, name, factory, sizes=(None,), quick_sizes=None):
+        '''Constructor
+
+        Args:
+            name (str): benchmark name.
+            factory (callable): takes a size, returns the callable to time.
+            sizes (tuple): input sizes, None if the input is fixed.
+            quick_sizes (tuple): sizes of quick runs, the smallest size if
+                None.'''
+        self.name = name
+        self.factory = factory
+        self.sizes = tuple(sizes)
+        self.quick_sizes = tuple(quick_sizes) if quick_sizes \
+            else self.sizes[:1]
+        self.doc = (factory.__doc__ or '').strip().split('\n')[0]
+
+    def key(self, size) -> str:
+        '''Returns the result key of a size, e.g. "route[5]"'''
+        return self.name if size is None else '{}[{}]'.format(self.name, size)
+
+
+def benchmark(name, sizes=(None,), quick_sizes=None):
+    '''Decorator registering a benchmark factory, see module docs.'''
+    def register(factory):
+        BENCHMARKS[name] = Benchmark(name, factory, sizes, quick_sizes)
+        return factory
+    return register
+
+
+def measure(func, repeat=REPEAT, min_time=MIN_TIME) -> dict:
+    '''Times a callable. Calls are looped so a repeat lasts at least
+    min_time, garbage collection is off while timing.
+
+    Args:
+        func (callable): code to time, no arguments.
+        repeat (int): number of timed repeats.
+        min_time (float): minimum seconds of a repeat.
+    Returns:
+        dict: seconds per call: "min", "median", "mean", plus "number" of
+            calls per repeat.'''
+    # calibrate, the first call also warms caches up
+    number = 1
+    while True:
+        elapsed = _time(func, number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else \
+            max(2, min(10, int(min_time / elapsed) + 1))
+    times = [_time(func, number) / number for i in range(repeat)]
+    return {'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.mean(times),
+            'number': number}
+
+
+def _time(func, number) -> float:
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for i in range(number):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def run(names=None, quick=False, repeat=REPEAT, min_time=MIN_TIME,
+        log=None) -> dict:
+    '''Runs registered benchmarks.
+
+    Args:
+        names (iterable): benchmark names, all if None.
+        quick (bool): only quick sizes, see Benchmark.
+        repeat (int): timed repeats of each benchmark.
+        min_time (float): minimum seconds of a repeat.
+        log (file): progress is printed to it if given.
+    Returns:
+        dict: {"meta": run info, "results": {key: timings}}'''
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise KeyError('Unknown benchmarks: ' + ', '.join(unknown))
+    results = OrderedDict()
+    for name in names:
+        bench = BENCHMARKS[name]
+        for size in bench.quick_sizes if quick else bench.sizes:
+            func = bench.factory(size)
+            results[bench.key(size)] = measure(func, repeat, min_time)
+            if log is not None:
+                print('{:<28} {}'.format(bench.key(size), _format(
+                    results[bench.key(size)]['min'])), file=log)
+    return {'meta': {'version': RESULTS_VERSION,
+                     'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                     'python': platform.python_version(),
+                     'platform': platform.platform(),
+                     'machine': platform.machine(),
+                     'quick': quick,
+                     'repeat': repeat},
+            'results': results}
+
+
+def save(results, file_path):
+    '''Writes results to a JSON file.'''
+    with IO.atomic_write(file_path, encoding='utf-8') as data:
+        json.dump(results, data, indent=2)
+
+
+def load(file_path) -> dict:
+    '''Reads results written by save.'''
+    with open(file_path, 'r', encoding='utf-8') as data:
+        results = json.load(data)
+    if results.get('meta', {}).get('version') != RESULTS_VERSION:
+        raise ValueError('Unsupported results file: ' + file_path)
+    return results
+
+
+def compare(results, baseline, stat='min') -> list:
+    '''Compares results to a baseline.
+
+    Args:
+        results (dict): output of run.
+        baseline (dict): earlier output of run.
+        stat (str): compared timing, "min", "median" or "mean".
+    Returns:
+        list: (key, baseline sec, current sec, change in percent) of keys
+            in both, positive change is slower.'''
+    res = []
+    for key, timing in results['results'].items():
+        base = baseline['results'].get(key)
+        if base is None or not base[stat]:
+            continue
+        change = 100 * (timing[stat] - base[stat]) / base[stat]
+        res.append((key, base[stat], timing[stat], change))
+    return res
+
+
+def _format(sec) -> str:
+    '''Formats seconds in a readable unit.'''
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if sec >= scale:
+            return '{:8.2f} {}'.format(sec / scale, unit)
+    return '{:8.1f} ns'.format(sec / 1e-9)
+
+
+def report(results, comparison=None, file=sys.stdout):
+    '''Prints results, with the change from the baseline if given.
+
+    Args:
+        results (dict): output of run.
+        comparison (list): output of compare.'''
+    changes = {key: (base, change) for key, base, now, change in
+               comparison or ()}
+    header = '{:<28} {:>11} {:>11}'.format('benchmark', 'min', 'median')
+    if comparison is not None:
+        header += ' {:>11} {:>8}'.format('baseline', 'change')
+    print(header, file=file)
+    for key, timing in results['results'].items():
+        line = '{:<28} {:>11} {:>11}'.format(key, _format(timing['min']),
+                                             _format(timing['median']))
+        if key in changes:
+            base, change = changes[key]
+            line += ' {:>11} {:>+7.1f}%'.format(_format(base), change)
+        print(line, file=file)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+hotpaths module registers benchmarks of data loading, lookups, autocomplete
+search, routing and saving at several input sizes. Inputs are drawn from
+the bundled data files with a fixed seed, so runs are comparable.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import atexit
+import itertools
+import os
+import random
+import shutil
+import tempfile
+from data.airport import AirportAtlas
+from data.aircraft import Aircrafts
+from data.fuelprice import FuelMap
+from data.router import Route, ComplexRoute, ROUTE_DYNAMIC
+from data.data_storage import DataStore, router_data
+from data.search import PrefixIndex
+from data.fileIO import Snapshot
+from benchmarks.harness import benchmark
+AIRPORT_PATH = r'./data/airports.csv'
+AIRCRAFT_PATH = r'./data/aircrafts.csv'
+FUEL_PATH = r'./data/fuelprice.csv'
+# size of benchmarks over the whole airports file
+ALL = 'all'
+ATLAS_SIZES = (1000, 4000, ALL)
+ROUTE_SIZES = (4, 5, 6, 7)
+SEED = 2016
+
+_cache = {}
+
+
+def _tmp_dir() -> str:
+    '''Returns a temp directory removed on exit.'''
+    if 'tmp' not in _cache:
+        _cache['tmp'] = tempfile.mkdtemp(prefix='benchmarks')
+        atexit.register(shutil.rmtree, _cache['tmp'], True)
+    return _cache['tmp']
+
+
+def _atlas_file(size) -> str:
+    '''Returns a copy of the airports file cut to its first size rows.'''
+    path = os.path.join(_tmp_dir(), 'airports_{}.csv'.format(size))
+    if not os.path.exists(path):
+        with open(AIRPORT_PATH, 'r', encoding='utf-8',
+                  errors='ignore') as src:
+            # header plus size rows
+            rows = list(src if size == ALL else
+                        itertools.islice(src, size + 1))
+        with open(path, 'w', encoding='utf-8') as dst:
+            dst.writelines(rows)
+    return path
+
+
+def _atlas(size=ALL) -> AirportAtlas:
+    key = ('atlas', size)
+    if key not in _cache:
+        _cache[key] = AirportAtlas(_atlas_file(size))
+    return _cache[key]
+
+
+def _datasets() -> tuple:
+    '''Returns full atlas, aircrafts and fuel prices.'''
+    if 'datasets' not in _cache:
+        _cache['datasets'] = (_atlas(), Aircrafts(AIRCRAFT_PATH),
+                              FuelMap(FUEL_PATH))
+    return _cache['datasets']
+
+
+def _itinerary(size) -> list:
+    '''Returns size large airports with known fuel prices.'''
+    atlas, aircrafts, fuelmap = _datasets()
+    airports = sorted((airp for airp in atlas.values()
+                       if airp.type == 'large_airport' and
+                       airp.iso_country in fuelmap),
+                      key=lambda airp: airp.iata_code)
+    return random.Random(SEED).sample(airports, size)
+
+
+def _positions(count=64) -> list:
+    rand = random.Random(SEED)
+    return [(rand.uniform(-60, 70), rand.uniform(-180, 180))
+            for i in range(count)]
+
+
+# Loading ---------------------------------------------------------------------
+@benchmark('atlas_load', sizes=ATLAS_SIZES, quick_sizes=(1000,))
+def atlas_load(size):
+    '''AirportAtlas parsing a csv file without snapshot'''
+    path = _atlas_file(size)
+    snapshot = Snapshot(path, 'airports').path
+
+    def load():
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+        AirportAtlas(path)
+    return load
+
+
+@benchmark('atlas_snapshot', sizes=ATLAS_SIZES, quick_sizes=(1000,))
+def atlas_snapshot(size):
+    '''AirportAtlas loading its snapshot'''
+    path = _atlas_file(size)
+    AirportAtlas(path)
+    return lambda: AirportAtlas(path)
+
+
+# Lookups ---------------------------------------------------------------------
+@benchmark('find_closest', sizes=ATLAS_SIZES, quick_sizes=(1000,))
+def find_closest(size):
+    '''AirportAtlas.find_closest scanning every airport'''
+    atlas = _atlas(size)
+    positions = itertools.cycle(_positions())
+    return lambda: atlas.find_closest(*next(positions))
+
+
+@benchmark('nearest', sizes=ATLAS_SIZES, quick_sizes=(1000,))
+def nearest(size):
+    '''AirportAtlas.nearest with the spatial grid, hover budget 16ms
+
+    Runs on every map hover event, so a mean above the 16ms frame budget
+    of the GUI drops frames.'''
+    atlas = _atlas(size)
+    atlas.nearest(0, 0)
+    positions = itertools.cycle(_positions())
+    return lambda: atlas.nearest(*next(positions))
+
+
+@benchmark('get_by_name', sizes=ATLAS_SIZES, quick_sizes=(1000,))
+def get_by_name(size):
+    '''AirportAtlas.get_by_name of the last airport, worst case'''
+    atlas = _atlas(size)
+    name = atlas.names[-1]
+    return lambda: atlas.get_by_name(name)
+
+
+# Autocomplete ----------------------------------------------------------------
+@benchmark('entry_search', sizes=ATLAS_SIZES, quick_sizes=(1000,))
+def entry_search(size):
+    '''MyEntry hit search of a key stroke, without a window'''
+    # tkinter is needed, a display is not: the search reads lists only
+    from view.autoComplete import MyEntry
+    atlas = _atlas(size)
+    entry = MyEntry.__new__(MyEntry)
+    entry._record_list = atlas.names
+    entry._info_list = atlas.codes
+    entry._MyEntry__hits = []
+    entry._MyEntry__hitsInfo = []
+    entry._MyEntry__hitIdx = 0
+    prefixes = itertools.cycle(('d', 'du', 'dub', 'l', 'lo', 'lon'))
+    search = entry._MyEntry__updateHits
+    return lambda: search(next(prefixes))
+
+
+@benchmark('prefix_search', sizes=ATLAS_SIZES, quick_sizes=(1000,))
+def prefix_search(size):
+    '''PrefixIndex search of a key stroke'''
+    atlas = _atlas(size)
+    index = PrefixIndex(atlas.names, atlas.codes)
+    prefixes = itertools.cycle(('d', 'du', 'dub', 'l', 'lo', 'lon'))
+    return lambda: index.search(next(prefixes))
+
+
+# Routing ---------------------------------------------------------------------
+@benchmark('permutations', sizes=(6, 7, 8), quick_sizes=(6,))
+def permutations(size):
+    '''Route.permutations of size nodes'''
+    nodes = list(range(size))
+    return lambda: list(Route.permutations(nodes))
+
+
+@benchmark('route', sizes=ROUTE_SIZES, quick_sizes=(5,))
+def route(size):
+    '''Route of size airports, dynamic mode'''
+    points = [(airp.latitude, airp.longitude)
+              for airp in _itinerary(size)]
+    return lambda: Route(points, True, ROUTE_DYNAMIC)
+
+
+@benchmark('complex_route', sizes=ROUTE_SIZES, quick_sizes=(5,))
+def complex_route(size):
+    '''ComplexRoute of size airports with a long range aircraft'''
+    atlas, aircrafts, fuelmap = _datasets()
+    airports = _itinerary(size)
+    aircraft = aircrafts('777-300ER')
+    return lambda: ComplexRoute(airports, aircraft, fuelmap, ROUTE_DYNAMIC)
+
+
+# Saving ----------------------------------------------------------------------
+@benchmark('datastore_save', sizes=(10, 100, 1000), quick_sizes=(10,))
+def datastore_save(size):
+    '''DataStore adding size records to a new store and saving them'''
+    atlas, aircrafts, fuelmap = _datasets()
+    router = ComplexRoute(_itinerary(4), aircrafts('777-300ER'), fuelmap,
+                          ROUTE_DYNAMIC)
+    records = [router_data(router, '{} Week {}'.format(2000 + i // 52,
+                                                       i % 52 + 1))
+               for i in range(size)]
+    counter = itertools.count()
+
+    def save():
+        path = os.path.join(_tmp_dir(), 'data_{}_{}.csv'.format(
+            size, next(counter)))
+        # DataStore reads an existing file only
+        open(path, 'w').close()
+        store = DataStore(path)
+        for rec in records:
+            store.add(rec)
+        store.save()
+    return save
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Routing scaling benchmark. Routes seeded random itineraries of growing size
+with every aircraft and routing mode, then reports wall time, peak memory
+and route count, plus the quality of the result against an exact Held-Karp
+optimum. The exact cost allows the return trips of the dynamic mode, so
+both search the same routes. Every case runs in a fresh process so peak
+memory is its own. Modes claiming exactness must match the exact optima,
+the exit status is 1 otherwise.
+Usage:
+    python -m benchmarks.scaling -o scaling.csv
+    python -m benchmarks.scaling --sizes 3 4 5 6 7 8 --max-routes 300000
+    python -m benchmarks.scaling --aircraft A321 777-300ER --trials 3
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+try:
+    import resource
+except ImportError:  # Unix only, peak memory is 0 elsewhere
+    resource = None
+from data.airport import AirportAtlas
+from data.aircraft import Aircrafts
+from data.fuelprice import FuelMap
+from data.router import Route, ComplexRoute, ROUTE_STATIC, ROUTE_DYNAMIC
+from data.fileIO import IO
+from benchmarks.hotpaths import AIRPORT_PATH, AIRCRAFT_PATH, FUEL_PATH, SEED
+SIZES = tuple(range(3, 13))
+MODES = (ROUTE_STATIC, ROUTE_DYNAMIC)
+# modes enumerating every route, their optima must be exact
+EXACT_MODES = (ROUTE_DYNAMIC,)
+# cases generating more routes are skipped, routing is brute force
+MAX_ROUTES = 50000
+# largest itinerary given a Held-Karp reference, O(2^n n^2)
+MAX_EXACT = 12
+# seconds a case may run
+TIMEOUT = 600
+# relative difference allowed between exact optima
+TOLERANCE = 1e-9
+STATUS_OK = 'ok'
+STATUS_MISMATCH = 'mismatch'
+STATUS_SKIPPED = 'skipped'
+STATUS_TIMEOUT = 'timeout'
+COLUMNS = ('size', 'trial', 'aircraft', 'mode', 'airports', 'routes',
+           'time_s', 'peak_rss_mb', 'rss_delta_mb', 'distance',
+           'exact_distance', 'distance_ratio', 'cost', 'exact_cost',
+           'cost_ratio', 'status')
+# table layout, ratios are result / exact optimum
+_ROW = '{:>4} {:>5} {:<10} {:<8} {:>9} {:>10} {:>9} {:>9} {:>9} {}'
+_HEADER = _ROW.format('size', 'trial', 'aircraft', 'mode', 'routes', 'time_s',
+                      'rss_mb', 'dist_q', 'cost_q', 'status')
+
+
+def route_estimate(size, mode) -> int:
+    '''Returns the number of routes Route generates for size airports,
+    before return trips with adjacent equal nodes are removed.'''
+    if mode == ROUTE_STATIC:
+        return 1
+    rest = size - 1
+    return math.factorial(rest) + rest * math.factorial(rest + 1)
+
+
+def itineraries(atlas, fuelmap, sizes=SIZES, trials=1, seed=SEED) -> list:
+    '''Draws random itineraries of large airports with known fuel prices.
+
+    Args:
+        atlas (AirportAtlas): airports to draw from.
+        fuelmap (FuelMap): fuel prices by country.
+        sizes (iterable): numbers of airports, home included.
+        trials (int): itineraries of every size.
+        seed (int): same seed, same itineraries.
+    Returns:
+        list: (size, trial, tuple of iata codes)'''
+    airports = sorted(airp.iata_code for airp in atlas.values()
+                      if airp.type == 'large_airport' and airp.iata_code and
+                      airp.iso_country in fuelmap)
+    res = []
+    for size in sizes:
+        for trial in range(trials):
+            rand = random.Random(seed * 1000 + size * 100 + trial)
+            res.append((size, trial, tuple(rand.sample(airports, size))))
+    return res
+
+
+def held_karp(weights, revisit=False) -> tuple:
+    '''Exact cheapest closed tour starting at node 0 and visiting every
+    node once, by dynamic programming over visited subsets.
+
+    Args:
+        weights (list): n x n matrix, weights[i][j] is the cost of going
+            from i to j, inf if not allowed.
+        revisit (bool): also allow one node other than 0 to be visited
+            twice, not in a row. These are the return trips of the dynamic
+            routing mode, so the optimum is over the same routes.
+    Returns:
+        tuple: (cost, tour), e.g. (1520.3, (0, 2, 1, 0)). (inf, ()) if no
+            tour is allowed.'''
+    inf = math.inf
+    rest = len(weights) - 1
+    if rest < 1:
+        return 0.0, (0, 0)
+    full = (1 << rest) - 1
+    twice = 2 if revisit else 1
+    # cost[used][mask][j]: cheapest path from 0 through mask nodes ending at
+    # j + 1, used is 1 once a node was visited twice
+    cost = [[[inf] * rest for i in range(full + 1)] for used in range(twice)]
+    # parent[used][mask][j]: previous (used, mask, j), None at the start
+    parent = [[[None] * rest for i in range(full + 1)]
+              for used in range(twice)]
+    for j in range(rest):
+        cost[0][1 << j][j] = weights[0][j + 1]
+    for mask in range(1, full + 1):
+        # a revisit keeps the mask, so unused paths go first
+        for used in range(twice):
+            row = cost[used][mask]
+            for j in range(rest):
+                if row[j] == inf:
+                    continue
+                for nxt in range(rest):
+                    if not mask & 1 << nxt:
+                        state = used, mask | 1 << nxt
+                    elif used or not revisit or nxt == j:
+                        continue
+                    else:
+                        state = 1, mask
+                    new = row[j] + weights[j + 1][nxt + 1]
+                    if new < cost[state[0]][state[1]][nxt]:
+                        cost[state[0]][state[1]][nxt] = new
+                        parent[state[0]][state[1]][nxt] = used, mask, j
+    best, used, last = min((cost[used][full][j] + weights[j + 1][0], used, j)
+                           for used in range(twice) for j in range(rest))
+    if best == inf:
+        return inf, ()
+    # walk back from the last node, the tour comes out reversed
+    tour, state = [0], (used, full, last)
+    while state is not None:
+        tour.append(state[2] + 1)
+        state = parent[state[0]][state[1]][state[2]]
+    tour.append(0)
+    return best, tuple(reversed(tour))
+
+
+def distance_matrix(airports) -> list:
+    '''Returns distances between airports, as Route computes them.'''
+    points = [(airp.latitude, airp.longitude) for airp in airports]
+    return [[Route.calcDistance(pt1, pt2) for pt2 in points]
+            for pt1 in points]
+
+
+def cost_matrix(airports, aircraft, fuelmap, distances) -> list:
+    '''Returns fuel costs of legs between airports, as ComplexRoute sums
+    them up. Fuel is bought at the destination of a leg. The home fuel
+    bought at departure cancels out with the fuel left on return, apart
+    from the last leg which is paid twice, so legs back home cost double.
+    Legs out of the aircraft range are inf.'''
+    prices = [fuelmap(airp.iso_country).price for airp in airports]
+    res = []
+    for i, row in enumerate(distances):
+        res.append([])
+        for j, dist in enumerate(row):
+            if i == j or dist > aircraft.max_range:
+                res[-1].append(math.inf)
+            else:
+                res[-1].append(aircraft.consumption_rate * dist * prices[j] *
+                               (2 if j == 0 else 1))
+    return res
+
+
+def _peak_rss() -> float:
+    '''Returns peak resident memory of this process in MB, 0 if unknown.'''
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10)
+
+
+def run_case(codes, aircraft_code, mode) -> dict:
+    '''Routes an itinerary in this process. Called in a fresh process by
+    measure_case.
+
+    Returns:
+        dict: routes, time_s, peak_rss_mb, rss_delta_mb, distance, cost'''
+    atlas = AirportAtlas(AIRPORT_PATH)
+    aircraft = Aircrafts(AIRCRAFT_PATH)(aircraft_code)
+    fuelmap = FuelMap(FUEL_PATH)
+    airports = [atlas(code) for code in codes]
+    before = _peak_rss()
+    start = time.perf_counter()
+    router = ComplexRoute(airports, aircraft, fuelmap, mode)
+    elapsed = time.perf_counter() - start
+    peak = _peak_rss()
+    return {'routes': router.route_count,
+            'time_s': elapsed,
+            'peak_rss_mb': peak,
+            'rss_delta_mb': peak - before,
+            'distance': router.opt_route_distance,
+            'cost': router.eco_route_cost}
+
+
+def measure_case(codes, aircraft_code, mode, timeout=TIMEOUT) -> dict:
+    '''Runs run_case in a fresh python process.
+
+    Returns:
+        dict: output of run_case, with "status" on failures.'''
+    case = json.dumps({'airports': codes, 'aircraft': aircraft_code,
+                       'mode': mode})
+    try:
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.scaling',
+                               '--case', case],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'status': STATUS_TIMEOUT}
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines() or ['exit code {}'.format(
+            proc.returncode)]
+        return {'status': 'error: ' + lines[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _ratio(value, exact) -> str:
+    if value is None or value <= 0 or not exact or exact == math.inf:
+        return ''
+    return '{:.6f}'.format(value / exact)
+
+
+def _matches(value, exact) -> bool:
+    return abs(value - exact) <= TOLERANCE * max(abs(exact), 1)
+
+
+def run(sizes=SIZES, aircraft_codes=None, modes=MODES, trials=1, seed=SEED,
+        max_routes=MAX_ROUTES, max_exact=MAX_EXACT, timeout=TIMEOUT,
+        log=None) -> list:
+    '''Runs every itinerary, aircraft and mode.
+
+    Args:
+        sizes (iterable): itinerary sizes.
+        aircraft_codes (iterable): aircraft codes, all if None.
+        modes (iterable): routing modes.
+        trials (int): itineraries of every size.
+        seed (int): itinerary seed.
+        max_routes (int): cases generating more routes are skipped.
+        max_exact (int): largest itinerary given an exact reference.
+        timeout (float): seconds a case may run.
+        log (file): progress is printed to it if given.
+    Returns:
+        list: dict rows with COLUMNS keys.'''
+    atlas = AirportAtlas(AIRPORT_PATH)
+    aircrafts = Aircrafts(AIRCRAFT_PATH)
+    fuelmap = FuelMap(FUEL_PATH)
+    codes = aircrafts.codes if aircraft_codes is None else aircraft_codes
+    rows = []
+    for size, trial, airp_codes in itineraries(atlas, fuelmap, sizes, trials,
+                                               seed):
+        airports = [atlas(code) for code in airp_codes]
+        distances = distance_matrix(airports)
+        exact_dist = held_karp(distances)[0] if size <= max_exact else None
+        for code in codes:
+            aircraft = aircrafts(code)
+            exact_cost = held_karp(cost_matrix(
+                airports, aircraft, fuelmap, distances), revisit=True)[0] \
+                if size <= max_exact else None
+            for mode in modes:
+                row = dict.fromkeys(COLUMNS, '')
+                row.update(size=size, trial=trial, aircraft=aircraft.code,
+                           mode=mode, airports=' '.join(airp_codes))
+                if exact_dist is not None:
+                    row['exact_distance'] = exact_dist
+                    row['exact_cost'] = '' if exact_cost == math.inf \
+                        else exact_cost
+                estimate = route_estimate(size, mode)
+                if estimate > max_routes:
+                    row.update(routes=estimate, status=STATUS_SKIPPED)
+                else:
+                    row.update(measure_case(airp_codes, aircraft.code, mode,
+                                            timeout))
+                if not row['status']:
+                    row['status'] = STATUS_OK
+                    row['distance_ratio'] = _ratio(row['distance'],
+                                                   exact_dist)
+                    row['cost_ratio'] = _ratio(row['cost'], exact_cost)
+                    if mode in EXACT_MODES and exact_dist is not None and \
+                            not _checkExact(row['distance'], row['cost'],
+                                            exact_dist, exact_cost):
+                        row['status'] = STATUS_MISMATCH
+                rows.append(row)
+                if log is not None:
+                    print(_format_row(row), file=log)
+    return rows
+
+
+def _checkExact(distance, cost, exact_dist, exact_cost) -> bool:
+    '''Checks an exact mode against Held-Karp optima. The exact cost is
+    over the same routes, return trips included, so it has to match too.'''
+    if not _matches(distance, exact_dist):
+        return False
+    if exact_cost == math.inf:
+        # every route has a leg out of range
+        return cost <= 0
+    return _matches(cost, exact_cost)
+
+
+def _format_row(row) -> str:
+    def num(value, fmt):
+        return fmt.format(value) if isinstance(value, (int, float)) \
+            else str(value)
+    return _ROW.format(
+        row['size'], row['trial'], row['aircraft'], row['mode'],
+        num(row['routes'], '{:d}'), num(row['time_s'], '{:.4f}'),
+        num(row['peak_rss_mb'], '{:.1f}'), row['distance_ratio'][:9],
+        row['cost_ratio'][:9], row['status'])
+
+
+def report(rows, file=sys.stdout):
+    '''Prints rows as a table.'''
+    print(_HEADER, file=file)
+    for row in rows:
+        print(_format_row(row), file=file)
+
+
+def write_csv(rows, file_path):
+    '''Writes rows to a csv file.'''
+    with IO.atomic_write(file_path, newline='') as data:
+        writer = csv.DictWriter(data, COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.scaling',
+                                     description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='itinerary sizes, home included')
+    parser.add_argument('--aircraft', nargs='+',
+                        help='aircraft codes, all if missing')
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    parser.add_argument('--trials', type=int, default=1,
+                        help='itineraries of every size')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--max-routes', type=int, default=MAX_ROUTES,
+                        help='skip cases generating more routes')
+    parser.add_argument('--max-exact', type=int, default=MAX_EXACT,
+                        help='largest itinerary with an exact reference')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT,
+                        help='seconds a case may run')
+    parser.add_argument('-o', '--output', default='scaling.csv',
+                        help='csv file of results')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.case:
+        case = json.loads(args.case)
+        print(json.dumps(run_case(case['airports'], case['aircraft'],
+                                  case['mode'])))
+        return 0
+    print(_HEADER, file=sys.stderr)
+    rows = run(args.sizes, args.aircraft, args.modes, args.trials, args.seed,
+               args.max_routes, args.max_exact, args.timeout, log=sys.stderr)
+    write_csv(rows, args.output)
+    report(rows)
+    mismatches = [row for row in rows if row['status'] == STATUS_MISMATCH]
+    if mismatches:
+        print('{} cases differ from the exact optimum'.format(
+            len(mismatches)), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
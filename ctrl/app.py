@@ -4,52 +4,66 @@
 Main fuel management application window and controller
 @since:28/04/2016
 @author:Tirdad Kiafar
+Heavy GUI dependencies (matplotlib, Basemap, PIL) are imported lazily
+where they are first needed. See util.importtime to measure import costs.
 """
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font
-from tkinter import messagebox
-from PIL import Image
 import calendar
-from util import util
+import os
+from util import util, timing
 from ctrl.toolbar import Toolbar
 from ctrl.input_frame import InputFrame
 from ctrl.route_frame import RouteFrame
-from data.data_storage import DataStore
+from data.data_storage import open_store, router_data, data_version
 from data.settings import Settings
+from data.persistence import BackgroundWriter
 from data.aircraft import Aircrafts, Aircraft
 from data.airport import AirportAtlas, Airport
 from data.currency import Currencies, Currency
 from data.fuelprice import FuelMap, FuelObj
 from view.splashscreen import SplashScreen
 from view.ttkcalendar import Calendar
-from view.map import Map
 from view.autoComplete import MyEntry
 from view.winsettings import WinSettings
-import view.splash as splash
 
 
 ###############################################################################
 class App(tk.Tk):
     '''Main View/Controller object of the FuelManagement app.'''
-    def __init__(self):
-        '''Constructor. Initializing components of the screen.'''
-        tk.Tk.__init__(self)
+    def __init__(self, profile_dir=None):
+        '''Constructor. Initializing components of the screen.
+        Startup phases are recorded as util.timing spans.
+
+        Args:
+            profile_dir (str): if given, the first routing is profiled
+                into it, see util.timing.profile.'''
+        with timing.span('tk'):
+            tk.Tk.__init__(self)
+        self._profile_dir = profile_dir
         # Loading settings
-        self._s = Settings(file_path=r'./data/settings.ini')
+        with timing.span('settings'):
+            self._s = Settings(file_path=r'./data/settings.ini')
+        # disk writes run in background, off the event loop
+        self._writer = BackgroundWriter()
         # show splash screen while loading data and constructing GUI
         splash_path = self._s.getStr('splash', 'ASSETS')
-        splash_time = self._s.getFloat('splash_time', 'UI')
+        splash_time = self._s.splash_time
         with SplashScreen(self, splash_path, splash_time):
             # set app title & icon
             self.title(self._s.getStr('title', 'UI'))
             self.iconbitmap(self._s.getStr('icon', 'ASSETS'))
             # load data
-            self.__load_data()
+            with timing.span('load data'):
+                self.__load_data()
             # construct UI
-            self.__addWidgets()
+            with timing.span('widgets'):
+                self.__addWidgets()
             # event binding
             self.__addEvents()
+            # apply preference changes without restarting
+            self.__addListeners()
             # update settings file upon termination
             self.protocol('WM_DELETE_WINDOW', self.__close)
         # centering window, should be after splash to get updated sizes
@@ -57,24 +71,34 @@ class App(tk.Tk):
 
     def __load_data(self):
         # Load data
-        self._travel_data = DataStore(self._s.getStr('data', 'DATA'))
+        with timing.span('travel data'):
+            self._travel_data = open_store(self._s.getStr('data', 'DATA'))
         # Load aircrafts
-        self._aircrafts = Aircrafts(self._s.getStr('aircrafts', 'DATA'))
+        with timing.span('aircrafts'):
+            self._aircrafts = Aircrafts(self._s.getStr('aircrafts', 'DATA'))
         # Load airports
-        self._airports = AirportAtlas(self._s.getStr('airports', 'DATA'))
+        with timing.span('airports'):
+            self._airports = AirportAtlas(self._s.getStr('airports', 'DATA'))
         # Load Currencies
-        self._currencies = Currencies(self._s.getStr('currencies', 'DATA'))
+        with timing.span('currencies'):
+            self._currencies = Currencies(
+                self._s.getStr('currencies', 'DATA'))
         # Load fuel data
-        self._fuelmap = FuelMap(self._s.getStr('fuelprices', 'DATA'))
-        # Load marker images for map
-        self.__load_markers()
+        with timing.span('fuel prices'):
+            self._fuelmap = FuelMap(self._s.getStr('fuelprices', 'DATA'))
+        # stored routing results are reused only for unchanged data files
+        with timing.span('data version'):
+            self._data_version = data_version(
+                self._s.getStr('aircrafts', 'DATA'),
+                self._s.getStr('fuelprices', 'DATA'))
         # this variable holds the data tabs (type RouteFrame) in notebook
         # the keys are travel weak (year+weak)
         self._tabs = {}
 
     def __addWidgets(self):
         # add toolbar on top
-        self.__addtoolbar()
+        with timing.span('toolbar'):
+            self.__addtoolbar()
         # add a reference for preferences window, needed to check if its open
         self._win_settings = None
         # add a reference for about window, needed to check if its open
@@ -82,14 +106,20 @@ class App(tk.Tk):
         # add notebook (tabbed view)
         self.__addNotebook()
         # add airport tab to the notebook
-        self.__addAirportsTab()
+        with timing.span('airports tab'):
+            self.__addAirportsTab()
         # add aircraft combobox to the airports tab
         self.__addAircraft()
         # adding calendar
-        self.__addCalendar()
+        with timing.span('calendar'):
+            self.__addCalendar()
         # add map
-        if self._s.getBool('disable_map') is not True:
-            self.__addMap()
+        self._map = None
+        if not self._s.disable_map:
+            with timing.span('map'):
+                self.__addMap()
+        # aircraft range from home airport, shown on map
+        self.__addReach()
         # add system message
         self.__addSysMsg()
         # add event handlers
@@ -107,7 +137,9 @@ class App(tk.Tk):
         names = self._s.getList('tool_buttons', 'UI')
         # icons associated with toolbar buttons
         icons = self._s.getList('tool_icons', 'ASSETS')
-        icons = [tk.PhotoImage(file=icons[i]) for i in range(len(icons))]
+        with timing.span('icons'):
+            icons = [tk.PhotoImage(file=icons[i])
+                     for i in range(len(icons))]
         # Create toolbar
         self._toolbar = Toolbar(self, names, icons)
         # place toolbar
@@ -124,22 +156,27 @@ class App(tk.Tk):
 
     def __addAirportsTab(self):
         '''Adds input tab inside notebook.'''
+        tags, records, info, secColWid = self.__airport_lists()
+        self._frm_airports = InputFrame(self._notebook,
+                                        tag_list=tags,
+                                        record_list=records,
+                                        info_list=info,
+                                        secColWidth=secColWid)
+        self._notebook.add(self._frm_airports, text='Data Entry')
+
+    def __airport_lists(self) -> tuple:
+        '''Returns tags, records, info and info width of airport entries'''
         tags = self._s.getList('airport_entry_tags', 'UI')
         # if autocomplete option is set to work with names
         records = self._airports.names
         info = self._airports.codes
         secColWid = 50
-        if self._s.getBool('airport_by_name') is False:
+        if not self._s.airport_by_name:
             # reverse the tags shown in autocomplete entry
             tags.reverse()
             records, info = info, records
             secColWid = 250
-        self._frm_airports = InputFrame(self._notebook,
-                                        tag_list=tags,
-                                        record_list=records,
-                                        info_list=info,
-                                        secColWidth=secColWid)
-        self._notebook.add(self._frm_airports, text='Data Entry')
+        return tags, records, info, secColWid
 
     def __addAircraft(self):
         '''Adds aircraft entry to the aircraft tab.'''
@@ -166,61 +203,146 @@ class App(tk.Tk):
         self._calendar.pack()
 
     def __addMap(self):
-        self._map = Map(self, callback=self._on_map)
+        # matplotlib is only imported if map is enabled
+        with timing.span('map imports'):
+            from view.map import Map
+            from view.tiles import TileCache
+        # raster tiles are used once built with: python -m view.tiles
+        # up to the finest level built, tiles are never rendered here
+        with timing.span('Map.__init__'):
+            self._map = Map(self, callback=self._on_map,
+                            hover=self._on_map_hover,
+                            tiles=TileCache())
         self._map.grid(row=2, column=0, stick='nesw')
+        self._on_airport_layer()
+
+    def __addReach(self):
+        '''Watches home airport and aircraft entries to show the range
+        of the aircraft around home on map.'''
+        self._reach_job = None
+        self._reach_key = None
+        # tk variables are deleted with their python objects, keep them
+        self._reach_vars = []
+        for entry in (self._frm_airports._entries[0], self._ent_aircraft):
+            var = tk.StringVar(self, entry.get())
+            entry.config(textvariable=var)
+            var.trace_add('write', self.__schedule_reach)
+            self._reach_vars.append(var)
+
+    def __schedule_reach(self, *args):
+        '''Updates the range overlay once idle, a key stroke writes the
+        entry text more than once.'''
+        if self._reach_job is None:
+            self._reach_job = self.after_idle(self.__update_reach)
+
+    def __update_reach(self):
+        '''Shows the range boundary of the entered aircraft around the home
+        airport and highlights every airport within it.'''
+        self._reach_job = None
+        if self._map is None:
+            return
+        home = self.__entry_airport(self._frm_airports._entries[0].get())
+        text = self._ent_aircraft.get()
+        aircraft = self._aircrafts.get_by_str(text) if text.strip() \
+            else None
+        key = (home, aircraft)
+        if key == self._reach_key:
+            return
+        self._reach_key = key
+        if home is None or aircraft is None:
+            self._map.show_reach()
+        else:
+            lat, lon = home.latitude, home.longitude
+            reach = self._airports.within(lat, lon, aircraft.max_range)
+            self._map.show_reach(lat, lon, aircraft.max_range,
+                                 [(airp.latitude, airp.longitude)
+                                  for airp in reach])
+        self._map.refresh()
+
+    def __entry_airport(self, text) -> Airport:
+        '''Returns the airport of an entry text, None if unknown.'''
+        text = text.strip()
+        if self._s.airport_by_name:
+            return self._airports.get_by_name(text) if text else None
+        return self._airports.get(text.upper())
 
     def __addSysMsg(self):
         # creating a normal label to replace the labelFrame blue text widget
         lbl = ttk.Label(text=self._s.getStr('system_message', 'UI'))
         # adding a LabelFrame to wrap around calendar
         self._lbf_msg = ttk.LabelFrame(self, labelwidget=lbl)
-        # put system message frame on colmn 0 if there is no map, otherwise 1
-        col = 0 if self._s.getBool('disable_map') else 1
-        self._lbf_msg.grid(row=2, column=col, stick='nesw', ipadx=5, padx=5)
         # creating a bold font for message text
         fnt = font.Font(family='Calibri', weight='bold')
-        # build notice message up
+        self._notice = self.__notice()
+        self._lbl_msg = ttk.Label(self._lbf_msg,
+                                  justify=tk.LEFT,
+                                  font=fnt,
+                                  text=self._notice)
+        self._lbl_msg.pack()
+        self.__place_msg()
+
+    def __notice(self) -> str:
+        '''Builds up the notice message shown on start.'''
         msg = ''
         for i in range(1, 3):
             msg += self._s.getStr('notice'+str(i), 'UI') + '\n\n'
         # if map is enabled add its message
-        if self._s.getBool('disable_map') is False:
+        if not self._s.disable_map:
             msg += self._s.getStr('notice_map', 'UI')+'\n\n'
-            wrap = 230
-        else:
-            wrap = 530
         # if first airport is in Ireland add its message
-        if self._s.getBool('first_airport') is True:
+        if self._s.first_airport:
             msg += self._s.getStr('notice_airport', 'UI')
-        self._lbl_msg = ttk.Label(self._lbf_msg,
-                                  wraplength=wrap,
-                                  justify=tk.LEFT,
-                                  font=fnt,
-                                  text=msg)
-        self._lbl_msg.pack()
+        return msg
+
+    def __place_msg(self):
+        '''Places system message next to the map, or in its place.'''
+        # put system message frame on colmn 0 if there is no map, otherwise 1
+        col = 0 if self._s.disable_map else 1
+        self._lbf_msg.grid(row=2, column=col, stick='nesw', ipadx=5, padx=5)
+        self._lbl_msg.config(wraplength=530 if self._s.disable_map else 230)
+
+    def __refresh_notice(self):
+        '''Rebuilds the notice message unless another message is shown.'''
+        if str(self._lbl_msg['text']) == self._notice:
+            self._notice = self.__notice()
+            self._lbl_msg['text'] = self._notice
 
     def __addEvents(self):
         # Toolbar on click events
+        route = self._on_route
+        if self._profile_dir:
+            route = timing.profile_first(route, os.path.join(
+                self._profile_dir, 'routing.prof'))
         handlers = [self._on_airports,
-                    self._on_route,
+                    route,
                     self._on_load,
                     self._on_save,
                     self._on_pref,
                     self._on_about]
         self._toolbar.bindings(handlers)
 
-    def __add_tab(self, week) -> RouteFrame:
+    def __addListeners(self):
+        '''Registers handlers of settings changes'''
+        self._s.add_listener('airport_by_name', self._on_airport_by_name)
+        self._s.add_listener('disable_map', self._on_disable_map)
+        self._s.add_listener('first_airport', self._on_first_airport)
+        self._s.add_listener('show_airports', self._on_airport_layer)
+        self._s.add_listener('airport_types', self._on_airport_layer)
+        self._s.add_listener('scheduled_only', self._on_airport_layer)
+
+    def __add_tab(self, week, result=None) -> RouteFrame:
         '''Adds a data tab to the notebook.
 
         Args:
             week (str): Travel week. e.g. "2016 Week 13"
+            result (dict): stored routing result, routes if None.
         Returns:
             RouteFrame: controller for routing.'''
         airports = []
         # extract airports
         for i in self._frm_airports._entries:
             # if airports are by name
-            if self._s.getBool('airport_by_name'):
+            if self._s.airport_by_name:
                 ap = self._airports.get_by_name(i.get())
             else:  # if airports are by iata code
                 ap = self._airports(i.get())
@@ -233,7 +355,8 @@ class App(tk.Tk):
                                  self._aircrafts.get_by_str(
                                      self._ent_aircraft.get()),
                                  self._fuelmap,
-                                 mode=self._frm_airports.var_path.get())
+                                 mode=self._frm_airports.var_path.get(),
+                                 result=result)
         # display tab
         self._notebook.add(route_frame, text=week)
         # set focus on new tab
@@ -242,28 +365,13 @@ class App(tk.Tk):
         self._tabs[week] = route_frame
         return route_frame
 
-    def __load_markers(self):
-        '''Load markers for map'''
-        self._markers = []
-        # get marker image paths
-        markers_paths = self._s.getList('markers', 'ASSETS')
-        for path in markers_paths:
-            self._markers.append(Image.open(path))
-
     def __draw_map(self, points):
-        '''Draws a path on map'''
-        # TODO: i couldnt find a way to clean the map so i make a new one
-        if self._map.clean_canvas() is False:
-            self._map.grid_remove()
-            self._map = None
-            self.__addMap()
-        # extract map colors
-        color = self._s.getList('map_colors', 'UI')
-        # iterate through points
-        for i in range(len(points)-1):
-            # add marker to map for current point
-            self._map.draw_marker(self._markers[i], points[i])
-            self._map.draw_geodesic(points[i], points[i+1], 2, color[i])
+        '''Draws a path on map, replacing the previous one'''
+        self._map.clear_routes()
+        # all legs and markers in one go, colored by leg
+        self._map.draw_routes([points], self._s.map_colors)
+        # one blit for the whole route
+        self._map.refresh()
 
     def __update_data(self, router, week):
         '''updates the data with router data. Does not check if data exists.
@@ -271,32 +379,25 @@ class App(tk.Tk):
         Args:
             router (ComplexRoute): router controller.
             week (str): travel week.'''
-        # extract airport codes to store
-        airports = []
-        for airp in router.airports:
-            airports.append(airp.iata_code)
-        # make data list and add update current data
-        data = [router._mode,
-                airports,
-                week,
-                router.aircraft,
-                router.opt_route,
-                router.opt_route_distance,
-                router.eco_route,
-                router.eco_route_cost]
-        self._travel_data.add(self._travel_data.map_data(data))
+        self._travel_data.add(router_data(router, week))
+        # keep full results so loading this week skips routing
+        if hasattr(router, 'result'):
+            self._travel_data.add_result(week, router.result(),
+                                         self._data_version)
 
     # Event handlers ----------------------------------------------------------
     def __close(self):
         '''Called upon app termination'''
-        # save settings
-        self._s.update()
+        # save settings, then wait for every pending write
+        self._writer.submit('settings', self._s.update, self._s.dumps())
+        self._writer.close()
         self.destroy()
 
     def _on_about(self):
         '''Show about window. If it is open does nothing.'''
         if self._win_about is not None:
             return
+        import view.splash as splash
         s = splash.showSplash(self, self._s.getList('about_images', 'ASSETS'))
         self._win_about = s.window
         # close window on click and escape key press
@@ -322,40 +423,80 @@ class App(tk.Tk):
             self._win_settings.focus()
             return
         # extract current settings to show on preferences window
-        defaults = {'airport_by_name': self._s.getStr('airport_by_name'),
-                    'auto_save': self._s.getStr('auto_save'),
-                    'first_airport': self._s.getStr('first_airport'),
-                    'disable_map': self._s.getStr('disable_map')}
+        defaults = {'airport_by_name': str(self._s.airport_by_name),
+                    'auto_save': str(self._s.auto_save),
+                    'first_airport': str(self._s.first_airport),
+                    'disable_map': str(self._s.disable_map),
+                    'show_airports': str(self._s.show_airports),
+                    'scheduled_only': str(self._s.scheduled_only)}
         self._win_settings = WinSettings(self, defaults)
         # bind event on window close to release reference
         self._win_settings.protocol('WM_DELETE_WINDOW', self.__close_win_pref)
 
     def __close_win_pref(self):
-        '''Preferences window is closing. Update settings.
-        Note that phisycal update is done just before app termination'''
-        # Show warning if map or airport display change
-        exp1 = self._win_settings._varDisableMap.get()
-        exp2 = self._s.getStr('disable_map')
-        exp3 = self._win_settings._varAirports.get()
-        exp4 = self._s.getStr('airport_by_name')
-        if exp1 != exp2 or exp3 != exp4:
-            messagebox.showinfo(
-                'Display Change',
-                'Some changes will not take effect untill app is restarted'
-            )
-        self._s.setSetting('airport_by_name',
-                           self._win_settings._varAirports.get())
-        self._s.setSetting('auto_save',
-                           self._win_settings._varAutoSave.get())
-        self._s.setSetting('first_airport',
-                           self._win_settings._varFirstAP.get())
-        self._s.setSetting('disable_map',
-                           self._win_settings._varDisableMap.get())
+        '''Preferences window is closing. Update settings, listeners apply
+        display changes right away. The settings file is written in
+        background.'''
+        self._s.airport_by_name = self._win_settings._varAirports.get()
+        self._s.auto_save = self._win_settings._varAutoSave.get()
+        self._s.first_airport = self._win_settings._varFirstAP.get()
+        self._s.disable_map = self._win_settings._varDisableMap.get()
+        self._s.show_airports = self._win_settings._varShowAirports.get()
+        self._s.scheduled_only = self._win_settings._varScheduled.get()
+        self._writer.submit('settings', self._s.update, self._s.dumps())
         self._win_settings.destroy()
         self._win_settings = None
 
-    def _on_route(self, on_load=False):
-        '''Show routing window. Only enabled if user is on input window.'''
+    def _on_airport_by_name(self, by_name):
+        '''Swaps airport autocompletion between names and codes. Airports
+        already entered are converted.'''
+        tags, records, info, secColWid = self.__airport_lists()
+
+        def convert(text):
+            text = text.strip()
+            if by_name:  # entries hold codes
+                airp = self._airports.get(text.upper())
+                return airp.name if airp else None
+            airp = self._airports.get_by_name(text)
+            return airp.iata_code if airp else None
+        self._frm_airports.set_autocomplete(tags, records, info, secColWid,
+                                            convert)
+
+    def _on_disable_map(self, disabled):
+        '''Shows or hides the map, creates it on first show.'''
+        if disabled:
+            if self._map is not None:
+                self._map.grid_remove()
+        elif self._map is None:
+            self.__addMap()
+            # draw the range overlay of current entries on the new map
+            self._reach_key = None
+            self.__schedule_reach()
+        else:
+            self._map.grid()
+        self.__place_msg()
+        self.__refresh_notice()
+
+    def _on_airport_layer(self, value=None):
+        '''Shows, hides or filters the layer of all airports on map.'''
+        if self._map is None:
+            return
+        self._map.show_airports(self._airports.values(),
+                                self._s.show_airports)
+        self._map.filter_airports(self._s.airport_types,
+                                  self._s.scheduled_only)
+
+    def _on_first_airport(self, forced):
+        '''Updates notice about the first airport.'''
+        self.__refresh_notice()
+
+    @timing.traced('App._on_route', 'ui')
+    def _on_route(self, on_load=False, result=None):
+        '''Show routing window. Only enabled if user is on input window.
+
+        Args:
+            on_load (bool): called by load, week may be taken.
+            result (dict): stored routing result of loaded week.'''
         # reset styles for getting white background
         for i in self._frm_airports._entries:
             i.config(style='TEntry')
@@ -377,7 +518,7 @@ class App(tk.Tk):
         # reset calendar selection
         self._calendar._selection = None
         # add data tab to notebook and get a reference to router controller
-        route_cont = self.__add_tab(week)
+        route_cont = self.__add_tab(week, result)
         # update notice text
         if on_load is True:  # data loaded
             txt = 'Data loaded for '
@@ -390,24 +531,27 @@ class App(tk.Tk):
                 ' far away..'
         self._lbl_msg['text'] = txt
         # save data if auto save is on
-        if self._s.getBool('auto_save'):
+        if self._s.auto_save:
             self.__update_data(route_cont._router, week=week)
-            self._travel_data.save()
+            self._writer.submit('data', self._travel_data.save)
         # draw map if routing is successful and map enabled
         exp1 = len(route_cont._router.eco_route) != 0
-        exp2 = self._s.getBool('disable_map') is False
+        exp2 = not self._s.disable_map
         if exp1 and exp2:
             pass
             self.__draw_map(route_cont._router.map_points(
                 route_cont._router.eco_route))
 
+    @timing.traced('App._on_save', 'ui')
     def _on_save(self):
         '''Save output data. Only enabled in routing window.'''
         # update current data
         for week, cont in self._tabs.items():
             self.__update_data(cont._router, week)
-            self._travel_data.save()
+        # one save appends every new record
+        self._writer.submit('data', self._travel_data.save)
 
+    @timing.traced('App._on_load', 'ui')
     def _on_load(self):
         '''Load data'''
         # check if user has selected travel time
@@ -426,7 +570,7 @@ class App(tk.Tk):
         data = self._travel_data[week]
         # add airports to fields
         for i in range(len(data['airports'])):
-            if self._s.getBool('airport_by_name') is False:
+            if not self._s.airport_by_name:
                 # insert codes directly
                 ent = self._frm_airports._entries[i]
                 ent.delete(0, tk.END)
@@ -445,9 +589,12 @@ class App(tk.Tk):
         self._ent_aircraft.config(foreground='#000')
         # set routing mode
         self._frm_airports.var_path.set(data['mode'])
-        # simulate on route button
-        self._on_route(on_load=True)
+        # simulate on route button, reuse stored results if up to date
+        self._on_route(on_load=True,
+                       result=self._travel_data.get_result(
+                           week, self._data_version))
 
+    @timing.traced('App._on_map', 'ui')
     def _on_map(self, lat, lon):
         '''When user clicks map this handler is called.
         On data input phase user can select airports by clicking map'''
@@ -459,14 +606,23 @@ class App(tk.Tk):
             # if entry text is empty or defauld (place holder)
             if exp1 or exp2 or exp3:
                 i.delete(0, tk.END)
-                if self._s.getBool('airport_by_name'):
-                    ap = self._airports.find_closest(lat, lon).name
+                # same airport as the hover tooltip
+                if self._s.airport_by_name:
+                    ap = self._airports.nearest(lat, lon).name
                 else:
-                    ap = self._airports.find_closest(lat, lon).iata_code
+                    ap = self._airports.nearest(lat, lon).iata_code
                 i.insert(0, ap)
                 i.config(foreground='#000')
                 break
 
+    def _on_map_hover(self, lat, lon, radius):
+        '''Returns tooltip of the airport under the mouse, if any.'''
+        airp = self._airports.nearest(lat, lon, radius)
+        if airp is None:
+            return None
+        text = '{} ({})'.format(airp.name, airp.iata_code)
+        return text, airp.latitude, airp.longitude
+
     # Validates user input ----------------------------------------------------
 
     def __validateTravelWeek(self, week) -> bool:
@@ -530,7 +686,7 @@ class App(tk.Tk):
         '''verify input data'''
         invalid = False
         for i in self._frm_airports._entries:
-            if self._s.getBool('airport_by_name') is True:
+            if self._s.airport_by_name:
                 if self._airports.get_by_name(i.get()) is None:
                     util.ttk_style(i, '#F7B3DA')
                     invalid = True
@@ -557,7 +713,7 @@ class App(tk.Tk):
     def __verifyUniqueness(self):
         '''check if all airports are unique'''
         unique = True
-        if self._s.getBool('airport_by_name'):
+        if self._s.airport_by_name:
             lst = [self._airports.get_by_name(i.get())
                    for i in self._frm_airports._entries]
         else:
@@ -577,9 +733,9 @@ class App(tk.Tk):
 
     def __validateFirstAirport(self):
         # If first airport is not set to be in Ireland return True
-        if self._s.getBool('first_airport') is False:
+        if not self._s.first_airport:
             return True
-        if self._s.getBool('airport_by_name'):
+        if self._s.airport_by_name:
             a = self._airports.get_by_name(
                 self._frm_airports._entries[0].get())
         else:
@@ -54,6 +54,32 @@ class InputFrame(ttk.Frame):
                                   padx=10,
                                   pady=pady)
 
+    def set_autocomplete(self, tag_list, record_list, info_list,
+                         secColWidth, convert=None):
+        '''Changes autocompletion of airport entries.
+
+        Args:
+            tag_list (tuple): a tuple of headers for records.
+            record_list (tuple): a tuple of records in first column.
+            info_list (tuple): a tuple of record info.
+            secColWidth (int): Width of the second column of Entries.
+            convert (callable): maps entered text to the new records,
+                returns None if text is not convertible.'''
+        self._tag_list = tag_list
+        self._record_list = record_list
+        self._info_list = info_list
+        self._secColWidth = secColWidth
+        for entry in self._entries:
+            text = entry.get()
+            text = convert(text) if convert and text else None
+            entry.initAutoComplete(tag_list, record_list, info_list,
+                                   entry.default_text,
+                                   secColWidth=secColWidth)
+            if text:
+                entry.delete(0, tk.END)
+                entry.insert(0, text)
+                entry.config(foreground='#000')
+
     def __addRadios(self):
         self._rad_dynamic = ttk.Radiobutton(self,
                                             variable=self.var_path,
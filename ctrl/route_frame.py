@@ -8,16 +8,17 @@ Part of the Fuel Management software.
 """
 import tkinter as tk
 from tkinter import ttk
-from util import util
-from data.router import ComplexRoute
+from util import util, timing
+from data.router import ComplexRoute, StoredRoute
 from data.currency import Currency, Currencies
 
 
 ###############################################################################
 class RouteFrame(ttk.Frame):
     '''App main data analysis controler that deals with routes.'''
+    @timing.traced('RouteFrame', 'ui')
     def __init__(self, master, airports, route_mode, currencies, aircraft,
-                 fuelmap, mode='dynamic'):
+                 fuelmap, mode='dynamic', result=None):
         '''Constructor. This builds up the input frame.
 
         Args:
@@ -25,7 +26,9 @@ class RouteFrame(ttk.Frame):
             airports (list): list of airports to be analysed.
             route_mode (str): static for single route, dynamic for analysis.
             aircraft (Aircraft): data holder for aircraft
-            mode (str): "static" or "dynamic"'''
+            mode (str): "static" or "dynamic"
+            result (dict): stored routing result, see ComplexRoute.result.
+                Routing is skipped if given.'''
         # setting up the container
         ttk.Frame.__init__(self, master)
         # set class attributes
@@ -39,13 +42,19 @@ class RouteFrame(ttk.Frame):
         # add treeview widget
         self.__addWidget()
         # setup router
-        self._router = ComplexRoute(airports, aircraft, fuelmap, self._mode)
-        # show first data row: possible routes
-        self.__show_routes()
-        # show second data row: shortest route
-        self.__show_shortest()
-        # show third data row: economic analysis
-        self.__show_eco()
+        if result is None:
+            self._router = ComplexRoute(airports, aircraft, fuelmap,
+                                        self._mode)
+        else:
+            self._router = StoredRoute(airports, aircraft, result)
+        with timing.span('RouteFrame populate', 'ui',
+                         routes=self._router.route_count):
+            # show first data row: possible routes
+            self.__show_routes()
+            # show second data row: shortest route
+            self.__show_shortest()
+            # show third data row: economic analysis
+            self.__show_eco()
 
     def __grid_weight(self):
         '''configure row and column grid wight of parrent'''
@@ -86,7 +95,7 @@ class RouteFrame(ttk.Frame):
     def __show_routes(self):
         '''Shows fist row of data: number of routes and possible routes'''
         txt = 'Number of all posible routes: {}'.format(
-            len(self._router.possible_routes))
+            self._router.route_count)
         self._trv_data.item('all', text=txt)
         # add routes as the children of first treeview node
         idx = 0
@@ -5,8 +5,9 @@ aircraft module extracts and represents aircraft data.
 @since:12/04/2016
 @author:Tirdad Kiafar
 """
-import csv
-from data.fileIO import IO
+from sys import intern
+from data.fileIO import IO, Snapshot
+from util import timing
 
 UNIT_IMPERIAL = 'imperial'
 UNIT_METRIC = 'metric'
@@ -17,14 +18,20 @@ GAL_TO_LIT = 3.78541
 ###############################################################################
 class Aircraft():
     '''Holds data of an airplane. note that all atributes are read only.'''
+    __slots__ = ('_code', '_eng_type', '_units', '_manufacturer',
+                 '_max_range', '_fuel_capacity', '_max_range_km',
+                 '_fuel_capacity_lit', '_consumption_rate')
+
     def __init__(self):
         '''Holds data of an aircraft.'''
         self._code = ''  # aircraft code
         self._eng_type = ''  # aircraft type
         self._units = ''  # unit types, associated with measures like range
         self._manufacturer = ''  # manufacturer company
-        self._max_range = 0  # flying range
-        self._fuel_capacity = 0  # maximum fuel capacity of aircraft, liters
+        self._max_range = 0  # flying range, in self._units
+        self._fuel_capacity = 0  # maximum fuel capacity, in self._units
+        self._max_range_km = 0  # flying range, km
+        self._fuel_capacity_lit = 0  # maximum fuel capacity, liters
         self._consumption_rate = 0  # fuel consumption, liter/km
 
     @property
@@ -52,34 +59,48 @@ class Aircraft():
         return self._manufacturer
 
     @property
-    def max_range(self, unit='metric'):
-        res = 0
-        if unit == UNIT_METRIC:
-            if self._units == UNIT_METRIC:
-                res = self._max_range
-            else:  # unit is imperial, convert
-                res = self._max_range * MIL_TO_KM
-        elif unit == UNIT_IMPERIAL:
-            if self._units == UNIT_IMPERIAL:
-                res = self._max_range
-            else:  # unit is metric, convert
-                res = int(self._max_range / MIL_TO_KM)
-        return res
+    def max_range(self):
+        '''Flying range in km, precomputed by set_measures.'''
+        return self._max_range_km
 
     @property
-    def fuel_capacity(self, unit='metric'):
-        res = 0
+    def fuel_capacity(self):
+        '''Fuel capacity in liters, precomputed by set_measures.'''
+        return self._fuel_capacity_lit
+
+    def set_measures(self, max_range, fuel_capacity):
+        '''Sets range and fuel capacity in aircraft units and precomputes
+        metric values and consumption rate. Units must be set first.
+
+        Args:
+            max_range (float): flying range, km or miles.
+            fuel_capacity (float): fuel capacity, liters or gallons.'''
+        self._max_range = max_range
+        self._fuel_capacity = fuel_capacity
+        if self._units == UNIT_IMPERIAL:  # convert to metric
+            self._max_range_km = max_range * MIL_TO_KM
+            self._fuel_capacity_lit = fuel_capacity * GAL_TO_LIT
+        else:
+            self._max_range_km = max_range
+            self._fuel_capacity_lit = fuel_capacity
+        self._consumption_rate = self._fuel_capacity_lit / self._max_range_km
+
+    def measures(self, unit=UNIT_METRIC) -> tuple:
+        '''Returns range and fuel capacity in the given unit system.
+
+        Args:
+            unit (str): "metric" or "imperial"
+        Returns:
+            tuple: (range, fuel capacity)'''
         if unit == UNIT_METRIC:
-            if self._units == UNIT_METRIC:
-                res = self._fuel_capacity
-            else:  # unit is imperial, convert
-                res = self._fuel_capacity * GAL_TO_LIT
+            return self._max_range_km, self._fuel_capacity_lit
         elif unit == UNIT_IMPERIAL:
             if self._units == UNIT_IMPERIAL:
-                res = self._fuel_capacity
-            else:  # unit is metric, convert
-                res = int(self._fuel_capacity / GAL_TO_LIT)
-        return res
+                return self._max_range, self._fuel_capacity
+            # unit is metric, convert
+            return (int(self._max_range / MIL_TO_KM),
+                    int(self._fuel_capacity / GAL_TO_LIT))
+        raise ValueError("unit has to be either 'imperial' or 'metric'")
 
     @property
     def consumption_rate(self):
@@ -96,6 +117,7 @@ class Aircrafts(dict):
     '''Holds aircrafts data. Could be used in two ways: aircraft['code'] or
     aircraft('code').'''
 
+    @timing.traced('Aircrafts load', 'io')
     def __init__(self, dataFile):
         '''Constructor
 
@@ -103,7 +125,14 @@ class Aircrafts(dict):
             dataFile (str): path to aircraft data csv file.'''
         self.__names = []
         self.__codes = []
-        self.__extract_aircrafts(dataFile)
+        snapshot = Snapshot(dataFile, 'aircrafts')
+        state = snapshot.load()
+        if state is None:
+            self.__extract_aircrafts(dataFile)
+            snapshot.save((dict(self), self.__names, self.__codes))
+        else:
+            aircrafts, self.__names, self.__codes = state
+            self.update(aircrafts)
 
     def __extract_aircrafts(self, dataFile):
         '''This function receives the file path of data and sets the objects.
@@ -116,13 +145,12 @@ class Aircrafts(dict):
         for row in reader:
             plane = Aircraft()
             plane._code = row['code']
-            plane._eng_type = row['type']
+            plane._eng_type = intern(row['type'])
             # this one has a one time setter to validate the code
-            plane.units = row['units']
-            plane._manufacturer = row['manufacturer']
-            plane._max_range = float(row['range'])
-            plane._fuel_capacity = float(row['capacity'])
-            plane._consumption_rate = plane.fuel_capacity/plane.max_range
+            plane.units = intern(row['units'])
+            plane._manufacturer = intern(row['manufacturer'])
+            # metric values and consumption rate are precomputed here
+            plane.set_measures(float(row['range']), float(row['capacity']))
             self[plane.code] = plane
             self.__names.append(str(plane))
             self.__codes.append(plane.code)
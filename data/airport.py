@@ -5,12 +5,18 @@ airport module extracts and represents airports data.
 @since:12/04/2016
 @author:Tirdad Kiafar
 """
-from data.fileIO import IO
+from sys import intern
+from data.fileIO import IO, Snapshot
+from util import timing
 
 
 ###############################################################################
 class Airport():
     '''Holds data of an airport.'''
+    __slots__ = ('_country', '_iata_code', '_icao_code', '_name', '_latitude',
+                 '_longitude', '_elevation', '_tz_code', '_tz_name',
+                 '_continent', '_iso_country', '_iso_region',
+                 '_municipality', '_type', '_scheduled_service')
 
     def __init__(self):
         '''Holds data of an airport.'''
@@ -100,11 +106,19 @@ class Airport():
         return self._scheduled_service
 
     def __eq__(self, other):
-        '''Override the default Equals behavior'''
+        '''Override the default Equals behavior. iata code is unique in the
+        atlas, icao code and name are compared for airports built by hand'''
+        if self is other:
+            return True
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self._iata_code == other._iata_code and \
+                self._icao_code == other._icao_code and \
+                self._name == other._name
         return False
 
+    def __hash__(self):
+        return hash(self._iata_code)
+
     def __ne__(self, other):
         """Define a non-equality test"""
         return not self.__eq__(other)
@@ -115,6 +129,7 @@ class AirportAtlas(dict):
     '''Holds airports data. uses 3 letter iata code as identifier.
     Could be used in two ways: airports['code'] or airports('code')'''
 
+    @timing.traced('AirportAtlas load', 'io')
     def __init__(self, dataFile):
         '''Constructor
 
@@ -122,7 +137,18 @@ class AirportAtlas(dict):
             dataFile (str): path to airports csv file.'''
         self.__names = []
         self.__codes = []
-        self.__extract_airports(dataFile)
+        # spatial grid for nearest, built on first use
+        self.__grid = None
+        self.__grid_airports = None
+        # parsing 9k rows is slow, try the compiled snapshot first
+        snapshot = Snapshot(dataFile, 'airports')
+        state = snapshot.load()
+        if state is None:
+            self.__extract_airports(dataFile)
+            snapshot.save((dict(self), self.__names, self.__codes))
+        else:
+            airports, self.__names, self.__codes = state
+            self.update(airports)
 
     def __extract_airports(self, dataFile):
         '''This function receives the file path of data and sets the objects.
@@ -134,7 +160,8 @@ class AirportAtlas(dict):
         reader = io.get_csv_dict()
         for row in reader:
             airp = Airport()
-            airp._country = row['country']
+            # repeated text is interned so airports share one copy
+            airp._country = intern(row['country'])
             airp._iata_code = row['iataCode']
             airp._icao_code = row['icaoCode']
             airp._name = row['name']
@@ -144,14 +171,14 @@ class AirportAtlas(dict):
                 airp._elevation = float(row['elevationFeet'])
             except ValueError:
                 airp._elevation = 0
-            airp._tz_code = row['timeZoneCode']
-            airp._tz_name = row['timeZoneName']
-            airp._continent = row['continent']
-            airp._iso_country = row['isoCountry']
-            airp._iso_region = row['isoRegion']
-            airp._municipality = row['municipality']
-            airp._type = row['type']
-            airp._scheduled_service = row['scheduledService']
+            airp._tz_code = intern(row['timeZoneCode'])
+            airp._tz_name = intern(row['timeZoneName'])
+            airp._continent = intern(row['continent'])
+            airp._iso_country = intern(row['isoCountry'])
+            airp._iso_region = intern(row['isoRegion'])
+            airp._municipality = intern(row['municipality'])
+            airp._type = intern(row['type'])
+            airp._scheduled_service = intern(row['scheduledService'])
             self[airp.iata_code] = airp
             self.__names.append(airp.name)
             self.__codes.append(airp.iata_code)
@@ -183,6 +210,43 @@ class AirportAtlas(dict):
                 res = airp
         return res
 
+    def nearest(self, lat, lon, max_dist=None) -> Airport:
+        '''Finds the airport nearest to a position on the map using a
+        spatial grid, fast enough for mouse hover.
+
+        Args:
+            lat (float): latitude of target.
+            lon (float): longitude of target
+            max_dist (float): search radius in degrees, None for no limit.
+        Returns:
+            Airport: airport object, None if none within max_dist.'''
+        self.__index()
+        idx = self.__grid.nearest(lat, lon, max_dist)
+        return None if idx is None else self.__grid_airports[idx]
+
+    def within(self, lat, lon, radius) -> list:
+        '''Finds every airport closer than radius to a position, with one
+        vectorized distance pass over all airports.
+
+        Args:
+            lat (float): latitude of target.
+            lon (float): longitude of target
+            radius (float): distance limit in km.
+        Returns:
+            list: Airport objects.'''
+        self.__index()
+        return [self.__grid_airports[idx]
+                for idx in self.__grid.within(lat, lon, radius)]
+
+    def __index(self):
+        '''Builds the spatial grid of airports on first use.'''
+        if self.__grid is None:
+            from data.geo import SpatialGrid
+            self.__grid_airports = list(self.values())
+            self.__grid = SpatialGrid(
+                [airp.latitude for airp in self.__grid_airports],
+                [airp.longitude for airp in self.__grid_airports])
+
     def get_by_name(self, name) -> Airport:
         '''Finds and returns an airport by name.
         
@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+columnar module keeps airports data in numpy columns instead of objects.
+Airport objects are only materialised when they are accessed.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+from collections.abc import Mapping
+import numpy as np
+from data.fileIO import IO, Snapshot
+from data.airport import Airport
+from data import geo
+# float columns: attribute name, csv header
+FLOAT_COLUMNS = (('latitude', 'latitudeDegree'),
+                 ('longitude', 'longitudeDegree'),
+                 ('elevation', 'elevationFeet'))
+# repeated text, stored dictionary encoded
+CATEGORICAL_COLUMNS = (('country', 'country'),
+                       ('tz_code', 'timeZoneCode'),
+                       ('tz_name', 'timeZoneName'),
+                       ('continent', 'continent'),
+                       ('iso_country', 'isoCountry'),
+                       ('iso_region', 'isoRegion'),
+                       ('type', 'type'),
+                       ('scheduled_service', 'scheduledService'))
+# mostly unique text, stored as plain lists
+TEXT_COLUMNS = (('iata_code', 'iataCode'),
+                ('icao_code', 'icaoCode'),
+                ('name', 'name'),
+                ('municipality', 'municipality'))
+
+
+###############################################################################
+class Categorical:
+    '''A dictionary encoded column. Holds every distinct value once and an
+    int array of indexes into them.'''
+    __slots__ = ('_levels', '_index', '_codes')
+
+    def __init__(self, values):
+        '''Constructor
+
+        Args:
+            values (iterable): str values of the column.'''
+        self._levels = []
+        self._index = {}
+        codes = []
+        for value in values:
+            code = self._index.get(value)
+            if code is None:
+                code = self._index[value] = len(self._levels)
+                self._levels.append(value)
+            codes.append(code)
+        # smallest unsigned type holding every code, never wraps
+        self._codes = np.array(codes,
+                               dtype=np.min_scalar_type(len(self._levels)))
+
+    @property
+    def levels(self) -> list:
+        '''Returns distinct values of the column'''
+        return self._levels
+
+    @property
+    def codes(self) -> np.ndarray:
+        '''Returns encoded values of the column'''
+        return self._codes
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __getitem__(self, row) -> str:
+        return self._levels[self._codes[row]]
+
+    def mask(self, value) -> np.ndarray:
+        '''Returns a boolean mask of rows equal to value.
+
+        Args:
+            value (str): value to look for.'''
+        code = self._index.get(value)
+        if code is None:
+            return np.zeros(len(self._codes), dtype=bool)
+        return self._codes == code
+
+
+###############################################################################
+class ColumnarAtlas(Mapping):
+    '''Holds airports data as columns. uses 3 letter iata code as identifier.
+    Has the same interface as AirportAtlas plus vectorized queries.
+    Could be used in two ways: airports['code'] or airports('code')'''
+
+    def __init__(self, dataFile=None):
+        '''Constructor
+
+        Args:
+            dataFile (str): path to airports csv file. If None the atlas is
+                empty, use from_airports to build it from objects.'''
+        self._columns = {}
+        self._rows = {}
+        self._name_rows = None
+        if dataFile is None:
+            return
+        snapshot = Snapshot(dataFile, 'columns')
+        state = snapshot.load()
+        if state is None:
+            self.__extract_airports(dataFile)
+            snapshot.save(self._columns)
+        else:
+            self._columns = state
+        self.__index()
+
+    @classmethod
+    def from_airports(cls, airports):
+        '''Builds a columnar atlas out of Airport objects.
+
+        Args:
+            airports (iterable): Airport objects, e.g. AirportAtlas.values()
+        Returns:
+            ColumnarAtlas: the new atlas.'''
+        atlas = cls()
+        airports = list(airports)
+        for attr, header in FLOAT_COLUMNS:
+            atlas._columns[attr] = np.array(
+                [getattr(ap, attr) for ap in airports], dtype=np.float64)
+        for attr, header in CATEGORICAL_COLUMNS:
+            atlas._columns[attr] = Categorical(
+                getattr(ap, attr) for ap in airports)
+        for attr, header in TEXT_COLUMNS:
+            atlas._columns[attr] = [getattr(ap, attr) for ap in airports]
+        atlas.__index()
+        return atlas
+
+    def __extract_airports(self, dataFile):
+        '''This function receives the file path of data and sets the columns.
+
+        Args:
+            dataFile (str): path to airports csv file.'''
+        reader = IO(dataFile).get_csv_dict()
+        for attr, header in FLOAT_COLUMNS:
+            values = []
+            for row in reader:
+                try:  # some records dont have value
+                    values.append(float(row[header]))
+                except ValueError:
+                    values.append(0)
+            self._columns[attr] = np.array(values, dtype=np.float64)
+        for attr, header in CATEGORICAL_COLUMNS:
+            self._columns[attr] = Categorical(row[header] for row in reader)
+        for attr, header in TEXT_COLUMNS:
+            self._columns[attr] = [row[header] for row in reader]
+
+    def __index(self):
+        '''Builds iata code to row index.'''
+        self._rows = {code: row for row, code in
+                      enumerate(self._columns.get('iata_code', []))}
+
+    def column(self, name):
+        '''Returns a column by airport attribute name.
+
+        Args:
+            name (str): attribute name, e.g. "latitude" or "type".
+        Returns:
+            numpy.ndarray, Categorical or list: the column.'''
+        return self._columns[name]
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self._columns['latitude']
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self._columns['longitude']
+
+    @property
+    def names(self) -> list:
+        '''Returns the list of airport names'''
+        return self._columns['name']
+
+    @property
+    def codes(self) -> list:
+        '''Returns the list of airport codes'''
+        return self._columns['iata_code']
+
+    def row(self, iataCode) -> int:
+        '''Returns the row index of an iata code, KeyError if unknown.'''
+        return self._rows[iataCode]
+
+    def airport(self, row) -> Airport:
+        '''Materialises the Airport object of a row.
+
+        Args:
+            row (int): row index.
+        Returns:
+            Airport: airport object'''
+        airp = Airport()
+        cols = self._columns
+        for attr, header in FLOAT_COLUMNS:
+            setattr(airp, '_' + attr, float(cols[attr][row]))
+        for attr, header in CATEGORICAL_COLUMNS + TEXT_COLUMNS:
+            setattr(airp, '_' + attr, cols[attr][row])
+        return airp
+
+    def airports(self, rows) -> list:
+        '''Materialises Airport objects of the given rows.
+
+        Args:
+            rows (iterable): row indexes or a boolean mask.
+        Returns:
+            list: Airport objects.'''
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        return [self.airport(int(row)) for row in rows]
+
+    def mask(self, **filters) -> np.ndarray:
+        '''Returns a boolean mask of rows matching all the given filters.
+        e.g. atlas.mask(type='large_airport', continent='EU')
+
+        Keyword Args:
+            <categorical column> (str or iterable): accepted value(s).'''
+        res = np.ones(len(self), dtype=bool)
+        for attr, value in filters.items():
+            col = self._columns[attr]
+            if not isinstance(col, Categorical):
+                raise KeyError('{} is not a categorical column.'.format(attr))
+            if isinstance(value, str):
+                res &= col.mask(value)
+            else:
+                accepted = np.zeros(len(self), dtype=bool)
+                for val in value:
+                    accepted |= col.mask(val)
+                res &= accepted
+        return res
+
+    def distances(self, lat, lon) -> np.ndarray:
+        '''Returns distances in km from a position to every airport.
+
+        Args:
+            lat (float): latitude of target.
+            lon (float): longitude of target'''
+        return geo.distances(lat, lon, self.latitudes, self.longitudes)
+
+    def within(self, lat, lon, radius, mask=None) -> np.ndarray:
+        '''Returns rows of airports closer than radius km to a position.
+
+        Args:
+            lat (float): latitude of target.
+            lon (float): longitude of target
+            radius (float): distance limit in km.
+            mask (numpy.ndarray): optional boolean filter, see mask().'''
+        hits = self.distances(lat, lon) <= radius
+        if mask is not None:
+            hits &= mask
+        return np.flatnonzero(hits)
+
+    def find_closest(self, lat, lon) -> Airport:
+        '''Finds the closest airport to a given position.
+        Uses the same metric as AirportAtlas.find_closest.
+
+        Args:
+            lat (float): latitude of target.
+            lon (float): longitude of target
+        Returns:
+            Airport: airport object'''
+        if len(self) == 0:
+            return None
+        dist = np.abs(self.latitudes - lat) + np.abs(self.longitudes - lon)
+        return self.airport(int(np.argmin(dist)))
+
+    def get_by_name(self, name) -> Airport:
+        '''Finds and returns an airport by name.
+
+        Args:
+            name (str): name of airport.
+        Returns:
+            Airport: Airport object.'''
+        if self._name_rows is None:
+            self._name_rows = {}
+            for row, nm in enumerate(self.names):
+                # first match wins like AirportAtlas.get_by_name
+                self._name_rows.setdefault(nm.lower(), row)
+        row = self._name_rows.get(name.lower())
+        if row is not None:
+            return self.airport(row)
+
+    def __getitem__(self, iataCode) -> Airport:
+        return self.airport(self._rows[iataCode])
+
+    def __contains__(self, iataCode):
+        return iataCode in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __call__(self, iataCode) -> Airport:
+        '''Returns the Airport object of the given code.
+
+        Args:
+            iataCode (str): 3 letter iata aiport code, e.g. DUB'''
+        iataCode = iataCode.upper()
+        if iataCode not in self._rows:  # verify iataCode
+            raise KeyError("IATA Code: '{}' unknown".format(iataCode))
+        return self[iataCode]
+
+
+###############################################################################
+def test():
+    atlas = ColumnarAtlas('airports.csv')
+    dub = atlas('DUB')
+    rows = atlas.within(dub.latitude, dub.longitude, 500,
+                        atlas.mask(type='large_airport'))
+    print('Large airports within 500km of DUB:')
+    for airp in atlas.airports(rows):
+        print(airp.iata_code, airp.name)
+
+
+if __name__ == '__main__':
+    test()
@@ -5,12 +5,16 @@ currency module extracts and represents currencies data.
 @since:12/04/2016
 @author:Tirdad Kiafar
 """
-import csv
+from sys import intern
+from data.fileIO import IO, Snapshot
+from util import timing
 
 
 ###############################################################################
 class Currency():
     '''Holds data of an currency.'''
+    __slots__ = ('_country', '_iso_country', '_code', '_name', '_euro_to',
+                 '_euro_from')
 
     def __init__(self):
         '''Holds data of an aircraft.'''
@@ -77,29 +81,38 @@ class Currencies(dict):
     '''Holds currencies data. uses 2 letter country iso code as identifier. 
     Could be used in two ways: currencies['code'] or currencies('code')'''
 
+    @timing.traced('Currencies load', 'io')
     def __init__(self, dataFile):
         '''Constructor
 
         Args:
             dataFile (str): path to currency csv file.'''
-        self.__extract_currencies(dataFile)
+        snapshot = Snapshot(dataFile, 'currencies')
+        state = snapshot.load()
+        if state is None:
+            self.__extract_currencies(dataFile)
+            snapshot.save(dict(self))
+        else:
+            self.update(state)
 
     def __extract_currencies(self, dataFile):
         '''This function receives the file path of data and sets the objects.
 
         Args:
             dataFile (str): path to aircraft data csv file.'''
-        with open(dataFile, 'r') as data:  # open file as data
-            reader = csv.DictReader(data)  # read and store the data by header
-            for row in reader:
-                curr = Currency()
-                curr.code = row['AlphabeticCode']
-                curr._country = row['Country']
-                curr._iso_country = row['isoCountry']
-                curr._name = row['Currency']
-                curr._euro_to = float(row['AgainstEuro'])
-                curr._euro_from = float(row['EuroAgains'])
-                self[curr.iso_country] = curr
+        # using IO class for consistency, it also ignores non utf-8 bytes
+        # which made loading fail outside of windows locales
+        io = IO(dataFile)
+        reader = io.get_csv_dict()
+        for row in reader:
+            curr = Currency()
+            curr.code = intern(row['AlphabeticCode'])
+            curr._country = row['Country']
+            curr._iso_country = row['isoCountry']
+            curr._name = intern(row['Currency'])
+            curr._euro_to = float(row['AgainstEuro'])
+            curr._euro_from = float(row['EuroAgains'])
+            self[curr.iso_country] = curr
 
     def __call__(self, isoCountry) -> Currency:
         '''Returns the Aircraft object of the given code.
@@ -2,10 +2,21 @@
 # -*- coding: utf-8 -*-
 '''
 This module handles data storage. Reads/Writes data to data file.
+New records are appended to a journal next to the data file which is
+compacted into the data file from time to time.
 '''
-from data.fileIO import IO
+from data.fileIO import IO, Snapshot
+from util import timing
+import os
 import csv
-import copy
+import json
+import threading
+# journal file extension and number of journal records that trigger
+# compaction into the data file
+JOURNAL_EXT = '.journal'
+COMPACT_EVERY = 100
+# full routing results are kept next to the data file with this extension
+RESULTS_EXT = '.results'
 # data headers, every new field must have these keys
 HEADERS = ('mode',
            'airports',
@@ -15,24 +26,369 @@ HEADERS = ('mode',
            'shortest_dist',
            'eco_route',
            'eco_route_cost')
+# data files with these extensions are stored in sqlite
+SQLITE_EXTS = ('.db', '.sqlite', '.sqlite3')
+
+
+###############################################################################
+def parse_week(week) -> tuple:
+    '''Parses a travel week key into numbers for sorting and ranges.
+
+    Args:
+        week (str): travel week. e.g. "2016 Week 13"
+    Returns:
+        tuple: (year, week), e.g. (2016, 13)'''
+    parts = week.split()
+    if len(parts) != 3 or parts[1].lower() != 'week':
+        raise ValueError("Travel week '{}' is not like "
+                         "'2016 Week 13'".format(week))
+    return int(parts[0]), int(parts[2])
+
+
+@timing.traced('open_store', 'io')
+def open_store(file_path, **kwargs):
+    '''Opens a travel data store. csv files are opened as DataStore, sqlite
+    files (.db, .sqlite) as SQLiteDataStore, which imports the csv file
+    with the same name next to it on first use.
+
+    Args:
+        file_path (str): path to data file.
+        kwargs: passed to the store constructor.'''
+    base, ext = os.path.splitext(file_path)
+    if ext.lower() in SQLITE_EXTS:
+        # imported here, sqlite store depends on this module
+        from data.sqlite_storage import SQLiteDataStore
+        csv_path = base + '.csv'
+        kwargs.setdefault('csv_path',
+                          csv_path if IO.exists(csv_path) else None)
+        return SQLiteDataStore(file_path, **kwargs)
+    return DataStore(file_path, **kwargs)
+
+
+def data_version(*file_paths) -> str:
+    '''Returns a version stamp of data files that routing results depend on,
+    e.g. aircrafts and fuel prices. Changes if any file content changes.
+
+    Args:
+        file_paths (str): paths to data files.'''
+    return '-'.join(Snapshot.digest(path)[:12] for path in file_paths)
+
+
+def validate_data(data):
+    '''Checks validity of a data dict, raises KeyError or Exception.
+
+    Args:
+        data (dict): data dict, must have HEADERS keys.'''
+    for key, value in data.items():
+        if key not in HEADERS:
+            raise KeyError('{} is not a valid header.'.format(key))
+    if len(data) != len(HEADERS):
+        raise Exception('Lenght of data does not match the headers')
+
+
+def router_data(router, week) -> dict:
+    '''Maps the results of a router to a data dict with proper keys.
+
+    Args:
+        router (ComplexRoute): solved router.
+        week (str): travel week. e.g. "2016 Week 13"
+    Returns:
+        dict: mapped data.'''
+    # extract airport codes to store
+    airports = [airp.iata_code for airp in router.airports]
+    return dict(zip(HEADERS, (router._mode,
+                              airports,
+                              week,
+                              router.aircraft,
+                              router.opt_route,
+                              router.opt_route_distance,
+                              router.eco_route,
+                              router.eco_route_cost)))
+
+
+def parse_route(route) -> tuple:
+    '''Parses a stored route like "[0, 1, 2, 0]" into a tuple of ints.'''
+    if not isinstance(route, str):
+        return tuple(route)
+    return tuple(int(node) for node in route.strip('[] ').split(',')
+                 if node.strip())
+
+
+def iter_records(file_path, week_from=None, week_to=None):
+    '''Streams typed records of a data file and its journal without loading
+    the whole file. Only the travel week is parsed for filtering.
+
+    Args:
+        file_path (str): Path to data file.
+        week_from (str): first travel week, e.g. "2016 Week 1"
+        week_to (str): last travel week, inclusive.
+    Yields:
+        TravelRecord: records in file order.'''
+    low = parse_week(week_from) if week_from else None
+    high = parse_week(week_to) if week_to else None
+    paths = [file_path]
+    if IO.exists(file_path + JOURNAL_EXT):
+        paths.append(file_path + JOURNAL_EXT)
+    for path in paths:
+        for row in IO(path).iter_csv_dict():
+            # a crash while appending may leave a truncated last record
+            if row.get('eco_route_cost') is None:
+                continue
+            if low or high:
+                week = parse_week(row['travel_week'])
+                if (low and week < low) or (high and week > high):
+                    continue
+            yield TravelRecord(row)
+
+
+###############################################################################
+class TravelRecord:
+    '''A typed travel data record. Fields are parsed from the raw csv row
+    on first access: routes as int tuples, distance and cost as floats.'''
+    __slots__ = ('_row', '_cache')
+
+    def __init__(self, row):
+        '''Constructor.
+
+        Args:
+            row (dict): raw csv row with HEADERS keys.'''
+        self._row = row
+        self._cache = {}
+
+    def __parsed(self, key, parser):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = parser(self._row[key])
+            return value
+
+    @property
+    def mode(self) -> str:
+        return self._row['mode']
+
+    @property
+    def airports(self) -> tuple:
+        return self.__parsed('airports', lambda v: tuple(v.upper().split()))
+
+    @property
+    def travel_week(self) -> str:
+        return self._row['travel_week']
+
+    @property
+    def week(self) -> tuple:
+        '''Travel week as (year, week) numbers.'''
+        return self.__parsed('travel_week', parse_week)
+
+    @property
+    def aircraft(self) -> str:
+        return self._row['aircraft']
+
+    @property
+    def shortest_route(self) -> tuple:
+        return self.__parsed('shortest_route', parse_route)
+
+    @property
+    def shortest_dist(self) -> float:
+        return self.__parsed('shortest_dist', float)
+
+    @property
+    def eco_route(self) -> tuple:
+        return self.__parsed('eco_route', parse_route)
+
+    @property
+    def eco_route_cost(self) -> float:
+        return self.__parsed('eco_route_cost', float)
+
+    def as_dict(self) -> dict:
+        '''Returns typed fields mapped to HEADERS.'''
+        return {key: getattr(self, key) for key in HEADERS}
+
+
+###############################################################################
+class ResultStore:
+    '''Append only file of full routing results by travel week. A line is
+    "week<tab>version<tab>json", only the wanted line is parsed as json.'''
+    def __init__(self, file_path):
+        '''Constructor.
+
+        Args:
+            file_path (str): Path to results file, created on first save.'''
+        self._file_path = file_path
+        # week: (version, file offset), built on first lookup
+        self._index = None
+        # get runs on the GUI thread while save or compact change the index
+        self._index_lock = threading.Lock()
+        # week: (version, result) added since last save
+        self._pending = {}
+        # results taken by a save that is still writing them
+        self._saving = {}
+
+    def __read_index(self) -> dict:
+        '''Returns week: (version, file offset) of the results file.'''
+        index = {}
+        if not IO.exists(self._file_path):
+            return index
+        with open(self._file_path, 'rb') as data:
+            offset = 0
+            for line in data:
+                parts = line.split(b'\t', 2)
+                # skip a truncated last line
+                if len(parts) == 3 and line.endswith(b'\n'):
+                    index[parts[0].decode('utf-8')] = \
+                        (parts[1].decode('utf-8'), offset)
+                offset += len(line)
+        return index
+
+    def add(self, week, result, version):
+        '''Stores the result of a week, replaces older ones on save.
+
+        Args:
+            week (str): travel week.
+            result (dict): see ComplexRoute.result
+            version (str): data version the result depends on.'''
+        self._pending[week] = (version, result)
+
+    def get(self, week, version):
+        '''Returns the result of a week if its version matches.
+
+        Args:
+            week (str): travel week.
+            version (str): current data version.
+        Returns:
+            dict: stored result, None if missing or stale.'''
+        for results in (self._pending, self._saving):
+            if week in results:
+                ver, result = results[week]
+                return result if ver == version else None
+        with self._index_lock:
+            if self._index is None:
+                self._index = self.__read_index()
+            entry = self._index.get(week)
+        if entry is None:
+            return None
+        ver, offset = entry
+        if ver != version:
+            return None
+        with open(self._file_path, 'rb') as data:
+            data.seek(offset)
+            line = data.readline()
+        parts = line.split(b'\t', 2)
+        # a compaction in another thread may have moved the line
+        if len(parts) != 3 or not line.endswith(b'\n') or \
+                parts[:2] != [week.encode('utf-8'), version.encode('utf-8')]:
+            return None
+        try:
+            return json.loads(parts[2].decode('utf-8'))
+        except ValueError:
+            # a damaged line is a miss, the result is routed again
+            return None
+
+    def take(self) -> dict:
+        '''Returns the results added since last save for a later save(),
+        they stay visible to get until written. Only touches memory, so
+        callers can hold their record lock while taking.
+
+        Returns:
+            dict: week: (version, result)'''
+        self._saving = {**self._saving, **self._pending}
+        self._pending = {}
+        return self._saving
+
+    def save(self, results=None):
+        '''Appends results added since last save.
+
+        Args:
+            results (dict): results of take(), None to take them here.'''
+        if results is None:
+            results = self.take()
+        if not results:
+            return
+        index = {}
+        # a crash may have left a partial line to append onto
+        IO.repair_tail(self._file_path)
+        with open(self._file_path, 'ab') as data:
+            offset = data.tell()
+            for week, (ver, result) in results.items():
+                line = '{}\t{}\t{}\n'.format(
+                    week, ver, json.dumps(result, separators=(',', ':')))
+                line = line.encode('utf-8')
+                data.write(line)
+                index[week] = (ver, offset)
+                offset += len(line)
+            data.flush()
+            os.fsync(data.fileno())
+        # an index built later reads the new lines from the file
+        with self._index_lock:
+            if self._index is not None:
+                self._index.update(index)
+        self._saving = {}
+
+    def compact(self, results=None):
+        '''Rewrites the file keeping only the latest result of each week.
+
+        Args:
+            results (dict): results of take(), see save.'''
+        self.save(results)
+        if not IO.exists(self._file_path):
+            return
+        lines = {}
+        with open(self._file_path, 'rb') as data:
+            for line in data:
+                if line.endswith(b'\n') and line.count(b'\t') >= 2:
+                    lines[line.split(b'\t', 1)[0]] = line
+        index = {}
+        with IO.atomic_write(self._file_path, 'wb') as data:
+            offset = 0
+            for line in lines.values():
+                week, ver = line.split(b'\t', 2)[:2]
+                data.write(line)
+                index[week.decode('utf-8')] = (ver.decode('utf-8'), offset)
+                offset += len(line)
+        # one swap, get sees the old index or the new one
+        with self._index_lock:
+            self._index = index
 
 
 ###############################################################################
 class DataStore(dict):
     '''This class reads and writes data to a data file'''
-    def __init__(self, file_path):
+    def __init__(self, file_path, compact_every=COMPACT_EVERY):
         '''Constructor.
 
         Args:
-            file_path (str): Path to data file.'''
+            file_path (str): Path to data file.
+            compact_every (int): journal records that trigger compaction.'''
         self._file_path = file_path
+        self._journal_path = file_path + JOURNAL_EXT
+        self._compact_every = compact_every
         self._io = IO(file_path)
-        self.__read_data()
+        self._results = ResultStore(file_path + RESULTS_EXT)
+        # save may run in a background writer while the GUI adds records,
+        # _lock guards records in memory and _io_lock the files
+        self._lock = threading.RLock()
+        self._io_lock = threading.RLock()
+        # travel weeks added since last save
+        self._pending = []
+        # records in journal, not yet compacted into data file
+        self._journal_size = 0
+        self.__read_data(self._io)
+        if IO.exists(self._journal_path):
+            self._journal_size = self.__read_data(IO(self._journal_path))
 
-    def __read_data(self):
-        '''Read data and sets self dictionary with travel weak'''
-        reader = self._io.get_csv_dict()
+    def __read_data(self, io) -> int:
+        '''Read data and sets self dictionary with travel weak
+
+        Args:
+            io (IO): data file or journal.
+        Returns:
+            int: number of records read.'''
+        reader = io.iter_csv_dict()
+        count = 0
         for row in reader:
+            # a crash while appending may leave a truncated last record
+            if row.get('eco_route_cost') is None:
+                continue
+            count += 1
             mode = row['mode']
             airports = row['airports']
             airports = airports.upper().split()
@@ -50,6 +406,7 @@ class DataStore(dict):
                                  'shortest_dist': shortest_dist,
                                  'eco_route': eco_route,
                                  'eco_route_cost': eco_route_cost}
+        return count
 
     def add(self, data):
         '''Checks validity of data and adds data to current data.
@@ -57,34 +414,90 @@ class DataStore(dict):
 
         Args:
             data (dict): New data dict.'''
-        # check if data exists quit function
-        if data['travel_week'] in self.keys():
-            return
-        # check validity of data
-        for key, value in data.items():
-            if key not in HEADERS:
-                raise KeyError('{} is not a valid header.'.format(key))
-        if len(data) != len(HEADERS):
-            raise Exception('Lenght of data does not match the headers')
-        # update dict
-        self[data['travel_week']] = data
+        with self._lock:
+            # check if data exists quit function
+            if data['travel_week'] in self.keys():
+                return
+            validate_data(data)
+            # update dict
+            self[data['travel_week']] = data
+            self._pending.append(data['travel_week'])
+
+    def add_result(self, week, result, version):
+        '''Stores the full routing result of a week, see ResultStore.add'''
+        with self._lock:
+            self._results.add(week, result, version)
 
+    def get_result(self, week, version):
+        '''Returns the stored routing result of a week, see ResultStore.get'''
+        with self._lock:
+            return self._results.get(week, version)
+
+    @timing.traced('DataStore.save', 'io')
     def save(self):
-        '''Dumps the data to the data file.'''
-        with open(self._file_path, 'w',
-                  encoding='utf-8',
-                  errors='ignore') as data:
-            writer = csv.DictWriter(data,
-                                    fieldnames=HEADERS,
-                                    lineterminator='\n')
-            writer.writeheader()
-            # we make a copy to prevent modification of data on original obj
-            dupl = copy.deepcopy(self)
-            for key, value in dupl.items():
-                # watch for writing string because reader deals with str
-                if type(value['airports']) == list:
-                    value['airports'] = ' '.join(value['airports'])
-                writer.writerow(value)
+        '''Appends records added since last save to the journal. Costs
+        O(new records), the journal is compacted every compact_every.
+        Safe to call from a background thread while records are added.'''
+        with self._io_lock:
+            with self._lock:
+                rows = [DataStore.__row(self[week]) for week in self._pending]
+                self._pending = []
+                results = self._results.take()
+            self._results.save(results)
+            if not rows:
+                return
+            # a crash may have left a partial record to append onto
+            IO.repair_tail(self._journal_path)
+            new_file = not IO.exists(self._journal_path) or \
+                not os.path.getsize(self._journal_path)
+            with open(self._journal_path, 'a',
+                      encoding='utf-8',
+                      errors='ignore') as data:
+                writer = csv.DictWriter(data,
+                                        fieldnames=HEADERS,
+                                        lineterminator='\n')
+                if new_file:
+                    writer.writeheader()
+                writer.writerows(rows)
+                data.flush()
+                os.fsync(data.fileno())
+            self._journal_size += len(rows)
+            if self._journal_size >= self._compact_every:
+                self.compact()
+
+    def records(self, week_from=None, week_to=None):
+        '''Streams typed records of the saved data, see iter_records.'''
+        return iter_records(self._file_path, week_from, week_to)
+
+    def compact(self):
+        '''Dumps all the data to the data file and clears the journal.
+        If interrupted, replaying the journal on load is harmless.'''
+        with self._io_lock:
+            with self._lock:
+                rows = [DataStore.__row(value) for value in self.values()]
+                self._pending = []
+                results = self._results.take()
+            self._results.compact(results)
+            with IO.atomic_write(self._file_path, 'w',
+                                 encoding='utf-8',
+                                 errors='ignore') as data:
+                writer = csv.DictWriter(data,
+                                        fieldnames=HEADERS,
+                                        lineterminator='\n')
+                writer.writeheader()
+                writer.writerows(rows)
+            if IO.exists(self._journal_path):
+                os.remove(self._journal_path)
+            self._journal_size = 0
+
+    @staticmethod
+    def __row(value) -> dict:
+        '''Returns a csv row of a record without modifying it.'''
+        row = dict(value)
+        # watch for writing string because reader deals with str
+        if type(row['airports']) == list:
+            row['airports'] = ' '.join(row['airports'])
+        return row
 
     def map_data(self, data) -> dict:
         '''Maps an iterable to a dict with proper keys.
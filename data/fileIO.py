@@ -7,6 +7,12 @@ Base file IO module that wraps basic file handling methods.
 """
 import os
 import csv
+import pickle
+import hashlib
+from contextlib import contextmanager
+# extension and format version of compiled data snapshots
+SNAPSHOT_EXT = '.snapshot'
+SNAPSHOT_VERSION = 2
 
 
 class IO:
@@ -41,6 +47,16 @@ class IO:
             reader = csv.DictReader(data)
             return list(reader)
 
+    def iter_csv_dict(self):
+        '''Lazily reads the csv file row by row, for large files.
+
+        Yields:
+            dict: rows of csv file.'''
+        with open(self._file_path, 'r',
+                  encoding='utf-8',
+                  errors='ignore') as data:
+            yield from csv.DictReader(data)
+
     def get_csv(self):
         '''Reads the csv file and returns the associated dictionary
 
@@ -52,6 +68,149 @@ class IO:
             reader = csv.reader(data)
             return list(reader)
 
+    @staticmethod
+    @contextmanager
+    def atomic_write(file_path, mode='w', **kwargs):
+        '''Opens a temp file next to file_path and renames it over the
+        target once the block succeeds, readers never see a partial file.
+        usage: with IO.atomic_write(path) as data:
+
+        Args:
+            file_path (str): path to target file.
+            mode (str): "w" or "wb".
+            kwargs: passed to open, e.g. encoding.'''
+        tmp_path = file_path + '.tmp'
+        try:
+            with open(tmp_path, mode, **kwargs) as data:
+                yield data
+                data.flush()
+                os.fsync(data.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def repair_tail(file_path) -> bool:
+        '''Cuts a partial last line, left by a crash while appending, so the
+        next append starts on a line of its own.
+
+        Args:
+            file_path (str): path to an append only text file.
+        Returns:
+            bool: True if the file was cut.'''
+        if not IO.exists(file_path):
+            return False
+        with open(file_path, 'rb+') as data:
+            end = pos = data.seek(0, os.SEEK_END)
+            # look for the last line break, backwards in blocks
+            while pos > 0:
+                step = min(pos, 4096)
+                data.seek(pos - step)
+                block = data.read(step)
+                if pos == end and block.endswith(b'\n'):
+                    return False
+                idx = block.rfind(b'\n')
+                if idx != -1:
+                    pos += idx + 1 - step
+                    break
+                pos -= step
+            if pos == end:
+                return False
+            data.truncate(pos)
+            data.flush()
+            os.fsync(data.fileno())
+        return True
+
+
+###############################################################################
+class Snapshot:
+    '''Compiled binary snapshot of data parsed out of a source file.
+    The snapshot is stored next to the source and is invalidated by the
+    source modification time, size and content hash.'''
+    def __init__(self, file_path, kind):
+        '''Constructor
+
+        Args:
+            file_path (str): Path to the source file, e.g. airports.csv
+            kind (str): Name of the parsed structure, e.g. "airports".
+                One source file may have several kinds of snapshots.'''
+        self._source = file_path
+        self._kind = kind
+        self._path = '{}.{}{}'.format(file_path, kind, SNAPSHOT_EXT)
+
+    @property
+    def path(self) -> str:
+        '''Path to the snapshot file'''
+        return self._path
+
+    @staticmethod
+    def digest(file_path) -> str:
+        '''Returns the sha1 hex digest of a file's content.
+
+        Args:
+            file_path (str): path to file.'''
+        sha = hashlib.sha1()
+        with open(file_path, 'rb') as data:
+            for chunk in iter(lambda: data.read(1 << 16), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def __stamp(self) -> tuple:
+        '''Returns modification time and size of the source file.'''
+        stat = os.stat(self._source)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        '''Loads the snapshot payload.
+
+        Returns:
+            object: stored payload. None if snapshot is missing or stale.'''
+        try:
+            mtime, size = self.__stamp()
+            with open(self._path, 'rb') as data:
+                header = pickle.load(data)
+                if header.get('version') != SNAPSHOT_VERSION or \
+                        header.get('kind') != self._kind or \
+                        header.get('size') != size:
+                    return None
+                if header.get('mtime') == mtime:
+                    return pickle.load(data)
+                # source was touched, it is still valid if content is same
+                digest = Snapshot.digest(self._source)
+                if header.get('sha1') != digest:
+                    return None
+                payload = pickle.load(data)
+        except (OSError, EOFError, pickle.UnpicklingError,
+                AttributeError, ImportError, TypeError):
+            return None
+        # refresh the stamp so next load skips hashing
+        self.save(payload, digest)
+        return payload
+
+    def save(self, payload, digest=None):
+        '''Writes the payload to the snapshot file. Failures are ignored
+        since snapshot is only a cache and the source is always available.
+
+        Args:
+            payload (object): picklable parsed data.
+            digest (str): sha1 of the source if already calculated.'''
+        try:
+            mtime, size = self.__stamp()
+            header = {'version': SNAPSHOT_VERSION,
+                      'kind': self._kind,
+                      'mtime': mtime,
+                      'size': size,
+                      'sha1': digest or Snapshot.digest(self._source)}
+            with IO.atomic_write(self._path, 'wb') as data:
+                pickle.dump(header, data, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(payload, data, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
 
 def test():
     io = IO(r'./aircrafts.csv')
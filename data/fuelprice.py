@@ -5,20 +5,24 @@ fuel module extracts and represents fuel data.
 @since:12/04/2016
 @author:Tirdad Kiafar
 """
-from data.fileIO import IO
+from data.fileIO import IO, Snapshot
+from util import timing
 UNIT = 'EURO/LITTER'
 UNIT_SHORT = 'eu/lit'
 
 
 ###############################################################################
 class FuelObj:
+    __slots__ = ('_country', '_iso_country', '_price')
+    # units are the same for every item, shared on the class
+    _unit = UNIT
+    _unit_short = UNIT_SHORT
+
     def __init__(self):
         '''Holds data of an individual fuel item.'''
         self._country = ''
         self._iso_country = ''
         self._price = 0
-        self._unit = UNIT
-        self._unit_short = UNIT_SHORT
 
     @property
     def country(self):
@@ -46,12 +50,19 @@ class FuelMap(dict):
     '''Holds aircrafts data. Could be used in two ways: aircraft['code'] or
     aircraft('code').'''
 
+    @timing.traced('FuelMap load', 'io')
     def __init__(self, dataFile):
         '''Constructor
 
         Args:
             dataFile (str): path to aircraft data csv file.'''
-        self.__extract_fuels(dataFile)
+        snapshot = Snapshot(dataFile, 'fuels')
+        state = snapshot.load()
+        if state is None:
+            self.__extract_fuels(dataFile)
+            snapshot.save(dict(self))
+        else:
+            self.update(state)
 
     def __extract_fuels(self, dataFile):
         '''This function receives the file path of data and sets the objects.
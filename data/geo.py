@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+geo module provides vectorized geodesic calculations over numpy arrays.
+Formulas match Route.calcDistance so results are interchangeable.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import numpy as np
+EARTH_RADIUS = 6371
+DEG_TO_RAD = np.pi / 180
+
+
+def distances(lat, lon, lats, lons) -> np.ndarray:
+    '''Returns great circle distances in kilometers from one point to many.
+
+    Args:
+        lat (float): latitude of the origin.
+        lon (float): longitude of the origin.
+        lats (numpy.ndarray): latitudes of the targets.
+        lons (numpy.ndarray): longitudes of the targets.
+    Returns:
+        numpy.ndarray: distances, same shape as lats.'''
+    phi1 = (90 - lat) * DEG_TO_RAD
+    phi2 = (90 - np.asarray(lats, dtype=np.float64)) * DEG_TO_RAD
+    delta = (lon - np.asarray(lons, dtype=np.float64)) * DEG_TO_RAD
+    cosine = np.sin(phi1) * np.sin(phi2) * np.cos(delta) + \
+        np.cos(phi1) * np.cos(phi2)
+    # same rounding as Route.calcDistance keeps acos in its domain
+    cosine = np.clip(np.round(cosine, 12), -1, 1)
+    return np.arccos(cosine) * EARTH_RADIUS
+
+
+def _unit_vectors(lats, lons) -> np.ndarray:
+    '''Returns Nx3 unit vectors of points on the sphere.'''
+    lat = np.asarray(lats, dtype=np.float64) * DEG_TO_RAD
+    lon = np.asarray(lons, dtype=np.float64) * DEG_TO_RAD
+    return np.column_stack((np.cos(lat) * np.cos(lon),
+                            np.cos(lat) * np.sin(lon),
+                            np.sin(lat)))
+
+
+def great_circles(starts, ends, step=100.0) -> list:
+    '''Densifies great circle legs into lon/lat polylines, all legs at once.
+    Polylines crossing the antimeridian are split at +-180 degrees.
+
+    Args:
+        starts (array like): Nx2 (latitude, longitude) of leg origins.
+        ends (array like): Nx2 (latitude, longitude) of leg destinations.
+        step (float): maximum distance between vertices in kilometers.
+    Returns:
+        list: (leg index, Mx2 array of (longitude, latitude)) tuples.'''
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    if not len(starts):
+        return []
+    vec1 = _unit_vectors(starts[:, 0], starts[:, 1])
+    vec2 = _unit_vectors(ends[:, 0], ends[:, 1])
+    # central angle of each leg and its number of vertices
+    omega = np.arccos(np.clip(np.einsum('ij,ij->i', vec1, vec2), -1, 1))
+    counts = np.maximum(np.ceil(omega * EARTH_RADIUS / step), 1) \
+        .astype(np.int64) + 1
+    leg = np.repeat(np.arange(len(counts)), counts)
+    # fraction of the leg of every vertex, 0 to 1
+    first = np.cumsum(counts) - counts
+    frac = (np.arange(len(leg)) - first[leg]) / (counts[leg] - 1)
+    # spherical linear interpolation, linear for (almost) equal points
+    om = omega[leg]
+    sin_om = np.sin(om)
+    safe = sin_om > 1e-12
+    w1 = np.where(safe, np.sin((1 - frac) * om) / np.where(safe, sin_om, 1),
+                  1 - frac)
+    w2 = np.where(safe, np.sin(frac * om) / np.where(safe, sin_om, 1), frac)
+    vec = w1[:, None] * vec1[leg] + w2[:, None] * vec2[leg]
+    lats = np.arctan2(vec[:, 2], np.hypot(vec[:, 0], vec[:, 1])) / DEG_TO_RAD
+    lons = np.arctan2(vec[:, 1], vec[:, 0]) / DEG_TO_RAD
+    # split at the start of each leg and where longitude wraps around
+    jump = np.abs(np.diff(lons)) > 180
+    jump &= leg[1:] == leg[:-1]
+    cuts = np.flatnonzero(jump) + 1
+    wraps = set(cuts.tolist())
+    bounds = np.union1d(first[1:], cuts)
+    lines = np.split(np.column_stack((lons, lats)), bounds)
+    starts_at = np.concatenate(([0], bounds))
+    res = []
+    for start, line in zip(starts_at, lines):
+        if start in wraps:
+            # close the gap: both pieces end on the antimeridian
+            prev = res[-1][1]
+            edge, lat = _antimeridian(prev[-1], line[0])
+            res[-1] = (res[-1][0], np.vstack((prev, (edge, lat))))
+            line = np.vstack(((-edge, lat), line))
+        res.append((int(leg[start]), line))
+    return res
+
+
+def range_circle(lat, lon, radius, count=360) -> list:
+    '''Returns the boundary of every point within radius of a position as
+    lon/lat polylines, split at +-180 degrees.
+
+    Args:
+        lat (float): latitude of the center.
+        lon (float): longitude of the center.
+        radius (float): distance in kilometers.
+        count (int): number of vertices.
+    Returns:
+        list: Mx2 arrays of (longitude, latitude).'''
+    # destination of every bearing at the given distance
+    bearing = np.linspace(0, 2 * np.pi, count + 1)
+    delta = radius / EARTH_RADIUS
+    phi1, lam1 = lat * DEG_TO_RAD, lon * DEG_TO_RAD
+    sin_phi2 = np.sin(phi1) * np.cos(delta) + \
+        np.cos(phi1) * np.sin(delta) * np.cos(bearing)
+    phi2 = np.arcsin(np.clip(sin_phi2, -1, 1))
+    lam2 = lam1 + np.arctan2(np.sin(bearing) * np.sin(delta) * np.cos(phi1),
+                             np.cos(delta) - np.sin(phi1) * sin_phi2)
+    lons = (lam2 / DEG_TO_RAD + 180) % 360 - 180
+    lats = phi2 / DEG_TO_RAD
+    cuts = np.flatnonzero(np.abs(np.diff(lons)) > 180) + 1
+    lines = np.split(np.column_stack((lons, lats)), cuts)
+    for i in range(1, len(lines)):
+        # close the gaps, both pieces end on the antimeridian
+        edge, lat = _antimeridian(lines[i-1][-1], lines[i][0])
+        lines[i-1] = np.vstack((lines[i-1], (edge, lat)))
+        lines[i] = np.vstack(((-edge, lat), lines[i]))
+    return lines
+
+
+def _antimeridian(point1, point2) -> tuple:
+    '''Returns (edge longitude, latitude) where the line between two
+    (lon, lat) points on both sides of the antimeridian crosses it.'''
+    lon1, lat1 = point1
+    lon2, lat2 = point2
+    edge = 180.0 if lon1 > 0 else -180.0
+    shifted = lon2 + (360 if edge > 0 else -360)
+    return edge, lat1 + (lat2 - lat1) * (edge - lon1) / (shifted - lon1)
+
+
+###############################################################################
+class SpatialGrid:
+    '''Uniform latitude/longitude grid over points for nearest neighbour
+    queries. Distances are in degrees on a lon/lat map, i.e. what is
+    nearest on screen, so only a few cells around a query are searched.'''
+    def __init__(self, lats, lons, cell=2.0):
+        '''Constructor
+
+        Args:
+            lats (array like): latitudes of points.
+            lons (array like): longitudes of points.
+            cell (float): cell size in degrees.'''
+        self._lats = np.asarray(lats, dtype=np.float64)
+        self._lons = np.asarray(lons, dtype=np.float64)
+        self._cell = cell
+        self._rows = int(np.ceil(180 / cell)) + 1
+        self._cols = int(np.ceil(360 / cell)) + 1
+        keys = self.__row(self._lats) * self._cols + self.__col(self._lons)
+        order = np.argsort(keys, kind='stable')
+        keys, starts = np.unique(keys[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        # cell key: indexes of its points
+        self._cells = {int(key): order[start:end]
+                       for key, start, end in zip(keys, starts, ends)}
+
+    def __len__(self):
+        return len(self._lats)
+
+    def within(self, lat, lon, radius) -> np.ndarray:
+        '''Returns indexes of points closer than radius to a position,
+        one vectorized great circle pass over every point.
+
+        Args:
+            lat (float): latitude of the position.
+            lon (float): longitude of the position.
+            radius (float): distance limit in kilometers.'''
+        return np.flatnonzero(distances(lat, lon, self._lats, self._lons)
+                              <= radius)
+
+    def __row(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90) / self._cell),
+                       0, self._rows - 1).astype(np.int64)
+
+    def __col(self, lon):
+        return np.clip(np.floor((np.asarray(lon) + 180) / self._cell),
+                       0, self._cols - 1).astype(np.int64)
+
+    def __ring(self, row, col, ring):
+        '''Yields keys of cells exactly ring cells away from (row, col).'''
+        if ring == 0:
+            yield row * self._cols + col
+            return
+        for rw in range(max(row - ring, 0),
+                        min(row + ring, self._rows - 1) + 1):
+            if abs(rw - row) == ring:
+                cols = range(max(col - ring, 0),
+                             min(col + ring, self._cols - 1) + 1)
+            else:
+                cols = [cl for cl in (col - ring, col + ring)
+                        if 0 <= cl < self._cols]
+            for cl in cols:
+                yield rw * self._cols + cl
+
+    def nearest(self, lat, lon, max_dist=None):
+        '''Returns the index of the point nearest to a position.
+
+        Args:
+            lat (float): latitude of the position.
+            lon (float): longitude of the position.
+            max_dist (float): search radius in degrees, None for no limit.
+        Returns:
+            int: point index, None if no point is within max_dist.'''
+        row, col = int(self.__row(lat)), int(self.__col(lon))
+        best, best_dist = None, np.inf
+        limit = np.inf if max_dist is None else max_dist ** 2
+        for ring in range(max(self._rows, self._cols)):
+            # points of this ring are more than (ring - 1) cells away
+            reach = max(ring - 1, 0) * self._cell
+            if reach ** 2 >= min(best_dist, limit):
+                break
+            for key in self.__ring(row, col, ring):
+                idx = self._cells.get(key)
+                if idx is None:
+                    continue
+                dist = (self._lats[idx] - lat) ** 2 + \
+                    (self._lons[idx] - lon) ** 2
+                pos = int(np.argmin(dist))
+                if dist[pos] < best_dist:
+                    best, best_dist = int(idx[pos]), float(dist[pos])
+        if best_dist > limit:
+            return None
+        return best
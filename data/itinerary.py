@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+itinerary module reads routing requests and solves them without a GUI.
+Shared by the batch router and the routing service.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import os
+import csv
+import json
+from collections import namedtuple
+from data.settings import Settings
+from data.aircraft import Aircrafts
+from data.airport import AirportAtlas
+from data.currency import Currencies
+from data.fuelprice import FuelMap
+from data.router import ComplexRoute, ROUTE_STATIC, ROUTE_DYNAMIC
+from data.data_storage import router_data
+# a routing request, airports is a tuple of iata codes, first one is home
+Itinerary = namedtuple('Itinerary',
+                       ('airports', 'aircraft', 'mode', 'travel_week'))
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+
+
+def parse_itinerary(record) -> Itinerary:
+    '''Builds an itinerary out of a csv row or json object.
+
+    Args:
+        record (dict): must have "airports" (list or space separated codes)
+            and "aircraft" (code or name, e.g. A321 or "Airbus A321").
+            "mode" (static/dynamic) and "travel_week" (or "week") are
+            optional.
+    Returns:
+        Itinerary: parsed itinerary.
+    Raises:
+        ValueError: if a field is missing or of the wrong type.'''
+    airports = record.get('airports')
+    if isinstance(airports, str):
+        airports = airports.replace(',', ' ').split()
+    elif not isinstance(airports, (list, tuple, type(None))) or \
+            not all(isinstance(code, str) for code in airports):
+        raise ValueError('airports has to be a string or a list of codes.')
+    aircraft = record.get('aircraft')
+    if not airports or not aircraft:
+        raise ValueError('Itinerary needs airports and aircraft.')
+    mode = record.get('mode') or ROUTE_DYNAMIC
+    week = record.get('travel_week', record.get('week')) or ''
+    for name, value in (('aircraft', aircraft), ('mode', mode),
+                        ('week', week)):
+        if not isinstance(value, str):
+            raise ValueError('{} has to be a string.'.format(name))
+    if mode not in (ROUTE_STATIC, ROUTE_DYNAMIC):
+        raise ValueError("mode has to be either 'static' or 'dynamic'")
+    return Itinerary(tuple(code.strip().upper() for code in airports),
+                     aircraft.strip(), mode, week)
+
+
+def file_format(file_path) -> str:
+    '''Guesses csv or jsonl format out of a file extension.'''
+    ext = os.path.splitext(file_path)[1].lower()
+    return FORMAT_JSONL if ext in ('.jsonl', '.json', '.ndjson') \
+        else FORMAT_CSV
+
+
+def read_rows(file_path, fmt=None):
+    '''Lazily reads raw itinerary rows, see parse_row. Rows are not parsed
+    here, so a bad row can be reported without stopping the reading.
+
+    Args:
+        file_path (str): path to itineraries file.
+        fmt (str): "csv" or "jsonl". Guessed by extension if None.
+    Yields:
+        tuple: (line number, row), csv rows are dicts, jsonl rows text.'''
+    fmt = fmt or file_format(file_path)
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as data:
+        if fmt == FORMAT_CSV:
+            records = csv.DictReader(data)
+            for record in records:
+                yield records.line_num, record
+        else:
+            for line, text in enumerate(data, 1):
+                if text.strip():
+                    yield line, text
+
+
+def parse_row(row) -> Itinerary:
+    '''Parses a row of read_rows, see parse_itinerary.
+
+    Raises:
+        ValueError: if the row is not a valid itinerary.'''
+    if isinstance(row, str):
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError('Itinerary has to be a json object.')
+    return parse_itinerary(row)
+
+
+def read_itineraries(file_path, fmt=None):
+    '''Lazily reads itineraries from a csv or jsonl file.
+
+    Args:
+        file_path (str): path to itineraries file.
+        fmt (str): "csv" or "jsonl". Guessed by extension if None.
+    Yields:
+        Itinerary: parsed itineraries in file order.
+    Raises:
+        ValueError: on the first invalid row, see read_rows to skip it.'''
+    for line, row in read_rows(file_path, fmt):
+        yield parse_row(row)
+
+
+def serialize(record, fmt) -> dict:
+    '''Turns a data dict (see DataStore HEADERS) into plain values.
+
+    Args:
+        record (dict): mapped router data.
+        fmt (str): "csv" joins airports like traveldata.csv does.'''
+    res = dict(record)
+    res['aircraft'] = str(res['aircraft'])
+    res['shortest_route'] = list(res['shortest_route'])
+    res['eco_route'] = list(res['eco_route'])
+    if fmt == FORMAT_CSV:
+        res['airports'] = ' '.join(res['airports'])
+    return res
+
+
+###############################################################################
+class Datasets:
+    '''Reference datasets loaded once and shared by routing jobs.'''
+    def __init__(self, settings_path=r'./data/settings.ini'):
+        '''Constructor. Loads the data files listed in settings.
+
+        Args:
+            settings_path (str): path to settings file.'''
+        settings = Settings(file_path=settings_path)
+        self.aircrafts = Aircrafts(settings.getStr('aircrafts', 'DATA'))
+        self.airports = AirportAtlas(settings.getStr('airports', 'DATA'))
+        self.currencies = Currencies(settings.getStr('currencies', 'DATA'))
+        self.fuelmap = FuelMap(settings.getStr('fuelprices', 'DATA'))
+
+    def route(self, itinerary) -> ComplexRoute:
+        '''Solves an itinerary.
+
+        Args:
+            itinerary (Itinerary): routing request.
+        Returns:
+            ComplexRoute: solved router.'''
+        airports = [self.airports(code) for code in itinerary.airports]
+        aircraft = self.aircrafts.get_by_str(itinerary.aircraft)
+        if aircraft is None:
+            raise KeyError("Aircraft: '{}' unknown".format(itinerary.aircraft))
+        return ComplexRoute(airports, aircraft, self.fuelmap, itinerary.mode)
+
+    def record(self, itinerary) -> dict:
+        '''Solves an itinerary and maps the result to DataStore HEADERS.
+
+        Args:
+            itinerary (Itinerary): routing request.
+        Returns:
+            dict: mapped data, see data_storage.router_data'''
+        return router_data(self.route(itinerary), itinerary.travel_week)
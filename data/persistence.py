@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+persistence module moves disk writes off the GUI thread.
+Writes submitted within a short window are coalesced by key, so e.g. many
+saves of the data store end up as one write.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import sys
+import threading
+import time
+import traceback
+# seconds a write waits for more writes before it is done
+WRITE_DELAY = 0.5
+
+
+###############################################################################
+class BackgroundWriter:
+    '''Runs write jobs in a background thread. Jobs submitted with the same
+    key before they run are coalesced, only the latest one runs.'''
+    def __init__(self, delay=WRITE_DELAY, on_error=None):
+        '''Constructor. Starts the writer thread.
+
+        Args:
+            delay (float): seconds to wait for more jobs before writing.
+            on_error (callable): called with the exception of a failed job,
+                called in the writer thread. Prints the traceback if None.'''
+        self._delay = delay
+        self._on_error = on_error
+        # key: (func, args), in submission order
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._flushing = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self.__run,
+                                        name='BackgroundWriter', daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        '''Number of jobs waiting to run'''
+        return len(self._pending)
+
+    def submit(self, key, func, *args):
+        '''Schedules func(*args), replaces a waiting job of the same key.
+
+        Args:
+            key (str): what is written, e.g. "data" or "settings".
+            func (callable): write job.
+            args: arguments of func, pass snapshots of mutable state.'''
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('BackgroundWriter is closed')
+            self._pending[key] = (func, args)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None) -> bool:
+        '''Runs waiting jobs now and blocks until they are done.
+
+        Args:
+            timeout (float): maximum seconds to wait, None for no limit.
+        Returns:
+            bool: False if timed out.'''
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(
+                    lambda: not self._pending and not self._busy, timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        '''Flushes waiting jobs and stops the writer thread.'''
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def __run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                # gather jobs arriving within the delay
+                deadline = time.monotonic() + self._delay
+                while not (self._flushing or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                jobs, self._pending = self._pending, {}
+                self._busy = True
+            for func, args in jobs.values():
+                try:
+                    func(*args)
+                except Exception as err:
+                    if self._on_error is not None:
+                        self._on_error(err)
+                    else:
+                        traceback.print_exc(file=sys.stderr)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
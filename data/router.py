@@ -4,15 +4,96 @@
 This module handles routing. Pairs of locations are passed through route class
 constructor and optimal route is calculated by brute force method
 '''
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from math import pi, acos, sin, cos
 from types import GeneratorType
 from data.currency import Currencies
 from data.airport import Airport, AirportAtlas
 from data.aircraft import Aircraft, Aircrafts
 from data.fuelprice import FuelObj, FuelMap
+from util import timing
 EARTH_RADIUS = 6371
 ROUTE_STATIC = 'static'
 ROUTE_DYNAMIC = 'dynamic'
+# number of alternative routes kept by ComplexRoute.result
+RESULT_TOP = 50
+# routing instrumentation of new routers, see set_stats
+_stats_enabled = False
+_stats_log = None
+
+
+def set_stats(enabled=True, log=None):
+    '''Turns routing instrumentation on or off. Routers built afterwards
+    carry a RouteStats object in their stats property, None when off.
+
+    Args:
+        enabled (bool): record phase timings and counters.
+        log (file): every finished router prints its stats to it, if given.'''
+    global _stats_enabled, _stats_log
+    _stats_enabled = enabled
+    _stats_log = log if enabled else None
+
+
+def _no_phase(name):
+    '''Stand-in of RouteStats.phase when instrumentation is off.'''
+    return nullcontext()
+
+
+###############################################################################
+class RouteStats:
+    '''Phase timings and counters of one routing.'''
+    __slots__ = ('phases', 'generated', 'filtered', 'evaluated',
+                 'range_rejected', 'distance_calls')
+
+    def __init__(self):
+        # phase name: seconds, in the order phases ran
+        self.phases = OrderedDict()
+        # routes made by permutations and specialPerms
+        self.generated = 0
+        # return trips dropped by removeAdjacent
+        self.filtered = 0
+        # routes whose distance (and cost) was calculated
+        self.evaluated = 0
+        # routes with a leg longer than the aircraft range
+        self.range_rejected = 0
+        # calls of Route.calcDistance
+        self.distance_calls = 0
+
+    @contextmanager
+    def phase(self, name):
+        '''Adds the time of a with block to a phase.'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + \
+                time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        '''Seconds of all phases'''
+        return sum(self.phases.values())
+
+    def as_dict(self) -> dict:
+        '''Returns stats in a json friendly form.'''
+        return {'phases': dict(self.phases),
+                'total': self.total,
+                'generated': self.generated,
+                'filtered': self.filtered,
+                'evaluated': self.evaluated,
+                'range_rejected': self.range_rejected,
+                'distance_calls': self.distance_calls}
+
+    def __str__(self):
+        phases = ', '.join('{} {:.1f} ms'.format(name, sec * 1000)
+                           for name, sec in self.phases.items())
+        return ('{:.1f} ms: {} | routes generated {}, filtered {}, '
+                'evaluated {}, out of range {} | distance calls {}'.format(
+                    self.total * 1000, phases, self.generated, self.filtered,
+                    self.evaluated, self.range_rejected,
+                    self.distance_calls))
 
 
 ###############################################################################
@@ -37,22 +118,38 @@ class Route:
         self._indexes = tuple(i for i in range(len(points)))
         # mode, static or dynamic, static is a straight path with no analysis
         self._mode = mode
+        # instrumentation, None when off, see set_stats
+        self._stats = RouteStats() if _stats_enabled else None
+        stats = self._stats
+        phase = _no_phase if stats is None else stats.phase
         if self._mode == ROUTE_DYNAMIC:
             # distance matrix is a helper for calculating distances once
-            self._distance_matrix = self.__createDistMatrix()
+            with phase('distance_matrix'):
+                self._distance_matrix = self.__createDistMatrix()
             # store normal routing combinations in memory, a routing sample is
             # (0,1,2,3,4,5,0) for a closed route
-            self._normal_routes = Route.permutations(list(self._indexes[1:]))
-            # self._normal_routes are generators, turn them to list
-            self._normal_routes = list(self._normal_routes)
-            # add home node (0) to the permutations
-            self._normal_routes = self.__addHome(self._normal_routes)
+            with phase('permutations'):
+                self._normal_routes = Route.permutations(
+                    list(self._indexes[1:]))
+                # self._normal_routes are generators, turn them to list
+                self._normal_routes = list(self._normal_routes)
             # finding special routes for return trips.
-            self._special_routes = Route.specialPerms(list(self._indexes[1:]))
+            with phase('specialPerms'):
+                self._special_routes = Route.specialPerms(
+                    list(self._indexes[1:]))
+            generated = len(self._special_routes)
             # remove adjacent equal elements, e.g. (1,1,2,3,4,5)
-            self._special_routes = Route.removeAdjacent(self._special_routes)
+            with phase('removeAdjacent'):
+                self._special_routes = Route.removeAdjacent(
+                    self._special_routes)
             # add home node (0) to the permutations
-            self._special_routes = self.__addHome(self._special_routes)
+            with phase('addHome'):
+                self._normal_routes = self.__addHome(self._normal_routes)
+                self._special_routes = self.__addHome(self._special_routes)
+            if stats is not None:
+                stats.generated = len(self._normal_routes) + generated
+                stats.filtered = generated - len(self._special_routes)
+                stats.distance_calls = len(self._points) ** 2
             # comibning all the routes in one place
             self._possible_routes = self._normal_routes + self._special_routes
         elif self._mode == ROUTE_STATIC:
@@ -64,14 +161,25 @@ class Route:
             self._normal_routes = [self._normal_routes]
             self._special_routes = []
             self._possible_routes = self._normal_routes
+            if stats is not None:
+                stats.generated = 1
         # calculate route distances and store them
-        self._route_distances = self.__calcDistances()
+        with phase('distances'):
+            self._route_distances = self.__calcDistances()
+        if stats is not None:
+            stats.evaluated = len(self._possible_routes)
+            # one call per leg
+            stats.distance_calls += sum(map(len, self._possible_routes)) - \
+                len(self._possible_routes)
         # find the shortest path
         self._opt_route_distance = min(self._route_distances)
         # store the index of that for locating the optimum route
         opt_idx = self._route_distances.index(self._opt_route_distance)
         # locate the optimum route
         self._opt_route = self._possible_routes[opt_idx]
+        # ComplexRoute logs once its costs are done
+        if stats is not None and type(self) is Route:
+            self._log_stats()
 
     @property
     def points(self) -> tuple:
@@ -105,6 +213,23 @@ class Route:
     def opt_route_distance(self) -> float:
         return self._opt_route_distance
 
+    @property
+    def route_count(self) -> int:
+        '''Number of all possible routes'''
+        return len(self._possible_routes)
+
+    @property
+    def stats(self) -> RouteStats:
+        '''Timings and counters of the routing, None unless enabled by
+        set_stats'''
+        return self._stats
+
+    def _log_stats(self):
+        if _stats_log is not None:
+            print('{} {} points: {}'.format(type(self).__name__,
+                                            len(self._points), self._stats),
+                  file=_stats_log)
+
     def __len__(self):
         return len(self._points)
 
@@ -254,6 +379,7 @@ class Route:
 class ComplexRoute(Route):
     '''Adds functionality of economic calculations to the route class'''
 
+    @timing.traced('ComplexRoute', 'routing')
     def __init__(self, airports, aircraft, fuelmap, mode):
         '''Constructor'''
         super().__init__(self.__calc_points(airports), True, mode)
@@ -262,7 +388,9 @@ class ComplexRoute(Route):
         self.__fuelmap = fuelmap  # needed for calculating economic route
         # calculate route costs, cheapest route and its details
         self._route_costs = []
-        a, b, c, d = self.__calcRouteCosts()
+        phase = _no_phase if self._stats is None else self._stats.phase
+        with phase('route_costs'):
+            a, b, c, d = self.__calcRouteCosts()
         self._route_costs = a
         self._cost_details = b
         self._eco_route_cost = c
@@ -274,6 +402,9 @@ class ComplexRoute(Route):
             self._eco_route = self._possible_routes[eco_idx]
         else:  # all routes are invalid
             self._eco_route = []
+        if self._stats is not None:
+            self._stats.range_rejected = self._route_costs.count(0)
+            self._log_stats()
 
     @property
     def airports(self):
@@ -305,6 +436,33 @@ class ComplexRoute(Route):
     def eco_route_details(self) -> float:
         return self._eco_route_details
 
+    def result(self, top=RESULT_TOP) -> dict:
+        '''Returns a compact, json friendly form of the results. Keeps the
+        best routes and the top alternatives by distance and by cost.
+        See StoredRoute for rebuilding a router out of it.
+
+        Args:
+            top (int): number of alternatives kept for each criteria.
+        Returns:
+            dict: routing results.'''
+        count = len(self._possible_routes)
+        by_dist = sorted(range(count), key=self._route_distances.__getitem__)
+        # invalid routes cost 0, they go last
+        by_cost = sorted((i for i in range(count) if self._route_costs[i]),
+                         key=self._route_costs.__getitem__)
+        keep = sorted(set(by_dist[:top]) | set(by_cost[:top]))
+        return {'mode': self._mode,
+                'route_count': count,
+                'opt_route': list(self._opt_route),
+                'opt_route_distance': self._opt_route_distance,
+                'eco_route': list(self._eco_route),
+                'eco_route_cost': self._eco_route_cost,
+                'eco_route_details': list(self._eco_route_details),
+                'routes': [list(self._possible_routes[i]) for i in keep],
+                'distances': [self._route_distances[i] for i in keep],
+                'costs': [self._route_costs[i] for i in keep],
+                'details': [self._cost_details[i] for i in keep]}
+
     def __calc_points(self, airports) -> list:
         res = []
         for i in airports:
@@ -316,6 +474,7 @@ class ComplexRoute(Route):
         min_cost = -1  # to get cheapest route
         min_cost_details = []  # to get further details on eco route
         cost_details = []  # to get further details on route costs
+        stats = self._stats  # counts distance calls if not None
         for i in range(len(self._possible_routes)):
             rt = self._possible_routes[i]
             cost = 0
@@ -346,6 +505,8 @@ class ComplexRoute(Route):
                 path_details.append(fuel_consumed * fuelPrice)
                 # add the price of this path to the whole price
                 cost += fuel_consumed * fuelPrice
+            if stats is not None:
+                stats.distance_calls += j + 1
             # if path was not invalid subtract the remaining fuel cost
             if cost > 0:
                 remainin_fuel = self.__aircraft.fuel_capacity - fuel_consumed
@@ -371,6 +532,96 @@ class ComplexRoute(Route):
         return routeCosts, cost_details, min_cost, min_cost_details
 
 
+###############################################################################
+class StoredRoute:
+    '''Read only router rebuilt from ComplexRoute.result without routing.
+    Has the same properties as ComplexRoute, alternatives are limited to
+    the stored ones.'''
+    def __init__(self, airports, aircraft, result):
+        '''Constructor
+
+        Args:
+            airports (list): Airport objects in itinerary order.
+            aircraft (Aircraft): aircraft of the itinerary.
+            result (dict): output of ComplexRoute.result'''
+        self.__airports = airports
+        self.__aircraft = aircraft
+        self._points = tuple((i.latitude, i.longitude) for i in airports)
+        self._mode = result['mode']
+        self._route_count = result['route_count']
+        self._opt_route = result['opt_route']
+        self._opt_route_distance = result['opt_route_distance']
+        self._eco_route = result['eco_route']
+        self._eco_route_cost = result['eco_route_cost']
+        self._eco_route_details = result['eco_route_details']
+        self._possible_routes = result['routes']
+        self._route_distances = result['distances']
+        self._route_costs = result['costs']
+        self._cost_details = result['details']
+
+    @property
+    def airports(self):
+        return self.__airports
+
+    @property
+    def aircraft(self):
+        return self.__aircraft
+
+    @property
+    def points(self) -> tuple:
+        return self._points
+
+    @property
+    def route_count(self) -> int:
+        '''Number of all possible routes, not only the stored ones'''
+        return self._route_count
+
+    @property
+    def stats(self):
+        '''Always None, nothing is routed'''
+        return None
+
+    @property
+    def possible_routes(self) -> list:
+        return self._possible_routes
+
+    @property
+    def route_distances(self) -> list:
+        return self._route_distances
+
+    @property
+    def opt_route(self) -> list:
+        return self._opt_route
+
+    @property
+    def opt_route_distance(self) -> float:
+        return self._opt_route_distance
+
+    @property
+    def route_costs(self) -> list:
+        return self._route_costs
+
+    @property
+    def eco_details(self) -> list:
+        return self._cost_details
+
+    @property
+    def eco_route(self) -> list:
+        return self._eco_route
+
+    @property
+    def eco_route_cost(self) -> float:
+        return self._eco_route_cost
+
+    @property
+    def eco_route_details(self) -> list:
+        return self._eco_route_details
+
+    def map_points(self, points) -> list:
+        '''Maps a list of point indexes to existing points.'''
+        return [self._points[int(pt)] for pt in points]
+
+
 ###############################################################################
 def test():
     '''Test for Route class'''
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+search module provides a sorted prefix index for autocompletion.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+from bisect import bisect_left
+
+
+###############################################################################
+class PrefixIndex:
+    '''Case insensitive prefix search over records with attached info.
+    Lookups are a binary search instead of a scan of all records.'''
+    def __init__(self, records, infos=None):
+        '''Constructor
+
+        Args:
+            records (iterable): searchable strings, e.g. airport names.
+            infos (iterable): info of each record, e.g. airport codes.
+                Same lenght as records, records are used if None.'''
+        records = list(records)
+        infos = records if infos is None else list(infos)
+        if len(records) != len(infos):
+            raise ValueError('records and infos lenght mismatch')
+        entries = sorted(zip((rec.lower() for rec in records),
+                             records, infos))
+        self._keys = [entry[0] for entry in entries]
+        self._entries = [(entry[1], entry[2]) for entry in entries]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, prefix, limit=10) -> list:
+        '''Returns records starting with prefix in alphabetical order.
+
+        Args:
+            prefix (str): text to complete.
+            limit (int): maximum number of hits, None for all.
+        Returns:
+            list: (record, info) tuples.'''
+        prefix = prefix.lower()
+        res = []
+        idx = bisect_left(self._keys, prefix)
+        while idx < len(self._keys) and self._keys[idx].startswith(prefix):
+            if limit is not None and len(res) >= limit:
+                break
+            res.append(self._entries[idx])
+            idx += 1
+        return res
@@ -2,26 +2,108 @@
 # -*- coding: utf-8 -*-
 """
 Setting storage/writer for fuel management app.
+Frequently used settings are typed attributes, e.g. settings.auto_save,
+parsed once and cached until they change. Components may listen to
+changes with add_listener.
 @since:30/04/2016
 @author:Tirdad Kiafar
 """
+import io
 from configparser import ConfigParser
 from data.fileIO import IO
 
 
+def _parse_bool(value) -> bool:
+    '''Parses a boolean setting, raises ValueError if invalid.'''
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'on'):
+        return True
+    if text in ('false', '0', 'no', 'off'):
+        return False
+    raise ValueError('Invalid boolean setting: {!r}'.format(value))
+
+
+def _parse_list(value) -> tuple:
+    '''Parses a comma separated setting.'''
+    if isinstance(value, (list, tuple)):
+        return tuple(str(i) for i in value)
+    return tuple(str(value).split(','))
+
+
+# parsers of setting kinds
+PARSERS = {bool: _parse_bool,
+           int: lambda value: int(float(value)),
+           float: float,
+           str: str,
+           list: _parse_list}
+
+
+###############################################################################
+class _Option:
+    '''Typed setting of the Settings schema. Reads return the parsed value,
+    cached until the setting changes. Assignments are validated, update the
+    config and notify listeners, see Settings.setSetting'''
+    def __init__(self, kind, section='SETTINGS', default=None):
+        '''Constructor
+
+        Args:
+            kind (type): bool, int, float, str or list (read as tuple).
+            section (str): section of the setting.
+            default: value of the setting if missing from the file, e.g.
+                settings added after the file was created. Required if
+                None.'''
+        self.kind = kind
+        self.section = section
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj._get(self.name, self.section, self.kind, self.default)
+
+    def __set__(self, obj, value):
+        obj.setSetting(self.name, value, self.section)
+
+
 ###############################################################################
 class Settings():
     '''Reads/Writes settings.'''
+    # typed settings schema
+    airport_by_name = _Option(bool)
+    auto_save = _Option(bool)
+    first_airport = _Option(bool)
+    disable_map = _Option(bool)
+    currency = _Option(str)
+    splash_time = _Option(float, 'UI')
+    map_colors = _Option(list, 'UI')
+    show_airports = _Option(bool, default=False)
+    airport_types = _Option(list, default=('large_airport', 'medium_airport',
+                                           'small_airport'))
+    scheduled_only = _Option(bool, default=False)
 
     def __init__(self, file_path=r'./settings.ini'):
         '''Constructor'''
         self._file_path = file_path
         self.__defaultSection = 'SETTINGS'
         self._config = ConfigParser()
+        self._written = None
+        # (section, name): {kind: parsed value}
+        self._cache = {}
+        # (section, name): [callback]
+        self._listeners = {}
         # create the file if it doesnt exist
         if IO.exists(file_path) is False:
             self.__createCongifFile()
         self._config.read(file_path)
+        self._cache.clear()
+        # content of the file as last read or written
+        self._written = self.dumps()
 
     @property
     def defaultSection(self) -> str:
@@ -78,8 +160,7 @@ class Settings():
             section (str): section of the setting. If None: defaultSection
         Returns:
             int: int value of setting. 0 if name not found.'''
-        sect = section if section else self.__defaultSection
-        return int(float(self._config.get(sect, name)))
+        return self._get(name, section, int)
 
     def getFloat(self, name, section=None) -> float:
         '''Returns an individual setting in the given section.
@@ -89,8 +170,7 @@ class Settings():
             section (str): section of the setting. If None: defaultSection
         Returns:
             float: float value of setting. 0.0 if name not found.'''
-        sect = section if section else self.__defaultSection
-        return float(self._config.get(sect, name))
+        return self._get(name, section, float)
 
     def getBool(self, name, section=None) -> bool:
         '''Returns an individual setting in the given section.
@@ -100,9 +180,7 @@ class Settings():
             section (str): section of the setting. If None: defaultSection
         Returns:
             bool: True or False.'''
-        sect = section if section else self.__defaultSection
-        val = self._config.get(sect, name)
-        return True if val == 'True' else False
+        return self._get(name, section, bool)
 
     def getList(self, name, section=None) -> list:
         '''Returns a list inside an individual setting in the given section.
@@ -112,11 +190,24 @@ class Settings():
             section (str): section of the setting. If None: defaultSection
         Returns:
             list: list of values.'''
+        return list(self._get(name, section, list))
+
+    def _get(self, name, section, kind, default=None):
+        '''Returns a parsed setting, parses it only once. Returns default
+        if given and the setting is missing.'''
         sect = section if section else self.__defaultSection
-        return self._config.get(sect, name).split(',')
+        values = self._cache.setdefault((sect, name), {})
+        if kind not in values:
+            if default is not None and \
+                    not self._config.has_option(sect, name):
+                return default
+            values[kind] = PARSERS[kind](self._config.get(sect, name))
+        return values[kind]
 
     def setSetting(self, name, value, section=None):
         '''Updates a setting in the given section, creates it if missing.
+        Typed settings are validated first, e.g. "False" or False for
+        booleans. Listeners are notified if the value changed.
         Note that this does not update the file physically,
         call update() for that.
 
@@ -125,7 +216,35 @@ class Settings():
             value (str): The value associated with the name.
             section (str): section of setting. If None: defaultSection'''
         sect = section if section else self.__defaultSection
-        self._config.set(sect, name, str(value))
+        option = type(self).__dict__.get(name)
+        if isinstance(option, _Option) and option.section == sect:
+            value = PARSERS[option.kind](value)
+            text = ','.join(value) if option.kind is list else str(value)
+        else:
+            text = str(value)
+        old = self._config.get(sect, name, fallback=None)
+        if text == old:
+            return
+        self._config.set(sect, name, text)
+        self._cache.pop((sect, name), None)
+        for callback in list(self._listeners.get((sect, name), ())):
+            callback(value)
+
+    def add_listener(self, name, callback, section=None):
+        '''Calls callback(value) whenever the setting changes. Value is
+        typed for schema settings, e.g. bool for auto_save.
+
+        Args:
+            name (str): Setting name.
+            callback (callable): change handler.
+            section (str): section of setting. If None: defaultSection'''
+        sect = section if section else self.__defaultSection
+        self._listeners.setdefault((sect, name), []).append(callback)
+
+    def remove_listener(self, name, callback, section=None):
+        '''Removes a callback added by add_listener.'''
+        sect = section if section else self.__defaultSection
+        self._listeners.get((sect, name), []).remove(callback)
 
     def setSettingList(self, name, value, section=None):
         '''Updates a setting with a list in the given section,
@@ -136,14 +255,30 @@ class Settings():
             name (str): Setting name.
             value (list): The list associated with the name.
             section (str): section of setting. If None: defaultSection'''
-        sect = section if section else self.__defaultSection
-        value = ','.join(value)
-        self._config.set(sect, name, str(value))
+        self.setSetting(name, ','.join(value), section)
+
+    def dumps(self) -> str:
+        '''Returns the settings in config file format.'''
+        text = io.StringIO()
+        self._config.write(text)
+        return text.getvalue()
 
-    def update(self):
-        '''Dumps data into config file.'''
-        with open(self._file_path, 'w') as configfile:
-            self._config.write(configfile)
+    def update(self, text=None) -> bool:
+        '''Dumps data into config file, replacing it atomically. Does
+        nothing if settings did not change since the last update.
+
+        Args:
+            text (str): output of dumps(), lets another thread write a
+                snapshot of the settings. Current settings if None.
+        Returns:
+            bool: True if the file was written.'''
+        text = self.dumps() if text is None else text
+        if text == self._written and IO.exists(self._file_path):
+            return False
+        with IO.atomic_write(self._file_path) as configfile:
+            configfile.write(text)
+        self._written = text
+        return True
 
     def __createCongifFile(self):
         '''Creates a confing file with default values.'''
@@ -159,6 +294,11 @@ class Settings():
         self.setSetting('first_airport', True)
         self.setSetting('disable_map', False)
         self.setSetting('currency', 'EUR')
+        self.setSetting('show_airports', False)
+        self.setSettingList('airport_types', ['large_airport',
+                                              'medium_airport',
+                                              'small_airport'])
+        self.setSetting('scheduled_only', False)
         # UI
         self.setSetting('title', 'Fuel Management System', 'UI')
         self.setSetting('splash_time', '2.0', 'UI')
@@ -215,14 +355,7 @@ class Settings():
                         r'./assets/about1.jpg',
                         r'./assets/about2.jpg',
                         r'./assets/about3.jpg']
-        markers = [r'./assets/marker1.png',
-                   r'./assets/marker2.png',
-                   r'./assets/marker3.png',
-                   r'./assets/marker4.png',
-                   r'./assets/marker5.png',
-                   r'./assets/marker6.png']
         self.setSettingList('about_images', about_images, 'ASSETS')
-        self.setSettingList('markers', markers, 'ASSETS')
         # Data
         self.setSetting('aircrafts', r'./data/aircrafts.csv', 'DATA')
         self.setSetting('data', r'./data/traveldata.csv', 'DATA')
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+This module handles data storage in sqlite. Same interface as DataStore
+plus indexed queries by travel week, aircraft and airports.
+'''
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from data.data_storage import DataStore, HEADERS, parse_week, \
+    validate_data
+from util import timing
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS trips (
+    travel_week TEXT PRIMARY KEY,
+    year INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    mode TEXT,
+    aircraft TEXT,
+    shortest_route TEXT,
+    shortest_dist REAL,
+    eco_route TEXT,
+    eco_route_cost REAL);
+CREATE INDEX IF NOT EXISTS trips_week ON trips (year, week);
+CREATE INDEX IF NOT EXISTS trips_aircraft ON trips (aircraft);
+CREATE TABLE IF NOT EXISTS trip_airports (
+    travel_week TEXT NOT NULL REFERENCES trips ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    iata_code TEXT NOT NULL,
+    PRIMARY KEY (travel_week, position));
+CREATE INDEX IF NOT EXISTS trip_airports_code
+    ON trip_airports (iata_code, travel_week);
+CREATE TABLE IF NOT EXISTS results (
+    travel_week TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    result TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+'''
+COLUMNS = ('travel_week', 'mode', 'aircraft', 'shortest_route',
+           'shortest_dist', 'eco_route', 'eco_route_cost')
+
+
+###############################################################################
+class SQLiteDataStore(Mapping):
+    '''Reads and writes travel data to a sqlite database. Could be used like
+    DataStore: store['2016 Week 13'], week in store, add, save, map_data.'''
+    def __init__(self, file_path, csv_path=None):
+        '''Constructor.
+
+        Args:
+            file_path (str): Path to database file, created if missing.
+            csv_path (str): csv data file imported once, if given.'''
+        self._file_path = file_path
+        # save may be called by a background writer, see persistence
+        self._db = sqlite3.connect(file_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._db.execute('PRAGMA foreign_keys = ON')
+        self._db.executescript(SCHEMA)
+        if csv_path is not None:
+            self.import_csv(csv_path)
+
+    def close(self):
+        '''Commits pending records and closes the database.'''
+        self.save()
+        self._db.close()
+
+    def import_csv(self, csv_path) -> int:
+        '''Imports a csv data file (and its journal) unless already done.
+
+        Args:
+            csv_path (str): path to DataStore csv file.
+        Returns:
+            int: number of imported records.'''
+        key = 'imported:' + csv_path
+        if self._db.execute('SELECT 1 FROM meta WHERE key = ?',
+                            (key,)).fetchone():
+            return 0
+        count = 0
+        for week, data in DataStore(csv_path).items():
+            if week not in self:
+                self.add(data)
+                count += 1
+        self._db.execute('INSERT INTO meta VALUES (?, ?)', (key, str(count)))
+        self.save()
+        return count
+
+    def add(self, data):
+        '''Checks validity of data and adds data to current data.
+        Note that if data already exists the record will be ignored.
+        Records are written to disk by save().
+
+        Args:
+            data (dict): New data dict.'''
+        week = data['travel_week']
+        if week in self:
+            return
+        validate_data(data)
+        year, wk = parse_week(week)
+        airports = data['airports']
+        if isinstance(airports, str):
+            airports = airports.upper().split()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO trips VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (week, year, wk, data['mode'], str(data['aircraft']),
+                 str(data['shortest_route']), float(data['shortest_dist']),
+                 str(data['eco_route']), float(data['eco_route_cost'])))
+            self._db.executemany(
+                'INSERT INTO trip_airports VALUES (?, ?, ?)',
+                ((week, pos, code) for pos, code in enumerate(airports)))
+
+    def add_result(self, week, result, version):
+        '''Stores the full routing result of a week, replaces older ones.
+
+        Args:
+            week (str): travel week.
+            result (dict): see ComplexRoute.result
+            version (str): data version the result depends on.'''
+        result = json.dumps(result, separators=(',', ':'))
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                (week, version, result))
+
+    def get_result(self, week, version):
+        '''Returns the stored routing result of a week if version matches.
+
+        Args:
+            week (str): travel week.
+            version (str): current data version.
+        Returns:
+            dict: stored result, None if missing or stale.'''
+        row = self._db.execute(
+            'SELECT result FROM results WHERE travel_week = ? AND '
+            'version = ?', (week, version)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @timing.traced('SQLiteDataStore.save', 'io')
+    def save(self):
+        '''Commits records added since last save.'''
+        with self._lock:
+            self._db.commit()
+
+    def map_data(self, data) -> dict:
+        '''Maps an iterable to a dict with proper keys.
+
+        Args:
+            data (list): list of data, lenght must match headers.
+        Returns:
+            dict: mapped data.
+        '''
+        if len(data) != len(HEADERS):
+            raise Exception('Lenght of data does not match the headers')
+        return dict(zip(HEADERS, data))
+
+    def query(self, week_from=None, week_to=None, aircraft=None,
+              airports=()):
+        '''Iterates records matching all the given conditions, ordered by
+        travel week. e.g. every trip through JFK with an A321:
+        store.query(aircraft='Airbus A321', airports=['JFK'])
+
+        Args:
+            week_from (str): first travel week, e.g. "2016 Week 1"
+            week_to (str): last travel week, inclusive.
+            aircraft (str): aircraft name, e.g. "Airbus A321"
+            airports (iterable): iata codes that must all be visited.
+        Yields:
+            dict: records like DataStore values.'''
+        where, args = [], []
+        if week_from is not None:
+            where.append('(year, week) >= (?, ?)')
+            args += parse_week(week_from)
+        if week_to is not None:
+            where.append('(year, week) <= (?, ?)')
+            args += parse_week(week_to)
+        if aircraft is not None:
+            where.append('aircraft = ?')
+            args.append(aircraft)
+        for code in airports:
+            where.append('travel_week IN (SELECT travel_week FROM '
+                         'trip_airports WHERE iata_code = ?)')
+            args.append(code.upper())
+        sql = 'SELECT {} FROM trips'.format(', '.join(COLUMNS))
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY year, week'
+        for row in self._db.execute(sql, args):
+            yield self.__record(row)
+
+    def __airports(self, week) -> list:
+        return [code for code, in self._db.execute(
+            'SELECT iata_code FROM trip_airports WHERE travel_week = ? '
+            'ORDER BY position', (week,))]
+
+    def __record(self, row) -> dict:
+        '''Builds a DataStore like record out of a trips row.'''
+        rec = dict(zip(COLUMNS, row))
+        rec['airports'] = self.__airports(rec['travel_week'])
+        return {key: rec[key] for key in HEADERS}
+
+    def __getitem__(self, week) -> dict:
+        row = self._db.execute(
+            'SELECT {} FROM trips WHERE travel_week = ?'.format(
+                ', '.join(COLUMNS)), (week,)).fetchone()
+        if row is None:
+            raise KeyError(week)
+        return self.__record(row)
+
+    def __contains__(self, week):
+        return self._db.execute('SELECT 1 FROM trips WHERE travel_week = ?',
+                                (week,)).fetchone() is not None
+
+    def __iter__(self):
+        return (week for week, in self._db.execute(
+            'SELECT travel_week FROM trips ORDER BY year, week'))
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM trips').fetchone()[0]
@@ -2,19 +2,71 @@
 # -*- coding: utf-8 -*-
 '''
 Fuel Management Software Main Module.
+Usage:
+    python main.py --timings
+    python main.py --timings startup.log --profile profile
+    python main.py --trace trace.json
 @since:28/04/2016
 @author:Tirdad Kiafar
 '''
-from ctrl.app import App
+import argparse
 import os
+from contextlib import nullcontext
+from util import timing, trace
 if os.name == 'nt':
     import ctypes
 myappid = 'tkiafar.fuelmanagement.1.0.0'
 
 
-def main():
-    # Create Application main controller which extends root tkinter object.
-    root = App()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('--timings', nargs='?', const='-', metavar='FILE',
+                        help='print startup phase timings on exit, to '
+                        'stderr or appended to FILE')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='write cProfile stats of startup and of the '
+                        'first routing to DIR')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write a Chrome trace of routing, i/o and ui '
+                        'events to FILE on exit')
+    args = parser.parse_args(argv)
+    if args.timings:
+        timing.enable()
+    if args.trace:
+        trace.start()
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+        startup = timing.profile(os.path.join(args.profile, 'startup.prof'))
+    else:
+        startup = nullcontext()
+    try:
+        run(startup, args.profile)
+    finally:
+        if args.trace:
+            trace.save(args.trace)
+        if args.timings == '-':
+            timing.report()
+        elif args.timings:
+            with open(args.timings, 'a', encoding='utf-8') as log:
+                timing.report(log)
+
+
+def run(startup=nullcontext(), profile_dir=None):
+    '''Builds the app window and enters mainloop.
+
+    Args:
+        startup (context): wraps building the window, e.g. a profiler.
+        profile_dir (str): first routing is profiled into it if given.'''
+    with startup, timing.span('startup'):
+        with timing.span('imports'):
+            from ctrl.app import App
+        # Create Application main controller which extends root tkinter
+        # object.
+        root = App(profile_dir=profile_dir)
+    # first idle moment, the window is on screen
+    root.after_idle(timing.mark, 'window shown', 'ui')
     # trying to register app window on taskbar on windows
     if os.name == 'nt':
         # SetCurrentProcessExplicitAppUserModelID function:
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Fuel Management headless report maps.
+Renders a png route map per travel data week or per itinerary in a
+process pool. Every worker loads the map once and reuses its background.
+Usage:
+    python report.py --store data/traveldata.csv -o reports -j 4
+    python report.py --itineraries itineraries.csv -o reports
+@since:19/10/2026
+@author:Tirdad Kiafar
+'''
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from data.data_storage import open_store, parse_route
+from data.itinerary import Datasets, Itinerary, read_rows, parse_row
+from data.settings import Settings
+from view.render import MapRenderer
+from view.tiles import TileCache
+
+# datasets, renderer and leg colors of the current process
+_datasets = None
+_renderer = None
+_colors = None
+
+
+def _init_worker(settings_path, width, height, dpi):
+    '''Loads datasets and the map once per worker. Forked workers inherit
+    the ones already loaded by the parent.'''
+    global _datasets, _renderer, _colors
+    if _datasets is None:
+        _datasets = Datasets(settings_path)
+        _colors = Settings(file_path=settings_path).map_colors
+        _renderer = MapRenderer(width, height, dpi, tiles=TileCache())
+
+
+def file_name(record, index) -> str:
+    '''Returns the image file name of a record, e.g. 2016_Week_19.png'''
+    week = record.get('travel_week')
+    if not week:
+        return 'itinerary_{:04d}.png'.format(index + 1)
+    return re.sub(r'\W+', '_', week).strip('_') + '.png'
+
+
+def route_points(record, airports) -> list:
+    '''Returns (lat, lon) points of the economic route of a record, or of
+    the shortest one if no economic route was found.
+
+    Args:
+        record (dict): DataStore like record.
+        airports (AirportAtlas): airports by iata code.'''
+    codes = record['airports']
+    if isinstance(codes, str):
+        codes = codes.split()
+    route = parse_route(record['eco_route']) or \
+        parse_route(record['shortest_route'])
+    points = []
+    for node in route:
+        airp = airports(codes[node])
+        points.append((airp.latitude, airp.longitude))
+    return points
+
+
+def _render(job) -> tuple:
+    '''Renders the map of a record or an itinerary in the current process.
+
+    Args:
+        job (tuple): (index, record, output directory), see run.
+    Returns:
+        tuple: (label, file path or None, error message or None, sec)'''
+    start = time.perf_counter()
+    index, record, directory = job
+    label = 'map {}'.format(index + 1)
+    try:
+        if isinstance(record, Itinerary):
+            record = _datasets.record(record)
+        elif not isinstance(record, dict):
+            # a raw row of read_rows, parsed here so it fails alone
+            line, row = record
+            label = 'line {}'.format(line)
+            record = _datasets.record(parse_row(row))
+        path = os.path.join(directory, file_name(record, index))
+        _renderer.clear_routes()
+        _renderer.draw_routes([route_points(record, _datasets.airports)],
+                              _colors)
+        _renderer.add_title('{}  {}'.format(record.get('travel_week', ''),
+                                            record['aircraft']).strip())
+        _renderer.save(path)
+        error = None
+    except (KeyError, ValueError, IndexError) as err:
+        path, error = None, err.args[0] if err.args else str(err)
+    return label, path, error, time.perf_counter() - start
+
+
+def run(records, directory, jobs=None, chunksize=4,
+        settings_path=r'./data/settings.ini', width=1000, height=500,
+        dpi=100) -> dict:
+    '''Renders a map per record into directory.
+
+    Args:
+        records (iterable): DataStore records, Itinerary tuples or
+            (line number, row) of read_rows.
+        directory (str): output directory, created if missing.
+        jobs (int): worker processes, 0 renders in this process.
+            None uses one per cpu.
+        chunksize (int): records sent to a worker at once.
+        settings_path (str): settings file listing the data files.
+        width (int): image width in pixels.
+        height (int): image height in pixels.
+        dpi (int): pixels per inch.
+    Returns:
+        dict: counts and timings.'''
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    # load once in parent, forked workers reuse these
+    options = (settings_path, width, height, dpi)
+    _init_worker(*options)
+    load_time = time.perf_counter() - start
+    records = ((index, record, directory)
+               for index, record in enumerate(records))
+    pool = None
+    count = failed = 0
+    render_time = 0.0
+    try:
+        if jobs == 0:
+            results = map(_render, records)
+        else:
+            pool = ProcessPoolExecutor(max_workers=jobs,
+                                       initializer=_init_worker,
+                                       initargs=options)
+            results = pool.map(_render, records, chunksize=chunksize)
+        for label, path, error, sec in results:
+            count += 1
+            render_time += sec
+            if error is not None:
+                failed += 1
+                print('{}: {}'.format(label, error), file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+    return {'maps': count,
+            'failed': failed,
+            'load_sec': load_time,
+            'wall_sec': elapsed,
+            'per_sec': count / elapsed if elapsed else 0,
+            'mean_ms': 1000 * render_time / count if count else 0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--store', help='travel data, csv or sqlite')
+    source.add_argument('--itineraries', help='itineraries, csv or jsonl')
+    parser.add_argument('--weeks', nargs='*',
+                        help='travel weeks of the store, all if missing')
+    parser.add_argument('-o', '--output', default='reports',
+                        help='output directory')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes, 0 to run inline')
+    parser.add_argument('--chunksize', type=int, default=4)
+    parser.add_argument('--size', type=int, nargs=2, default=(1000, 500),
+                        metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--settings', default=r'./data/settings.ini')
+    args = parser.parse_args(argv)
+    if args.store:
+        store = open_store(args.store)
+        weeks = args.weeks if args.weeks else list(store)
+        records = [dict(store[week]) for week in weeks if week in store]
+    else:
+        # rows are parsed by _render, a bad row fails alone
+        records = read_rows(args.itineraries)
+    stats = run(records, args.output, args.jobs, args.chunksize,
+                args.settings, args.size[0], args.size[1], args.dpi)
+    print('{maps} maps ({failed} failed) in {wall_sec:.2f}s, map loaded in '
+          '{load_sec:.3f}s, {per_sec:.1f}/s, mean render '
+          '{mean_ms:.1f}ms'.format(**stats), file=sys.stderr)
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
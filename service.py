@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Fuel Management routing service.
+A local asyncio HTTP/JSON server that loads the datasets once and routes
+in a process pool. Usage:
+    python service.py --port 8080 -j 4
+
+Endpoints:
+    POST /route         itinerary json, see data.itinerary.parse_itinerary.
+                        optional "timeout" in seconds limits the wait.
+    GET  /nearest       ?lat=53.4&lon=-6.2&count=5[&type=large_airport]
+    GET  /autocomplete  ?q=dub&limit=10[&by=code]
+    GET  /health, /stats
+@since:19/10/2026
+@author:Tirdad Kiafar
+'''
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from data.itinerary import Datasets, parse_itinerary, serialize, \
+    FORMAT_JSONL
+from data.columnar import ColumnarAtlas
+from data.search import PrefixIndex
+# largest request body accepted, itineraries are tiny
+MAX_BODY = 1 << 16
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+          405: 'Method Not Allowed', 413: 'Payload Too Large',
+          500: 'Internal Server Error', 504: 'Gateway Timeout'}
+
+# datasets of worker processes
+_datasets = None
+
+
+def _init_worker(settings_path):
+    '''Loads datasets once per worker. Forked workers inherit the ones
+    already loaded by the service.'''
+    global _datasets
+    if _datasets is None:
+        _datasets = Datasets(settings_path)
+
+
+def _solve(itinerary) -> dict:
+    '''Routes one itinerary in a worker process.'''
+    return serialize(_datasets.record(itinerary), FORMAT_JSONL)
+
+
+class HTTPError(Exception):
+    '''Raised by handlers to answer with an error status.'''
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+###############################################################################
+class RoutingService:
+    '''Routing service sharing in-memory datasets between requests.'''
+    def __init__(self, settings_path=r'./data/settings.ini', jobs=None,
+                 timeout=10.0):
+        '''Constructor. Loads the datasets and starts the process pool.
+
+        Args:
+            settings_path (str): settings file listing the data files.
+            jobs (int): routing worker processes, None for one per cpu.
+            timeout (float): default and maximum time budget of a routing
+                request, in seconds.'''
+        _init_worker(settings_path)
+        self._datasets = _datasets
+        self._timeout = timeout
+        self._atlas = ColumnarAtlas.from_airports(
+            self._datasets.airports.values())
+        airports = self._datasets.airports
+        self._by_name = PrefixIndex(airports.names, airports.codes)
+        self._by_code = PrefixIndex(airports.codes, airports.names)
+        self._pool = ProcessPoolExecutor(max_workers=jobs,
+                                         initializer=_init_worker,
+                                         initargs=(settings_path,))
+        # identical routing requests in flight share one job
+        self._inflight = {}
+        self._stats = {'requests': 0, 'routed': 0, 'coalesced': 0,
+                       'timeouts': 0, 'errors': 0}
+        self._started = time.time()
+
+    def close(self):
+        '''Stops the process pool.'''
+        self._pool.shutdown(cancel_futures=True)
+
+    # Handlers ----------------------------------------------------------------
+    async def route(self, query, body) -> dict:
+        '''Routes an itinerary within its time budget.'''
+        try:
+            request = json.loads(body.decode('utf-8'))
+            itinerary = parse_itinerary(request)
+            budget = min(float(request.get('timeout', self._timeout)),
+                         self._timeout)
+        except (ValueError, TypeError, AttributeError) as err:
+            raise HTTPError(400, str(err))
+        job = self._inflight.get(itinerary)
+        if job is None:
+            loop = asyncio.get_running_loop()
+            job = loop.run_in_executor(self._pool, _solve, itinerary)
+            self._inflight[itinerary] = job
+            job.add_done_callback(
+                lambda fut: self._inflight.pop(itinerary, None))
+            self._stats['routed'] += 1
+        else:
+            self._stats['coalesced'] += 1
+        try:
+            # shield keeps the shared job alive if this request gives up
+            return await asyncio.wait_for(asyncio.shield(job), budget)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            raise HTTPError(504, 'Routing exceeded {}s'.format(budget))
+        except KeyError as err:
+            raise HTTPError(404, err.args[0] if err.args else str(err))
+
+    async def nearest(self, query, body) -> dict:
+        '''Returns airports closest to a position.'''
+        try:
+            lat = float(query['lat'][0])
+            lon = float(query['lon'][0])
+            count = max(1, min(int(query.get('count', ['1'])[0]), 100))
+        except (KeyError, ValueError):
+            raise HTTPError(400, 'lat and lon are required numbers')
+        dist = self._atlas.distances(lat, lon)
+        if 'type' in query:
+            dist = np.where(self._atlas.mask(type=query['type']), dist,
+                            np.inf)
+        count = min(count, len(dist))
+        rows = np.argpartition(dist, count - 1)[:count]
+        rows = rows[np.argsort(dist[rows])]
+        return {'airports': [dict(self.__airport(row),
+                                  distance=float(dist[row]))
+                             for row in rows if np.isfinite(dist[row])]}
+
+    async def autocomplete(self, query, body) -> dict:
+        '''Returns airports whose name (or code) starts with q.'''
+        prefix = query.get('q', [''])[0]
+        try:
+            limit = max(1, min(int(query.get('limit', ['10'])[0]), 100))
+        except ValueError:
+            raise HTTPError(400, 'limit has to be a number')
+        if not prefix:
+            return {'airports': []}
+        by_code = query.get('by', ['name'])[0] == 'code'
+        index = self._by_code if by_code else self._by_name
+        hits = index.search(prefix, limit)
+        if by_code:
+            hits = [(name, code) for code, name in hits]
+        return {'airports': [{'name': name, 'iata_code': code}
+                             for name, code in hits]}
+
+    async def health(self, query, body) -> dict:
+        return {'status': 'ok', 'airports': len(self._atlas)}
+
+    async def stats(self, query, body) -> dict:
+        return dict(self._stats, inflight=len(self._inflight),
+                    uptime=time.time() - self._started)
+
+    def __airport(self, row) -> dict:
+        airp = self._atlas.airport(int(row))
+        return {'iata_code': airp.iata_code, 'name': airp.name,
+                'country': airp.country, 'latitude': airp.latitude,
+                'longitude': airp.longitude, 'type': airp.type}
+
+    # HTTP --------------------------------------------------------------------
+    def __resolve(self, method, path):
+        '''Returns the handler of a request.'''
+        routes = {'/route': ('POST', self.route),
+                  '/nearest': ('GET', self.nearest),
+                  '/autocomplete': ('GET', self.autocomplete),
+                  '/health': ('GET', self.health),
+                  '/stats': ('GET', self.stats)}
+        if path not in routes:
+            raise HTTPError(404, 'Unknown path ' + path)
+        expected, handler = routes[path]
+        if method != expected:
+            raise HTTPError(405, path + ' expects ' + expected)
+        return handler
+
+    async def handle(self, reader, writer):
+        '''Serves http requests of one connection, keep-alive aware.'''
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self.__respond(writer, 400, {
+                        'error': 'Invalid Content-Length'}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.__respond(writer, 413, {'error': 'Too large'},
+                                         False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = headers.get('connection', '').lower() != \
+                    'close' and version == 'HTTP/1.1'
+                url = urlsplit(target)
+                self._stats['requests'] += 1
+                try:
+                    handler = self.__resolve(method, url.path)
+                    status, payload = 200, await handler(
+                        parse_qs(url.query), body)
+                except HTTPError as err:
+                    status, payload = err.status, {'error': str(err)}
+                except Exception as err:
+                    status, payload = 500, {'error': repr(err)}
+                if status != 200:
+                    self._stats['errors'] += 1
+                await self.__respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode('utf-8')
+        head = 'HTTP/1.1 {} {}\r\nContent-Type: application/json\r\n' \
+            'Content-Length: {}\r\nConnection: {}\r\n\r\n'.format(
+                status, STATUS.get(status, ''), len(data),
+                'keep-alive' if keep_alive else 'close')
+        writer.write(head.encode('latin-1') + data)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        '''Serves until cancelled.'''
+        server = await asyncio.start_server(self.handle, host, port,
+                                            backlog=1024)
+        print('Routing service on http://{}:{}'.format(host, port),
+              file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='routing worker processes')
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help='maximum routing time budget in seconds')
+    parser.add_argument('--settings', default=r'./data/settings.ini')
+    args = parser.parse_args(argv)
+    service = RoutingService(args.settings, args.jobs, args.timeout)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
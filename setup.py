@@ -18,6 +18,6 @@ setup(
     author_email='kiafr@gmail.com',
     url='',
     license=license,
-    packages=find_packages(exclude=('tests', 'docs'))
+    packages=find_packages(exclude=('tests', 'docs', 'benchmarks'))
 )
 
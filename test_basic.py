@@ -4,11 +4,41 @@ Basic unittest for fuel management app.
 @since:04/05/2016
 @author:Tirdad Kiafar
 '''
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
 import unittest
+import numpy as np
+from matplotlib.figure import Figure
 from data.airport import AirportAtlas
 from data.aircraft import Aircrafts
 from data.fuelprice import FuelMap
-from data.router import Route, ComplexRoute, ROUTE_DYNAMIC
+from data.router import Route, ComplexRoute, StoredRoute, ROUTE_DYNAMIC, \
+    set_stats
+from data.fileIO import Snapshot
+from data.columnar import ColumnarAtlas, Categorical
+from util import importtime, timing, trace
+from data.itinerary import Datasets, parse_itinerary, read_rows
+import batch
+import report
+from service import RoutingService
+from data.search import PrefixIndex
+from data.data_storage import DataStore, HEADERS, JOURNAL_EXT, \
+    RESULTS_EXT, open_store, iter_records
+from data.sqlite_storage import SQLiteDataStore
+from data.persistence import BackgroundWriter
+from data.settings import Settings
+from view import geometry, tiles
+from view.render import MapRenderer
+from view.airportlayer import AirportLayer
+from data.geo import great_circles, distances, range_circle
+from benchmarks import harness, scaling
+DATA_PATH = r'./data/traveldata.csv'
 AIRPORT_PATH = r'./data/airports.csv'
 AIRCRAFT_PATH = r'./data/aircrafts.csv'
 FUEL_PATH = r'./data/fuelprice.csv'
@@ -33,11 +63,84 @@ class TestComponents(BasicTestSuite):
         self.assertEqual(round(dub.longitude, 2), -6.27,
                          'Wrong Airport Longitude')
 
+    def testNearestAirport(self):
+        airports = list(self.airportAtlas.values())
+        lats = np.array([airp.latitude for airp in airports])
+        lons = np.array([airp.longitude for airp in airports])
+        rand = np.random.RandomState(7)
+        for lat, lon in zip(rand.uniform(-90, 90, 200),
+                            rand.uniform(-180, 180, 200)):
+            airp = self.airportAtlas.nearest(lat, lon)
+            best = np.min((lats - lat) ** 2 + (lons - lon) ** 2)
+            self.assertAlmostEqual((airp.latitude - lat) ** 2 +
+                                   (airp.longitude - lon) ** 2, best)
+        self.assertEqual(self.airportAtlas.nearest(53.4, -6.3).iata_code,
+                         'DUB')
+        self.assertIsNone(self.airportAtlas.nearest(0, -150, max_dist=1))
+
+    def testReach(self):
+        dub = self.airportAtlas('DUB')
+        a321 = self.aircrafts('A321')
+        reach = self.airportAtlas.within(dub.latitude, dub.longitude,
+                                         a321.max_range)
+        expected = [airp for airp in self.airportAtlas.values()
+                    if Route.calcDistance(
+                        (dub.latitude, dub.longitude),
+                        (airp.latitude, airp.longitude)) <= a321.max_range]
+        self.assertEqual(set(reach), set(expected))
+        self.assertIn(self.airportAtlas('JFK'), reach)
+        self.assertNotIn(self.airportAtlas('SYD'), reach)
+
+    def testAirportLayer(self):
+        axes = Figure(figsize=(10, 5)).add_axes((0, 0, 1, 1))
+        axes.set_xlim(-180, 180)
+        axes.set_ylim(-90, 90)
+        layer = AirportLayer(axes, self.airportAtlas.values())
+        self.assertFalse(layer.visible)
+        layer.visible = True
+        world = layer.shown
+        # thinned to one airport per cell, most important first
+        self.assertLess(len(world), len(self.airportAtlas) / 4)
+        self.assertIn(self.airportAtlas('JFK'), world)
+        axes.set_xlim(-10, 0)
+        axes.set_ylim(50, 55)
+        layer.update()
+        self.assertIn(self.airportAtlas('DUB'), layer.shown)
+        self.assertTrue(all(-10 <= airp.longitude <= 0 and
+                            50 <= airp.latitude <= 55
+                            for airp in layer.shown))
+        self.assertTrue(any(airp.type == 'small_airport'
+                            for airp in layer.shown))
+        layer.set_filter(['large_airport'], scheduled=True)
+        self.assertTrue(all(airp.type == 'large_airport' and
+                            airp.scheduled_service == 'yes'
+                            for airp in layer.shown))
+
     def testAircraft(self):
         b757 = self.aircrafts('757-200')
         self.assertEqual(int(b757.fuel_capacity), 43403,
                          'Wrong Aircraft Fuel Capacity')
 
+    def testHeadlessImports(self):
+        for module in ('data.router', 'data.data_storage', 'util.util'):
+            self.assertEqual(
+                importtime.gui_modules(importtime.measure(module)), [],
+                module + ' loads gui packages')
+
+    def testPrefixIndex(self):
+        index = PrefixIndex(self.airportAtlas.names, self.airportAtlas.codes)
+        hits = index.search('dublin a', limit=None)
+        self.assertIn(('Dublin Airport', 'DUB'), hits)
+        self.assertEqual(len(index.search('d', limit=3)), 3)
+        self.assertEqual(index.search('no such airport'), [])
+
+    def testRecords(self):
+        dub = self.airportAtlas('DUB')
+        self.assertFalse(hasattr(dub, '__dict__'), 'Airport is not slotted')
+        self.assertEqual(len({dub, self.airportAtlas('DUB')}), 1)
+        self.assertNotEqual(dub, self.airportAtlas('JFK'))
+        self.assertIs(dub.continent, self.airportAtlas('ORK').continent)
+
     def testFuelPrice(self):
         us = self.fuelMap('US')
         self.assertEqual(us.price, 0.2487,
@@ -61,5 +164,662 @@ class TestComponents(BasicTestSuite):
         self.assertEqual(self.route.eco_route_cost, -1,
                          'Wrong Cost Calculations')
 
+    def testRouteStats(self):
+        airports = [self.airportAtlas(code) for code in
+                    ('DUB', 'JFK', 'CCS', 'IKA', 'SYD')]
+        aircraft = self.aircrafts('757-200')
+        self.assertIsNone(ComplexRoute(airports, aircraft, self.fuelMap,
+                                       ROUTE_DYNAMIC).stats)
+        calls = []
+        distance = Route.calcDistance
+        Route.calcDistance = staticmethod(
+            lambda pt1, pt2: calls.append(1) or distance(pt1, pt2))
+        set_stats(True)
+        try:
+            router = ComplexRoute(airports, aircraft, self.fuelMap,
+                                  ROUTE_DYNAMIC)
+        finally:
+            Route.calcDistance = staticmethod(distance)
+            set_stats(False)
+        stats = router.stats
+        self.assertEqual(stats.distance_calls, len(calls))
+        self.assertEqual(stats.evaluated, router.route_count)
+        self.assertEqual(stats.generated - stats.filtered, router.route_count)
+        # the aircraft can not fly the whole itinerary
+        self.assertEqual(stats.range_rejected, router.route_count)
+        self.assertEqual(list(stats.phases)[-1], 'route_costs')
+        self.assertAlmostEqual(stats.total, sum(stats.phases.values()))
+
+class TestSnapshot(unittest.TestCase):
+    '''Testing compiled data snapshots and their invalidation.'''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'aircrafts.csv')
+        shutil.copy(AIRCRAFT_PATH, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def testSnapshotReload(self):
+        first = Aircrafts(self.path)
+        self.assertTrue(os.path.exists(Snapshot(self.path, 'aircrafts').path))
+        second = Aircrafts(self.path)
+        self.assertEqual(first.codes, second.codes)
+        self.assertEqual(int(second('757-200').fuel_capacity), 43403)
+
+    def testSnapshotInvalidation(self):
+        Aircrafts(self.path)
+        with open(self.path, 'a') as data:
+            data.write('X100,jet,metric,Test,1000,2000\n')
+        self.assertIn('X100', Aircrafts(self.path).codes)
+
+class TestColumnarAtlas(BasicTestSuite):
+    '''Testing the columnar atlas against the object based one.'''
+    def setUp(self):
+        super().setUp()
+        self.columns = ColumnarAtlas(AIRPORT_PATH)
+
+    def testMaterialisedAirport(self):
+        self.assertEqual(len(self.columns), len(self.airportAtlas))
+        self.assertEqual(self.columns('dub'), self.airportAtlas('DUB'))
+        self.assertEqual(self.columns.get_by_name('dublin airport'),
+                         self.airportAtlas.get_by_name('Dublin Airport'))
+
+    def testVectorizedQueries(self):
+        dub = self.airportAtlas('DUB')
+        dist = self.columns.distances(dub.latitude, dub.longitude)
+        jfk = self.columns.row('JFK')
+        self.assertEqual(int(dist[jfk]), 5103, 'Wrong Distance Calculations')
+        self.assertEqual(self.columns.find_closest(53.4, -6.3),
+                         self.airportAtlas.find_closest(53.4, -6.3))
+        rows = self.columns.within(dub.latitude, dub.longitude, 100,
+                                   self.columns.mask(iso_country='IE'))
+        self.assertIn(self.columns.row('DUB'), rows)
+        for airp in self.columns.airports(rows):
+            self.assertEqual(airp.iso_country, 'IE')
+
+    def testManyLevels(self):
+        values = [str(i) for i in range(40000)] + ['0']
+        column = Categorical(values)
+        self.assertEqual(column[40000], '0')
+        self.assertEqual(column[39999], '39999')
+        self.assertEqual(list(np.flatnonzero(column.mask('0'))), [0, 40000])
+
+class TestItinerary(unittest.TestCase):
+    '''Testing headless routing of itineraries.'''
+    def testRecord(self):
+        datasets = Datasets()
+        itin = parse_itinerary({'airports': 'dub jfk ccs ika syd',
+                                'aircraft': 'Boeing 757-200',
+                                'week': '2016 Week 1'})
+        self.assertEqual(itin.airports, ('DUB', 'JFK', 'CCS', 'IKA', 'SYD'))
+        record = datasets.record(itin)
+        self.assertEqual(record['travel_week'], '2016 Week 1')
+        self.assertEqual(record['eco_route_cost'], -1)
+        self.assertRaises(ValueError, parse_itinerary, {'airports': 'DUB'})
+
+    def testBadRows(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'itineraries.csv')
+            with open(path, 'w') as data:
+                data.write('airports,aircraft,mode\n'
+                           'DUB LHR,A321,bogus\n'
+                           ',A321,static\n'
+                           'DUB LHR,A321,static\n')
+            output = io.StringIO()
+            with contextlib.redirect_stderr(io.StringIO()) as errors:
+                stats = batch.run(path, output, jobs=0)
+            # values of the wrong type fail alone too
+            path = os.path.join(tmp, 'itineraries.jsonl')
+            with open(path, 'w') as data:
+                data.write('{"airports": 5, "aircraft": "A321"}\n'
+                           '{"airports": ["DUB", 7], "aircraft": "A321"}\n'
+                           '{"airports": "DUB LHR", "aircraft": 321}\n'
+                           '{"airports": "DUB LHR", "aircraft": "A321", '
+                           '"week": 2016}\n'
+                           '{"airports": "DUB LHR", "aircraft": "A321"}\n')
+            typed = io.StringIO()
+            with contextlib.redirect_stderr(io.StringIO()) as type_errors:
+                typed_stats = batch.run(path, typed, jobs=0)
+        finally:
+            shutil.rmtree(tmp)
+        self.assertEqual((stats['itineraries'], stats['failed']), (3, 2))
+        self.assertEqual(len(output.getvalue().splitlines()), 2)
+        self.assertIn('line 3:', errors.getvalue())
+        self.assertEqual((typed_stats['itineraries'], typed_stats['failed']),
+                         (5, 4))
+        self.assertEqual(len(typed.getvalue().splitlines()), 2)
+        self.assertIn('line 4: week has to be a string',
+                      type_errors.getvalue())
+
+    def testBadReportRows(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'itineraries.jsonl')
+            with open(path, 'w') as data:
+                data.write('[1]\n'
+                           '{"airports": "DUB LHR", "aircraft": "A321"}\n'
+                           '\n'
+                           'not json\n'
+                           '{"airports": 5, "aircraft": "A321"}\n'
+                           '{"airports": "DUB LHR", "aircraft": ["A321"]}\n')
+            with contextlib.redirect_stderr(io.StringIO()) as errors:
+                stats = report.run(read_rows(path),
+                                   os.path.join(tmp, 'maps'), jobs=0)
+            maps = os.listdir(os.path.join(tmp, 'maps'))
+        finally:
+            shutil.rmtree(tmp)
+        self.assertEqual((stats['maps'], stats['failed']), (5, 4))
+        self.assertEqual(maps, ['itinerary_0002.png'])
+        for line in (1, 4, 5, 6):
+            self.assertIn('line {}:'.format(line), errors.getvalue())
+
+
+class TestService(unittest.TestCase):
+    '''Testing the routing service over a local connection.'''
+    ROUTE = {'airports': 'DUB LHR JFK', 'aircraft': 'A321',
+             'week': '2016 Week 1'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = RoutingService(jobs=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.close()
+
+    def request(self, *raw):
+        '''Sends raw http requests to the service on an ephemeral port.
+
+        Returns:
+            list: (status, payload) of each request.'''
+        async def exchange():
+            server = await asyncio.start_server(self.service.handle,
+                                                '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            replies = []
+            async with server:
+                for data in raw:
+                    reader, writer = await asyncio.open_connection(
+                        '127.0.0.1', port)
+                    writer.write(data)
+                    await writer.drain()
+                    head, _, body = (await reader.read()).partition(
+                        b'\r\n\r\n')
+                    writer.close()
+                    replies.append((int(head.split()[1]), json.loads(body)))
+            return replies
+        return asyncio.run(exchange())
+
+    def post(self, payload, length=None):
+        body = json.dumps(payload).encode('utf-8')
+        return 'POST /route HTTP/1.1\r\nContent-Length: {}\r\n' \
+            'Connection: close\r\n\r\n'.format(
+                len(body) if length is None else length).encode() + body
+
+    def testRoute(self):
+        (status, record), (late, error) = self.request(
+            self.post(self.ROUTE), self.post(dict(self.ROUTE, timeout=0)))
+        self.assertEqual(status, 200)
+        self.assertEqual(record['airports'], ['DUB', 'LHR', 'JFK'])
+        self.assertGreater(record['eco_route_cost'], 0)
+        self.assertEqual(late, 504)
+        self.assertIn('0', error['error'])
+
+    def testCoalescing(self):
+        body = json.dumps(self.ROUTE).encode('utf-8')
+        stats = dict(self.service._stats)
+
+        async def both():
+            return await asyncio.gather(self.service.route({}, body),
+                                        self.service.route({}, body))
+        first, second = asyncio.run(both())
+        self.assertEqual(first, second)
+        self.assertEqual(self.service._stats['routed'], stats['routed'] + 1)
+        self.assertEqual(self.service._stats['coalesced'],
+                         stats['coalesced'] + 1)
+
+    def testQueries(self):
+        get = 'GET {} HTTP/1.0\r\n\r\n'.format
+        (_, near), (_, typed), (_, names), (_, codes), (bad, _) = \
+            self.request(get('/nearest?lat=53.42&lon=-6.27&count=3').encode(),
+                         get('/nearest?lat=53.42&lon=-6.27&type=large_airport'
+                             ).encode(),
+                         get('/autocomplete?q=dubl&limit=5').encode(),
+                         get('/autocomplete?q=DU&by=code').encode(),
+                         get('/nearest?lat=north').encode())
+        self.assertEqual(near['airports'][0]['iata_code'], 'DUB')
+        self.assertEqual(len(near['airports']), 3)
+        distances = [airp['distance'] for airp in near['airports']]
+        self.assertEqual(distances, sorted(distances))
+        self.assertEqual(typed['airports'][0]['type'], 'large_airport')
+        self.assertTrue(names['airports'])
+        self.assertTrue(all(airp['name'].lower().startswith('dubl')
+                            for airp in names['airports']))
+        self.assertIn('DUB', [airp['iata_code'] for airp in codes['airports']])
+        self.assertEqual(bad, 400)
+
+    def testContentLength(self):
+        for length in ('-5', 'ten'):
+            (status, error), = self.request(self.post(self.ROUTE, length))
+            self.assertEqual(status, 400)
+        (status, _), = self.request(self.post(self.ROUTE, 1 << 20))
+        self.assertEqual(status, 413)
+
+class TestDataStore(unittest.TestCase):
+    '''Testing the journaled travel data storage.'''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'traveldata.csv')
+        shutil.copy(DATA_PATH, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def record(self, week):
+        return dict(zip(HEADERS, ('static', ['DUB', 'JFK'], week,
+                                  'Airbus A321', [0, 1, 0], 100.0,
+                                  [0, 1, 0], 50.0)))
+
+    def testJournal(self):
+        store = DataStore(self.path, compact_every=3)
+        base = len(store)
+        with open(self.path) as data:
+            before = data.read()
+        store.add(self.record('2020 Week 1'))
+        store.add(self.record('2020 Week 2'))
+        store.save()
+        with open(self.path) as data:
+            self.assertEqual(data.read(), before, 'Data file rewritten')
+        reloaded = DataStore(self.path)
+        self.assertEqual(len(reloaded), base + 2)
+        self.assertEqual(reloaded['2020 Week 2']['airports'], ['DUB', 'JFK'])
+        # third journal record triggers compaction
+        store.add(self.record('2020 Week 3'))
+        store.save()
+        self.assertFalse(os.path.exists(self.path + JOURNAL_EXT))
+        self.assertEqual(len(DataStore(self.path)), base + 3)
+        # crash recovery
+        store = DataStore(self.path)
+        store.add(self.record('2020 Week 11'))
+        store.add(self.record('2020 Week 12'))
+        store.save()
+        # a crash while appending leaves a partial last record
+        journal = self.path + JOURNAL_EXT
+        with open(journal, 'rb') as data:
+            content = data.read()
+        with open(journal, 'wb') as data:
+            data.write(content[:-20])
+        store = DataStore(self.path)
+        self.assertNotIn('2020 Week 12', store)
+        store.add(self.record('2020 Week 13'))
+        store.save()
+        reloaded = DataStore(self.path)
+        self.assertEqual(reloaded['2020 Week 11'], store['2020 Week 11'])
+        self.assertNotIn('2020 Week 12', reloaded)
+        self.assertEqual(reloaded['2020 Week 13']['eco_route_cost'], '50.0')
+        # a journal of a partial header only
+        with open(journal, 'w') as data:
+            data.write('mode,airp')
+        store = DataStore(self.path)
+        store.add(self.record('2020 Week 14'))
+        store.save()
+        self.assertIn('2020 Week 14', DataStore(self.path))
+
+    def testTypedRecords(self):
+        store = DataStore(self.path)
+        store.add(self.record('2021 Week 1'))
+        store.save()
+        recs = list(iter_records(self.path, week_from='2016 Week 20',
+                                 week_to='2021 Week 1'))
+        self.assertEqual([rec.travel_week for rec in recs],
+                         ['2016 Week 20', '2021 Week 1'])
+        self.assertEqual(recs[0].shortest_route, (0, 1, 2, 3, 4, 0))
+        self.assertIsInstance(recs[0].eco_route_cost, float)
+        self.assertEqual(recs[1].airports, ('DUB', 'JFK'))
+        self.assertEqual(recs[1].week, (2021, 1))
+
+    def testSQLite(self):
+        store = open_store(os.path.join(self.tmp, 'traveldata.db'))
+        self.assertIsInstance(store, SQLiteDataStore)
+        self.assertEqual(len(store), len(DataStore(self.path)))
+        store.add(self.record('2020 Week 1'))
+        store.add(self.record('2020 Week 12'))
+        store.close()
+        store = SQLiteDataStore(os.path.join(self.tmp, 'traveldata.db'),
+                                csv_path=self.path)
+        self.assertIn('2020 Week 12', store.keys())
+        self.assertEqual(store['2020 Week 1']['airports'], ['DUB', 'JFK'])
+        weeks = [rec['travel_week'] for rec in
+                 store.query(week_from='2016 Week 20', airports=['jfk'],
+                             aircraft='Airbus A321')]
+        self.assertEqual(weeks, ['2020 Week 1', '2020 Week 12'])
+
+    def testStoredResults(self):
+        datasets = Datasets()
+        router = datasets.route(parse_itinerary(
+            {'airports': 'DUB LHR CDG AMS JFK', 'aircraft': 'A321'}))
+        store = DataStore(self.path)
+        store.add_result('2020 Week 1', router.result(top=5), 'v1')
+        store.save()
+        result = DataStore(self.path).get_result('2020 Week 1', 'v1')
+        self.assertIsNone(DataStore(self.path).get_result('2020 Week 1', 'v2'))
+        stored = StoredRoute(router.airports, router.aircraft, result)
+        self.assertEqual(stored.route_count, len(router.possible_routes))
+        self.assertEqual(stored.opt_route, list(router.opt_route))
+        self.assertEqual(stored.eco_route_cost, router.eco_route_cost)
+        self.assertLessEqual(len(stored.possible_routes), 10)
+        self.assertIn(stored.eco_route, stored.possible_routes)
+        # results taken for a save stay visible until written
+        store.add_result('2020 Week 1', {'top': 1}, 'v2')
+        results = store._results.take()
+        self.assertEqual(store.get_result('2020 Week 1', 'v2'), {'top': 1})
+        store._results.compact(results)
+        store = DataStore(self.path)
+        self.assertEqual(store.get_result('2020 Week 1', 'v2'), {'top': 1})
+        self.assertIsNone(store.get_result('2020 Week 1', 'v1'))
+        # a crash while appending leaves a partial last line
+        results = self.path + RESULTS_EXT
+        store.add_result('2020 Week 2', {'top': 2}, 'v2')
+        store.save()
+        with open(results, 'rb') as data:
+            content = data.read()
+        with open(results, 'wb') as data:
+            data.write(content[:-3])
+        store = DataStore(self.path)
+        self.assertIsNone(store.get_result('2020 Week 2', 'v2'))
+        store.add_result('2020 Week 3', {'top': 3}, 'v2')
+        store.save()
+        store = DataStore(self.path)
+        self.assertEqual(store.get_result('2020 Week 1', 'v2'), {'top': 1})
+        self.assertEqual(store.get_result('2020 Week 3', 'v2'), {'top': 3})
+        # a damaged complete line is a miss, not an error
+        with open(results, 'ab') as data:
+            data.write(b'2020 Week 4\tv2\t{"top": \n')
+        self.assertIsNone(DataStore(self.path).get_result('2020 Week 4',
+                                                          'v2'))
+
+class TestGeometry(unittest.TestCase):
+    '''Testing the map geometry cache.'''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def testCache(self):
+        path = os.path.join(self.tmp, 'geometry.npz')
+        built = geometry.load_geometry(path)
+        self.assertTrue(os.path.exists(path))
+        cached = geometry.load_geometry(path)
+        self.assertTrue(geometry.geometry_path('l', path).endswith(
+            'geometry_l.npz'))
+        for layer in geometry.LAYERS:
+            self.assertEqual(len(built[layer]), len(cached[layer]))
+            self.assertEqual(cached[layer][0].shape[1], 2)
+        self.assertEqual(len(geometry.graticule([30, 60], [0])), 3)
+
+    def testGreatCircles(self):
+        # Tokyo to Los Angeles crosses the antimeridian
+        lines = great_circles([(53.4, -6.2), (35.5, 139.8)],
+                              [(35.5, 139.8), (33.9, -118.4)], step=50)
+        self.assertEqual([leg for leg, line in lines], [0, 1, 1])
+        first, second = lines[1][1], lines[2][1]
+        self.assertEqual((first[-1, 0], second[0, 0]), (180, -180))
+        self.assertAlmostEqual(first[-1, 1], second[0, 1])
+        self.assertTrue(np.allclose(lines[0][1][[0, -1]],
+                                    [(-6.2, 53.4), (139.8, 35.5)]))
+        # no vertex gap above the step on the leg
+        steps = distances(53.4, -6.2, lines[0][1][1:2, 1],
+                          lines[0][1][1:2, 0])
+        self.assertLessEqual(steps[0], 50)
+
+    def testRangeCircle(self):
+        lines = range_circle(53.4, -6.2, 3000)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(np.allclose(distances(53.4, -6.2, lines[0][:, 1],
+                                              lines[0][:, 0]), 3000))
+        # a circle around Auckland crosses the antimeridian twice
+        lines = range_circle(-37.0, 174.8, 1600)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(sorted(abs(line[-1, 0]) for line in lines[:2]),
+                         [180, 180])
+
+    def testTiles(self):
+        self.assertEqual(tiles.zoom_for(1.0), 0)
+        self.assertEqual(tiles.zoom_for(0.1), 3)
+        self.assertEqual(tiles.zoom_for(0.001), tiles.MAX_ZOOM)
+        self.assertEqual(tiles.tile_bounds(1, 3, 0), (90, -90, 180, 0))
+        self.assertEqual(tiles.visible_tiles(1, (-10, 100), (10, 20)),
+                         [(1, 1), (2, 1), (3, 1)])
+        self.assertEqual(len(tiles.visible_tiles(0, (-180, 180),
+                                                 (-90, 90))), 2)
+        path = os.path.join(self.tmp, 'geometry.npz')
+        cache = tiles.TileCache(self.tmp, renderer=tiles.TileRenderer(path))
+        self.assertFalse(cache.available)
+        image = cache.get(0, 0, 0)
+        self.assertEqual(image.shape, (256, 256, 4))
+        self.assertTrue(cache.available)
+        self.assertTrue(os.path.exists(cache.path(0, 0, 0)))
+        self.assertIs(cache.get(0, 0, 0), image)
+        self.assertEqual(tiles.TileCache(self.tmp).get(0, 0, 0).shape[:2],
+                         (256, 256))
+        self.assertIsNone(tiles.TileCache(self.tmp).get(0, 1, 0))
+        # levels past the built ones scale up the coarser tiles
+        built = tiles.TileCache(self.tmp)
+        self.assertEqual((built.max_zoom, cache.max_zoom), (0, 0))
+        self.assertEqual(tiles.TileCache(self.tmp, max_zoom=3).max_zoom, 3)
+        upscaled = built.get(2, 1, 0)
+        self.assertEqual(upscaled.shape[:2], (256, 256))
+        quarter = built.get(0, 0, 0)[192:, 64:128]
+        self.assertTrue((upscaled[::4, ::4] == quarter).all())
+        self.assertFalse(os.path.isdir(os.path.join(self.tmp, '2')))
+
+    def testRenderer(self):
+        renderer = MapRenderer(200, 100, geometry=os.path.join(
+            self.tmp, 'geometry.npz'))
+        blank = renderer.render().copy()
+        self.assertEqual(blank.shape, (100, 200, 4))
+        background = renderer._background
+        renderer.draw_routes([[(53.4, -6.2), (40.6, -73.8), (53.4, -6.2)]])
+        routed = renderer.render().copy()
+        # background is rendered once, routes are drawn over it
+        self.assertIs(renderer._background, background)
+        self.assertTrue((routed != blank).any())
+        renderer.clear_routes()
+        self.assertTrue((renderer.render() == blank).all())
+        path = os.path.join(self.tmp, 'map.png')
+        renderer.save(path)
+        self.assertTrue(os.path.exists(path))
+
+
+class TestPersistence(unittest.TestCase):
+    '''Testing background writes.'''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def testCoalescing(self):
+        done = []
+        writer = BackgroundWriter(delay=10)
+        for i in range(3):
+            writer.submit('data', done.append, i)
+        writer.submit('settings', done.append, 'settings')
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(done, [2, 'settings'])
+        writer.submit('data', done.append, 3)
+        writer.close()
+        self.assertEqual(done[-1], 3)
+        self.assertRaises(RuntimeError, writer.submit, 'data', done.append)
+
+    def testSettingsUpdate(self):
+        path = os.path.join(self.tmp, 'settings.ini')
+        sett = Settings(file_path=path)
+        self.assertFalse(sett.update(), 'Unchanged settings written')
+        sett.setSetting('auto_save', True)
+        self.assertTrue(sett.update(sett.dumps()))
+        self.assertEqual(Settings(file_path=path).getStr('auto_save'), 'True')
+        self.assertFalse(os.path.exists(path + '.tmp'))
+
+    def testTypedSettings(self):
+        sett = Settings(file_path=os.path.join(self.tmp, 'settings.ini'))
+        self.assertIs(sett.auto_save, False)
+        self.assertEqual(sett.splash_time, 2.0)
+        self.assertEqual(sett.map_colors[0], 'dodgerblue')
+        changes = []
+        sett.add_listener('disable_map', changes.append)
+        sett.disable_map = 'True'
+        sett.disable_map = True
+        self.assertIs(sett.disable_map, True)
+        self.assertEqual(sett.getStr('disable_map'), 'True')
+        self.assertEqual(changes, [True], 'Listener called for no change')
+        with self.assertRaises(ValueError):
+            sett.auto_save = 'maybe'
+        sett.setSettingList('map_colors', ['red', 'blue'], 'UI')
+        self.assertEqual(sett.map_colors, ('red', 'blue'))
+        # settings added later fall back to defaults in older files
+        sett._config.remove_option('SETTINGS', 'show_airports')
+        sett._cache.clear()
+        self.assertIs(sett.show_airports, False)
+        sett.show_airports = True
+        self.assertIs(sett.show_airports, True)
+
+
+class TestTiming(unittest.TestCase):
+    '''Testing startup timing spans and profiling.'''
+    def tearDown(self):
+        timing.enable(False)
+        timing.reset()
+
+    def testSpans(self):
+        with timing.span('off'):
+            pass
+        self.assertEqual(timing.spans(), [])
+        timing.enable()
+        with timing.span('startup'):
+            with timing.span('load data'):
+                time.sleep(.01)
+            timing.mark('shown')
+        (name, depth, start, sec), load, shown = timing.spans()
+        self.assertEqual((name, depth), ('startup', 0))
+        self.assertEqual(load[:2], ('load data', 1))
+        self.assertGreaterEqual(sec, load[3])
+        self.assertGreaterEqual(load[3], .01)
+        self.assertIsNone(shown[3])
+
+    def testProfile(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'routing.prof')
+            func = timing.profile_first(sorted, path)
+            self.assertEqual(func([2, 1]), [1, 2])
+            self.assertTrue(os.path.exists(path))
+            with open(path + '.txt') as summary:
+                self.assertIn('sorted', summary.read())
+        finally:
+            shutil.rmtree(tmp)
+
+
+class TestTrace(BasicTestSuite):
+    '''Testing the Chrome trace export.'''
+    def tearDown(self):
+        trace.stop()
+        timing.enable(False)
+        timing.reset()
+
+    def testTrace(self):
+        airports = [self.airportAtlas(code) for code in ('DUB', 'JFK', 'LHR')]
+        aircraft = self.aircrafts('777-300ER')
+        ComplexRoute(airports, aircraft, self.fuelMap, ROUTE_DYNAMIC)
+        self.assertFalse(trace.enabled())
+        self.assertEqual(trace.events(), [])
+        trace.start()
+        timing.enable()
+        with timing.span('route', 'ui', airports=3):
+            ComplexRoute(airports, aircraft, self.fuelMap, ROUTE_DYNAMIC)
+        writer = BackgroundWriter(delay=0)
+        writer.submit('data', timing.mark, 'saved', 'io')
+        writer.close()
+        # one set of spans, background threads are traced only
+        self.assertEqual([span[:2] for span in timing.spans()],
+                         [('route', 0), ('ComplexRoute', 1)])
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'trace.json')
+            trace.save(path)
+            with open(path) as data:
+                events = json.load(data)['traceEvents']
+        finally:
+            shutil.rmtree(tmp)
+        names = {event['args']['name'] for event in events
+                 if event['ph'] == 'M'}
+        self.assertEqual(names, {'MainThread', 'BackgroundWriter'})
+        route, = [event for event in events if event['name'] == 'ComplexRoute']
+        saved, = [event for event in events if event['name'] == 'saved']
+        outer, = [event for event in events if event['name'] == 'route']
+        self.assertEqual(route['ph'], 'X')
+        self.assertGreater(route['dur'], 0)
+        self.assertEqual(outer['args'], {'airports': 3})
+        self.assertLessEqual(outer['ts'], route['ts'])
+        self.assertEqual(saved['ph'], 'i')
+        self.assertNotEqual(route['tid'], saved['tid'])
+
+
+class TestBenchmarks(unittest.TestCase):
+    '''Testing the benchmark harness.'''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.registered = dict(harness.BENCHMARKS)
+        harness.benchmark('sum', sizes=(10, 100))(
+            lambda size: lambda: sum(range(size)))
+
+    def tearDown(self):
+        harness.BENCHMARKS.clear()
+        harness.BENCHMARKS.update(self.registered)
+        shutil.rmtree(self.tmp)
+
+    def testRun(self):
+        timing = harness.measure(lambda: None, repeat=3, min_time=.001)
+        self.assertGreater(timing['number'], 1)
+        self.assertLessEqual(timing['min'], timing['median'])
+        results = harness.run(['sum'], quick=True, repeat=2, min_time=.001)
+        self.assertEqual(list(results['results']), ['sum[10]'])
+        self.assertRaises(KeyError, harness.run, ['missing'])
+        path = os.path.join(self.tmp, 'baseline.json')
+        harness.save(results, path)
+        baseline = harness.load(path)
+        baseline['results']['sum[10]']['min'] *= 2
+        (key, base, now, change), = harness.compare(results, baseline)
+        self.assertEqual(key, 'sum[10]')
+        self.assertAlmostEqual(change, -50)
+
+    def testHeldKarp(self):
+        atlas = AirportAtlas(AIRPORT_PATH)
+        aircraft = Aircrafts(AIRCRAFT_PATH)('777-300ER')
+        fuelmap = FuelMap(FUEL_PATH)
+        (size, trial, codes), = scaling.itineraries(atlas, fuelmap, (6,))
+        airports = [atlas(code) for code in codes]
+        router = ComplexRoute(airports, aircraft, fuelmap, ROUTE_DYNAMIC)
+        distances = scaling.distance_matrix(airports)
+        dist, tour = scaling.held_karp(distances)
+        self.assertAlmostEqual(dist, router.opt_route_distance)
+        self.assertEqual(sorted(tour[1:]), list(range(6)))
+        costs = scaling.cost_matrix(airports, aircraft, fuelmap, distances)
+        once = scaling.held_karp(costs)[0]
+        cost, tour = scaling.held_karp(costs, revisit=True)
+        # return trips may only be cheaper than visiting airports once
+        self.assertLessEqual(cost, once)
+        self.assertAlmostEqual(router.eco_route_cost, cost)
+        self.assertTrue(scaling._checkExact(router.opt_route_distance,
+                                            router.eco_route_cost, dist,
+                                            cost))
+        self.assertIn(len(tour), (7, 8))
+        self.assertEqual(scaling.route_estimate(6, ROUTE_DYNAMIC),
+                         len(Route.specialPerms(list(range(5)))) + 120)
+
+
 if __name__ == '__main__':
     unittest.main()
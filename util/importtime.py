@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measures import time of modules in a clean interpreter using python's
+"-X importtime" switch. Usage:
+    python -m util.importtime data.router ctrl.app
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import subprocess
+import sys
+# packages that should never be loaded by headless code
+GUI_MODULES = ('tkinter', 'matplotlib', 'mpl_toolkits', 'PIL')
+
+
+def measure(module) -> list:
+    '''Imports a module in a fresh interpreter and returns import timings.
+
+    Args:
+        module (str): dotted module name. e.g. "data.router"
+    Returns:
+        list: (module name, self time, cumulative time) tuples in
+            microseconds, in the order imports finished. Interpreter
+            startup imports are left out.'''
+    proc = subprocess.run([sys.executable, '-X', 'importtime',
+                           '-c', 'import ' + module],
+                          stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    trees, current = [], []
+    for line in proc.stderr.splitlines():
+        # e.g. "import time:       123 |        456 |   data.aircraft"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        current.append((name.strip(), int(own), int(cumulative)))
+        # output is post order, a top level (not indented) import ends a tree
+        if not name[1:].startswith(' '):
+            trees.append(current)
+            current = []
+    # the requested module is the last top level import
+    return trees[-1] if trees else []
+
+
+def gui_modules(timings) -> list:
+    '''Returns the GUI packages found in import timings.
+
+    Args:
+        timings (list): output of measure().'''
+    return sorted({name.split('.')[0] for name, own, cum in timings
+                   if name.split('.')[0] in GUI_MODULES})
+
+
+def report(module, top=10):
+    '''Prints total import time of a module and its slowest imports.
+
+    Args:
+        module (str): dotted module name.
+        top (int): number of slowest imports to print.'''
+    timings = measure(module)
+    total = timings[-1][2] if timings else 0
+    print('{}: {:.1f} ms'.format(module, total / 1000))
+    for name, own, cum in sorted(timings, key=lambda t: -t[1])[:top]:
+        print('    {:>8.1f} ms self {:>8.1f} ms total  {}'.format(
+            own / 1000, cum / 1000, name))
+    gui = gui_modules(timings)
+    if gui:
+        print('    loads gui packages: ' + ', '.join(gui))
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or ['data.router']:
+        report(name)
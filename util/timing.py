@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Records named wall time spans, e.g. startup phases, and prints them as an
+indented summary. Spans are also the events of util.trace when tracing is
+on. Off by default, a span is a no-op context then.
+Also profiles blocks and calls with cProfile. Usage:
+    from util import timing
+    timing.enable()
+    with timing.span('load airports', 'io'):
+        ...
+    timing.report()
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from util import trace
+# lines of the text summary written next to profiles
+PROFILE_TOP = 40
+
+_enabled = False
+# [name, depth, start, seconds], in the order spans started
+_spans = []
+_depth = 0
+_origin = time.perf_counter()
+
+
+def enable(enabled=True):
+    '''Turns span recording on or off. The origin of span offsets is the
+    first import of this module, usually close to the program start.'''
+    global _enabled
+    _enabled = enabled
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _recording() -> bool:
+    '''Returns True if spans of this thread go to the report, nesting is
+    only tracked on the main thread.'''
+    return _enabled and threading.current_thread() is threading.main_thread()
+
+
+def _micros(when) -> float:
+    '''Microseconds since the origin, the time unit of trace events.'''
+    return (when - _origin) * 1e6
+
+
+def span(name, cat='app', **args):
+    '''Returns a context recording the time of its block, nested spans
+    are indented in the report. Only main thread spans are reported, all
+    threads are traced.
+
+    Args:
+        name (str): phase name, e.g. "load airports".
+        cat (str): trace category, e.g. "io", "routing" or "ui".
+        args: shown with the trace event in the viewer.'''
+    if _enabled or trace.enabled():
+        return _span(name, cat, args)
+    return nullcontext()
+
+
+@contextmanager
+def _span(name, cat, args):
+    global _depth
+    record = None
+    start = time.perf_counter()
+    if _recording():
+        record = [name, _depth, start, None]
+        _spans.append(record)
+        _depth += 1
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        if record is not None:
+            _depth -= 1
+            record[3] = end - start
+        trace.add(name, cat, 'X', _micros(start),
+                  dur=_micros(end) - _micros(start), args=args)
+
+
+def mark(name, cat='app', **args):
+    '''Records a moment, e.g. the window showing up.'''
+    now = time.perf_counter()
+    if _recording():
+        _spans.append([name, _depth, now, None])
+    trace.add(name, cat, 'i', _micros(now), s='t', args=args)
+
+
+def traced(name=None, cat='app'):
+    '''Decorator recording every call of a function as a span. Costs a
+    flag check while timing and tracing are off.
+
+    Args:
+        name (str): span name, the qualified function name if None.
+        cat (str): trace category, see span.'''
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled and not trace.enabled():
+                return func(*args, **kwargs)
+            with _span(label, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def spans() -> list:
+    '''Returns recorded spans as (name, depth, start offset, seconds)
+    tuples, seconds is None for marks and unfinished spans.'''
+    return [(name, depth, start - _origin, sec)
+            for name, depth, start, sec in _spans]
+
+
+def reset():
+    '''Forgets recorded spans.'''
+    global _depth
+    del _spans[:]
+    _depth = 0
+
+
+def report(file=sys.stderr, title='timings'):
+    '''Prints recorded spans with their start offsets and durations.'''
+    print('{} (ms since start, ms)'.format(title), file=file)
+    for name, depth, start, sec in spans():
+        print('{:>9.1f} {:>9} {}{}'.format(
+            start * 1000, '' if sec is None else '{:.1f}'.format(sec * 1000),
+            '  ' * depth, name), file=file)
+
+
+@contextmanager
+def profile(file_path, top=PROFILE_TOP):
+    '''Profiles a block with cProfile. Stats go to file_path, readable by
+    pstats or snakeviz, and the slowest calls by cumulative time to a
+    text file next to it.
+
+    Args:
+        file_path (str): stats file, e.g. "profile/startup.prof".
+        top (int): calls listed in the text summary.'''
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(file_path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats(
+            'cumulative').print_stats(top)
+        with open(file_path + '.txt', 'w', encoding='utf-8') as summary:
+            summary.write(text.getvalue())
+
+
+def profile_first(func, file_path):
+    '''Wraps a function so that its first call is profiled, see profile.'''
+    done = []
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if done:
+            return func(*args, **kwargs)
+        done.append(True)
+        with profile(file_path):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Opt-in timeline tracer writing the Chrome Trace Event JSON format, open
+the file in chrome://tracing or https://ui.perfetto.dev. Events are the
+spans and marks of util.timing, they carry the thread id so background
+work shows as its own track. Off by default, spans are a no-op context
+and traced functions a flag check then. Usage:
+    from util import timing, trace
+    trace.start()
+    with timing.span('load airports', 'io'):
+        ...
+    trace.save('trace.json')
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import json
+import os
+import threading
+from data.fileIO import IO
+
+# recorded events, None while tracing is off
+_events = None
+# thread id: thread name, of threads with events
+_threads = {}
+
+
+def start():
+    '''Starts recording, earlier events are dropped.'''
+    global _events
+    _threads.clear()
+    _events = []
+
+
+def stop() -> list:
+    '''Stops recording and returns the recorded events.'''
+    global _events
+    events, _events = _events, None
+    return events or []
+
+
+def enabled() -> bool:
+    return _events is not None
+
+
+def add(name, cat, phase, ts, **fields):
+    '''Records an event of the current thread, see util.timing.span.
+
+    Args:
+        name (str): event name, e.g. "DataStore.save".
+        cat (str): category, e.g. "io", "routing" or "ui".
+        phase (str): event type, "X" complete or "i" instant.
+        ts (float): microseconds since util.timing started.
+        fields: other event fields, e.g. dur and args.'''
+    events = _events
+    if events is None:
+        return
+    thread = threading.current_thread()
+    _threads[thread.ident] = thread.name
+    event = {'name': name, 'cat': cat, 'ph': phase, 'ts': ts,
+             'pid': os.getpid(), 'tid': thread.ident}
+    event.update(fields)
+    # list.append is atomic, threads need no lock
+    events.append(event)
+
+
+def events() -> list:
+    '''Returns recorded events with thread name metadata.'''
+    pid = os.getpid()
+    meta = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+             'args': {'name': name}} for tid, name in _threads.items()]
+    return meta + list(_events or [])
+
+
+def save(file_path):
+    '''Writes recorded events to a JSON trace file.'''
+    with IO.atomic_write(file_path, encoding='utf-8') as data:
+        json.dump({'traceEvents': events(), 'displayTimeUnit': 'ms'}, data)
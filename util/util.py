@@ -9,7 +9,6 @@ those classes.
 @author:Tirdad Kiafar
 """
 from math import pi, sin, cos, acos
-from tkinter import ttk
 
 
 def get_abs_pos(widget, level=-1) -> tuple:
@@ -55,6 +54,8 @@ def ttk_style(widget, color) -> str:
         color (str): background color to be applied. e.g. "#ffffff"
     Returns:
         str: style name created.'''
+    # imported here so non gui code can use util without loading tk
+    from tkinter import ttk
     style = ttk.Style()
     # on windows 8.1 with tcl/tk 8.6 this line generates error, anyway
     # as far as it gets excecuted is enough to change background color. From:
@@ -83,6 +84,7 @@ def ttk_tree_style(rowheight, widget):
     Args:
         rowheight (int): new row height. default is 20.
         widget (ttk.Treeview): widget to be changed.'''
+    from tkinter import ttk
     style = ttk.Style()
     style.configure('Custom.Treeview',
                     rowheight=rowheight)
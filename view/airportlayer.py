@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+airportlayer module shows every airport of an atlas on the map as one
+scatter collection. Airports are thinned per view with a grid: each cell
+of a few pixels shows its most important airport only, so large airports
+show first and smaller ones appear as the view narrows.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import numpy as np
+# airport types by importance, unknown types come last
+TYPES = ('large_airport', 'medium_airport', 'small_airport',
+         'seaplane_base', 'heliport', 'closed')
+# marker (size, color) of airport types
+TYPE_STYLES = {'large_airport': (24, 'navy'),
+               'medium_airport': (12, 'steelblue'),
+               'small_airport': (6, 'slategray')}
+OTHER_STYLE = (5, 'silver')
+# grid cell size in pixels, one airport per cell at most
+CELL_PIXELS = 14
+
+
+###############################################################################
+class AirportLayer:
+    '''Scatter of airports over map axes, thinned for the current view.
+    Built once, then filtered, toggled and updated per view.'''
+    def __init__(self, axes, airports, cell=CELL_PIXELS):
+        '''Constructor. Adds a hidden scatter to the axes.
+
+        Args:
+            axes (matplotlib.axes.Axes): lon/lat map axes.
+            airports (iterable): Airport objects.
+            cell (int): grid cell size in pixels.'''
+        self._axes = axes
+        self._cell = cell
+        self._airports = list(airports)
+        self._lats = np.array([airp.latitude for airp in self._airports])
+        self._lons = np.array([airp.longitude for airp in self._airports])
+        types = [airp.type for airp in self._airports]
+        self._types = np.array(types)
+        self._scheduled = np.array([airp.scheduled_service == 'yes'
+                                    for airp in self._airports])
+        # lower is more important, scheduled airports first within a type
+        rank = np.array([TYPES.index(kind) if kind in TYPES else len(TYPES)
+                         for kind in types])
+        self._rank = rank * 2 + ~self._scheduled
+        styles = [TYPE_STYLES.get(kind, OTHER_STYLE) for kind in types]
+        self._sizes = np.array([size for size, color in styles], float)
+        self._colors = [color for size, color in styles]
+        self._mask = np.ones(len(self._airports), dtype=bool)
+        # indexes of shown airports
+        self._shown = np.array([], dtype=np.int64)
+        self._scatter = axes.scatter([], [],
+                                     edgecolors='white',
+                                     linewidths=.3,
+                                     zorder=3.2)
+        self._scatter.set_visible(False)
+
+    @property
+    def visible(self) -> bool:
+        return self._scatter.get_visible()
+
+    @visible.setter
+    def visible(self, visible):
+        self._scatter.set_visible(visible)
+        if visible:
+            self.update()
+
+    @property
+    def shown(self) -> list:
+        '''Airport objects currently shown'''
+        return [self._airports[idx] for idx in self._shown]
+
+    def set_filter(self, types=None, scheduled=False):
+        '''Limits the layer to some airports.
+
+        Args:
+            types (iterable): airport types to show, e.g. "large_airport".
+                All types if None.
+            scheduled (bool): only airports with scheduled service.'''
+        mask = np.ones(len(self._airports), dtype=bool)
+        if types is not None:
+            mask &= np.isin(self._types, list(types))
+        if scheduled:
+            mask &= self._scheduled
+        self._mask = mask
+        self.update()
+
+    def update(self):
+        '''Picks the most important airport of every grid cell in view.
+        Cells are aligned to the world, so panning keeps the choice.'''
+        if not self.visible:
+            return
+        (west, east), (south, north) = self._axes.get_xlim(), \
+            self._axes.get_ylim()
+        size = self._cell * (east - west) / max(self._axes.bbox.width, 1)
+        rows = np.flatnonzero(self._mask &
+                              (self._lons >= west) & (self._lons <= east) &
+                              (self._lats >= south) & (self._lats <= north))
+        cols = np.floor((self._lons[rows] + 180) / size).astype(np.int64)
+        keys = np.floor((self._lats[rows] + 90) / size).astype(np.int64) * \
+            (int(360 / size) + 2) + cols
+        # by cell, then by importance; first of every cell wins
+        order = np.lexsort((self._rank[rows], keys))
+        keys = keys[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        # draw important airports last, on top
+        shown = rows[order[first]]
+        self._shown = shown[np.argsort(-self._rank[shown], kind='stable')]
+        self._scatter.set_offsets(np.column_stack(
+            (self._lons[self._shown], self._lats[self._shown])))
+        self._scatter.set_sizes(self._sizes[self._shown])
+        self._scatter.set_facecolor([self._colors[idx]
+                                     for idx in self._shown])
@@ -44,9 +44,10 @@ class MyEntry(ttk.Entry):
         self.bind('<FocusIn>', self.__FocusIn)
 
     def initAutoComplete(self, tag_list=('record', 'info'),
-                         record_list=(), info_list=(), default_text=''):
+                         record_list=(), info_list=(), default_text='',
+                         secColWidth=None):
         '''
-        Initializes auto completion.
+        Initializes auto completion. Could be called again to change it.
 
         Args:
             tag_list (tuple): a tuple of headers for records.
@@ -54,9 +55,12 @@ class MyEntry(ttk.Entry):
             info_list (tuple): a tuple of record info,
                 lenght must match record list.
             default_text (str): a helper string. shown when entry is empty.
+            secColWidth (int): Width of the second column, kept if None.
         '''
         self.delete(0, tk.END)  # clear text
         self.tag_list = tag_list
+        # reset info first, lenght is checked against the other list
+        self._info_list = ()
         self.record_list = record_list
         self.default_text = default_text
         # we dont set _info_list directly cuz
@@ -64,6 +68,12 @@ class MyEntry(ttk.Entry):
         self.__hits = []
         self.__hitIdx = 0
         __position = 0
+        if secColWidth is not None:
+            self.__secColWidth = secColWidth
+        # popup treeview is created once, refresh its headings
+        if self.__treeview:
+            self.__treeview.heading('data', text=self._tag_list[0])
+            self.__treeview.heading('info', text=self._tag_list[1])
         self.__set_default_text()
 
     # getter/Setters
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+geometry module caches world map geometry in a compact NumPy file.
+Basemap is only needed to build the cache, the map reads plain arrays.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import os
+import numpy as np
+from data.fileIO import IO
+GEOMETRY_PATH = r'./data/geometry.npz'
+# bump when the cached layers change
+GEOMETRY_VERSION = 2
+# cached layers, each is a list of (lon, lat) polylines
+LAYERS = ('coasts', 'countries')
+# coastline polygon type of land, others are lakes and islands in lakes
+LAND = 1
+
+
+def geometry_path(resolution, file_path=GEOMETRY_PATH) -> str:
+    '''Returns cache path of a Basemap resolution, e.g. geometry_l.npz'''
+    if resolution == 'c':
+        return file_path
+    root, ext = os.path.splitext(file_path)
+    return '{}_{}{}'.format(root, resolution, ext)
+
+
+def build_geometry(file_path=GEOMETRY_PATH, resolution='c') -> dict:
+    '''Extracts coastlines and country borders with Basemap and caches them.
+
+    Args:
+        file_path (str): path to cache file.
+        resolution (str): Basemap resolution, "c", "l" or "i".
+    Returns:
+        dict: layer name: list of Nx2 (lon, lat) arrays.'''
+    from mpl_toolkits.basemap import Basemap
+    from matplotlib.figure import Figure
+    axes = Figure().add_subplot(111)
+    bmap = Basemap(projection='cyl',
+                   llcrnrlat=-90,
+                   urcrnrlat=90,
+                   llcrnrlon=-180,
+                   urcrnrlon=180,
+                   resolution=resolution,
+                   ax=axes)
+    # coast lines without lakes
+    coasts = [np.column_stack(poly) for poly, kind in
+              zip(bmap.coastpolygons, bmap.coastpolygontypes) if kind == LAND]
+    layers = {'coasts': coasts,
+              'countries': bmap.drawcountries().get_segments()}
+    arrays = {'version': np.array(GEOMETRY_VERSION),
+              'resolution': np.array(resolution)}
+    for name, segments in layers.items():
+        # one vertex array per layer plus offsets of its polylines
+        arrays[name] = np.concatenate(segments).astype(np.float32)
+        arrays[name + '_index'] = np.cumsum([len(seg) for seg in
+                                             segments])[:-1]
+    try:
+        with IO.atomic_write(file_path, 'wb') as data:
+            np.savez_compressed(data, **arrays)
+    except OSError:
+        pass
+    return _split(arrays)
+
+
+def load_geometry(file_path=GEOMETRY_PATH, resolution='c') -> dict:
+    '''Returns cached map geometry, builds the cache if missing or outdated.
+
+    Args:
+        file_path (str): path to cache file.
+        resolution (str): Basemap resolution of the cache.
+    Returns:
+        dict: layer name: list of Nx2 (lon, lat) arrays.'''
+    try:
+        with np.load(file_path) as data:
+            if int(data['version']) == GEOMETRY_VERSION and \
+                    str(data['resolution']) == resolution:
+                return _split(data)
+    except (OSError, KeyError, ValueError):
+        pass
+    return build_geometry(file_path, resolution)
+
+
+def graticule(meridians, parallels) -> list:
+    '''Returns meridian and parallel lines of a lon/lat map.
+
+    Args:
+        meridians (iterable): longitudes of meridians.
+        parallels (iterable): latitudes of parallels.
+    Returns:
+        list: 2x2 (lon, lat) arrays.'''
+    lines = [np.array([(lon, -90), (lon, 90)], float) for lon in meridians]
+    lines += [np.array([(-180, lat), (180, lat)], float) for lat in parallels]
+    return lines
+
+
+def _split(arrays) -> dict:
+    return {name: np.split(arrays[name], arrays[name + '_index'])
+            for name in LAYERS}
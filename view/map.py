@@ -2,25 +2,34 @@
 # -*- coding: utf-8 -*-
 """
 Map Module provides map rendering with extra functionalities.
+The static background is rendered once and cached as a raster, routes are
+drawn on an overlay of animated artists that is blitted on top of it.
+Drawing itself is shared with headless rendering, see view.mapaxes.
+Scrolling zooms and dragging pans the map.
 @since:28/03/2016
 @author:Tirdad Kiafar
 """
-from mpl_toolkits.basemap import Basemap
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-import sys
 import tkinter as tk
 from tkinter import ttk
-# for loading the pictures
-from PIL import Image
-# for drawing pictures on map (our custom markers in this case)
-from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-from datetime import datetime
+from view.mapaxes import MapAxes
+from util import timing
+# hover events are handled at most once per interval (ms), ~60 per second
+HOVER_INTERVAL = 16
+# hover hit radius in pixels
+HOVER_RADIUS = 12
+# zoom factor of a scroll step
+ZOOM_STEP = 1.25
+# mouse travel in pixels that turns a click into a drag
+DRAG_PIXELS = 4
 
 
-class Map(ttk.Frame):
+class Map(ttk.Frame, MapAxes):
     '''A ttk frame of world map with lots of functionalities.'''
+    # the overlay is blitted over the cached background
+    _animated = True
+
     def __init__(self, master=None, **kwargs):
         '''Constructor. Adds basemap to the frame.
 
@@ -30,44 +39,30 @@ class Map(ttk.Frame):
         Keyword Args:
             fig_background (str): figure background. e.g. "white"
             callback (function): a callback function for clicking.
-                must have two arguments (lat, lon)'''
+                must have two arguments (lat, lon)
+            hover (function): called with (lat, lon, radius) while the
+                mouse moves, radius is the hit radius in degrees. Returns
+                (text, lat, lon) of a tooltip or None.
+            geometry (str): path to map geometry cache.
+            tiles (TileCache): raster background, used if available.'''
         # initialize super class
         ttk.Frame.__init__(self, master)
         # add figure to wrap map
         figure = Figure(figsize=(10, 5))
-        # add map container
-        self._axes = figure.add_subplot(111, frameon=False)
-        # create basemap object
-        self._map = Basemap(projection='cyl',
-                            llcrnrlat=-90,
-                            urcrnrlat=90,
-                            llcrnrlon=-180,
-                            urcrnrlon=180,
-                            resolution='c',
-                            ax=self._axes)
-        # draw line around conties
-        self._map.drawcountries(linewidth=0.3)
-        # draw coast lines
-        coasts = self._map.drawcoastlines(zorder=1, color='white', linewidth=0)
-        # remove rivers
-        coasts_paths = coasts.get_paths()
-        ipolygons = range(90)
-        for ipoly in range(len(coasts_paths)):
-            r = coasts_paths[ipoly]
-            # Convert into lon/lat vertices
-            polygon_vertices = [(vertex[0], vertex[1]) for (vertex, code) in
-                                r.iter_segments(simplify=False)]
-            px = [polygon_vertices[i][0] for i in range(len(polygon_vertices))]
-            py = [polygon_vertices[i][1] for i in range(len(polygon_vertices))]
-            if ipoly in ipolygons:
-                self._map.plot(px, py, linewidth=.3, zorder=3, color='black')
-        # draw meridians and parallels on map
-        self.__drawAxes()
+        # map axes, background layers and overlay
+        MapAxes.__init__(self, figure, **kwargs)
         # add canvas to the
         self.canvas = FigureCanvasTkAgg(figure, master=self)
-        # add click callback to canvas
+        # full renders show on traces, see util.trace
+        self.canvas.draw = timing.traced('Map draw', 'ui')(self.canvas.draw)
+        # add click callback to canvas, clicks are presses without drag
         self._callback = kwargs.get('callback')
-        figure.canvas.callbacks.connect('button_press_event', self._on_click)
+        self._press = None
+        self._dragged = False
+        figure.canvas.mpl_connect('button_press_event', self._on_press)
+        figure.canvas.mpl_connect('button_release_event', self._on_release)
+        figure.canvas.mpl_connect('scroll_event', self._on_scroll)
+        figure.canvas.mpl_connect('motion_notify_event', self._on_motion)
         # make the sub plot take as much space as possible
         figure.tight_layout()
         # set background color if present, else set transparent
@@ -75,67 +70,148 @@ class Map(ttk.Frame):
             figure.patch.set_facecolor(kwargs.get('fig_background'))
         else:
             figure.patch.set_alpha(0.0)  # transparent figure background
+        # overlay artists are drawn over the cached background
+        self._background = None
+        # hover tooltip, on top of the overlay
+        self._hover = kwargs.get('hover')
+        self._hover_pos = None
+        self._hover_job = None
+        self._hover_tip = None
+        self.__addTooltip()
+        # every full draw (first show, resize) renders the background only
+        # since overlay artists are animated, cache it and blit the overlay
+        figure.canvas.mpl_connect('draw_event', self._on_draw)
+        self._update_view()
         # showing canvas
-        self.canvas.show()
+        self.canvas.draw()
         # placing canvas
         self.canvas.get_tk_widget().pack(side=tk.BOTTOM,
                                          fill=tk.BOTH,
                                          expand=1)
-        self._artist = None
+
+    @timing.traced('Map._on_draw', 'ui')
+    def _on_draw(self, event):
+        '''Caches the freshly rendered background, then adds the overlay.'''
+        self._background = self.canvas.copy_from_bbox(self._axes.figure.bbox)
+        self.__draw_overlay()
+
+    def __draw_overlay(self):
+        for artist in self._overlay_artists() + self._tooltip:
+            self._axes.draw_artist(artist)
+
+    def __addTooltip(self):
+        '''Adds hidden tooltip artists: a ring and a label.'''
+        ring, = self._axes.plot([], [], 'o', markersize=9,
+                                markerfacecolor='none',
+                                markeredgecolor='red',
+                                zorder=6)
+        label = self._axes.annotate('', xy=(0, 0),
+                                    xytext=(8, 8),
+                                    textcoords='offset points',
+                                    fontsize=8,
+                                    zorder=6,
+                                    bbox=dict(boxstyle='round',
+                                              facecolor='lightyellow',
+                                              alpha=.9))
+        self._tooltip = [ring, label]
+        for artist in self._tooltip:
+            artist.set_animated(True)
+            artist.set_visible(False)
+
+    def _on_motion(self, event):
+        '''Pans while dragging, otherwise keeps the latest mouse position
+        for hover, handled once per interval.'''
+        if self._press is not None:
+            self.__drag(event)
+            return
+        if self._hover is None:
+            return
+        if event.inaxes is None:
+            self._hover_pos = None
+        else:
+            self._hover_pos = (event.ydata, event.xdata)
+        if self._hover_job is None:
+            self._hover_job = self.after(HOVER_INTERVAL, self.__hover)
+
+    def __hover(self):
+        '''Resolves the latest mouse position into a tooltip.'''
+        self._hover_job = None
+        tip = None
+        if self._hover_pos is not None:
+            # degrees covered by the hit radius at current zoom
+            radius = HOVER_RADIUS * self._degrees_per_pixel()
+            tip = self._hover(*self._hover_pos, radius)
+        self.show_tooltip(tip)
+
+    def show_tooltip(self, tip):
+        '''Shows a tooltip on the overlay, only blits if it changed.
+
+        Args:
+            tip (tuple): (text, lat, lon), None hides the tooltip.'''
+        if tip == self._hover_tip:
+            return
+        self._hover_tip = tip
+        ring, label = self._tooltip
+        if tip is not None:
+            text, lat, lon = tip
+            ring.set_data([lon], [lat])
+            label.xy = (lon, lat)
+            # keep the label inside the map on the right side
+            right = lon > sum(self._axes.get_xlim()) / 2
+            label.set_text(text)
+            label.set_horizontalalignment('right' if right else 'left')
+            label.set_position((-8 if right else 8, 8))
+        for artist in self._tooltip:
+            artist.set_visible(tip is not None)
+        self.refresh()
+
+    @timing.traced('Map.refresh', 'ui')
+    def refresh(self):
+        '''Shows overlay changes by blitting it over the cached background.
+        Call it once after a batch of draw_* calls.'''
+        if self._background is None:
+            # not rendered yet, a full draw caches the background
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self.__draw_overlay()
+        self.canvas.blit(self._axes.figure.bbox)
 
     def _on_click(self, event):
         if event.inaxes is not None:
             if self._callback is not None:
                 self._callback(event.ydata, event.xdata)
 
-    def __drawAxes(self):
-        '''Draws meridians and parallels on map, in both self._axes.'''
-        self._map.drawmeridians(np.arange(30, 331, 30), linewidth=0.3,)
-        self._map.drawparallels(np.arange(-60, 61, 30), linewidth=0.3)
+    def _on_press(self, event):
+        if event.inaxes is None or event.button != 1:
+            return
+        self._press = (event.x, event.y, self._axes.get_xlim(),
+                       self._axes.get_ylim())
+        self._dragged = False
 
-    def draw_geodesic(self, point1, point2, linewidth=2, color='b'):
-        '''draw geodesic route between two points.
+    def _on_release(self, event):
+        press, self._press = self._press, None
+        if press is not None and not self._dragged:
+            self._on_click(event)
 
-        Args:
-            point1 (tuple): latitude, longitude
-            point2 (tuple): latitude, longitude'''
-        lat1, lon1 = point1
-        lat2, lon2 = point2
-        self._map.drawgreatcircle(lon1, lat1,
-                                  lon2, lat2,
-                                  linewidth=linewidth,
-                                  color=color)
-
-    def draw_marker(self, markerImage, point):
-        '''draw marker image on specific point of map.
+    def __drag(self, event):
+        '''Pans the view along with the mouse.'''
+        x, y, xlim, ylim = self._press
+        dx, dy = event.x - x, event.y - y
+        if not self._dragged and abs(dx) + abs(dy) < DRAG_PIXELS:
+            return
+        self._dragged = True
+        scale = (xlim[1] - xlim[0]) / self._axes.bbox.width
+        self.set_view(xlim[0] - dx * scale, ylim[0] - dy * scale,
+                      xlim[1] - xlim[0])
 
-        Args:
-            markerImage (image): PIL image file of marker. use Image.open
-            point (tuple): (latitude, longitude) of insertion point.'''
-        lon, lat = point
-        # drawing picture on map
-        imheight = markerImage.size[1]
-        marker = np.array(markerImage)
-        im = OffsetImage(marker, zoom=1)
-        ab = AnnotationBbox(im,
-                            (lat, lon+imheight/4),
-                            xycoords='data',
-                            frameon=False)
-        self._artist = ab
-        self._axes.add_artist(ab)
-
-    def shadeNight(self, alpha=.1, dtime=None):
-        '''Shades night on map based on a given datetime.
+    def _on_scroll(self, event):
+        '''Zooms in or out around the mouse.'''
+        if event.inaxes is None:
+            return
+        self.zoom(1 / ZOOM_STEP if event.button == 'up' else ZOOM_STEP,
+                  event.ydata, event.xdata)
 
-        Args:
-            alpha (float): shading opacity. from 0 to 1.
-            dtime (datetime): specific date/time to shade map.'''
-        self._map.nightshade(dtime if dtime else datetime.utcnow(),
-                             alpha=alpha)
-
-    def clean_canvas(self):
-        '''Unfortunately I could not clear canvas, so this functions says if
-        something is drawn on map. then we dispose map and create another'''
-        if self._artist is not None:
-            return False
-        return True
+    def redraw(self):
+        '''Full draw of the background, overlay is blitted on draw event.'''
+        self.canvas.draw_idle()
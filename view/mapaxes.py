@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+mapaxes module draws the world map on matplotlib axes, without a GUI.
+Shared by the Tk map widget and the headless report renderer.
+Coastlines and borders come from the geometry cache and great circles
+are computed with NumPy, Basemap is only imported for night shade.
+With a tile pyramid (see view.tiles) the background is made of the
+visible raster tiles of the zoom level, otherwise of the vector geometry.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+from datetime import datetime
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.image import AxesImage
+from view.geometry import load_geometry, graticule, GEOMETRY_PATH
+from view.tiles import tile_bounds, visible_tiles, zoom_for
+from view.airportlayer import AirportLayer
+from data.geo import great_circles, range_circle
+# narrowest view in degrees
+MIN_SPAN = 2.0
+# geodesic vertices per pixel at most, and step limits in km
+GEODESIC_PIXELS = 4
+GEODESIC_STEP = (5.0, 100.0)
+# color of range boundary and reachable airports
+REACH_COLOR = 'tab:green'
+
+
+###############################################################################
+class MapAxes:
+    '''World map on a figure: background layers plus an overlay of routes
+    and markers. Overlay artists are listed in _overlay, subclasses decide
+    how they are shown, see add_overlay and refresh.'''
+    # True if overlay artists are drawn separately from the background
+    _animated = False
+
+    def __init__(self, figure, **kwargs):
+        '''Constructor. Adds map axes and background layers to a figure.
+
+        Args:
+            figure (matplotlib.figure.Figure): figure of the map.
+
+        Keyword Args:
+            geometry (str): path to map geometry cache.
+            tiles (TileCache): raster background, used if available.'''
+        # add map container
+        self._axes = figure.add_subplot(111, frameon=False)
+        # plain lon/lat axes, same as a cylindrical Basemap
+        self._axes.set_xlim(-180, 180)
+        self._axes.set_ylim(-90, 90)
+        self._axes.set_aspect('equal', anchor='C')
+        self._axes.set_xticks([])
+        self._axes.set_yticks([])
+        # basemap object, created on first need
+        self._bmap = None
+        # raster tiles of current view: (zoom, col, row): AxesImage
+        tiles = kwargs.get('tiles')
+        self._tiles = tiles if tiles is not None and tiles.available \
+            else None
+        self._tile_images = {}
+        # draw country borders and coast lines (without lakes and rivers)
+        geometry = load_geometry(kwargs.get('geometry', GEOMETRY_PATH))
+        self._vector = [
+            self._axes.add_collection(LineCollection(geometry['countries'],
+                                                     linewidths=.3,
+                                                     colors='black',
+                                                     zorder=2)),
+            self._axes.add_collection(LineCollection(geometry['coasts'],
+                                                     linewidths=.3,
+                                                     colors='black',
+                                                     zorder=3))]
+        # draw meridians and parallels on map
+        self.__drawAxes()
+        # tiles include the vector layers
+        for artist in self._vector:
+            artist.set_visible(self._tiles is None)
+        # geodesic collections and their legs, densified per view
+        self._geodesics = {}
+        # overlay artists, e.g. routes and markers
+        self._overlay = []
+        # range boundary and reachable airports, kept by clear_routes
+        self._reach = []
+        # every airport of the atlas, built on first show
+        self._airport_layer = None
+
+    @property
+    def _map(self):
+        '''Basemap of the axes, imported and created on first use.'''
+        if self._bmap is None:
+            from mpl_toolkits.basemap import Basemap
+            # no coastline resolution, geometry comes from the cache
+            self._bmap = Basemap(projection='cyl',
+                                 llcrnrlat=-90,
+                                 urcrnrlat=90,
+                                 llcrnrlon=-180,
+                                 urcrnrlon=180,
+                                 resolution=None,
+                                 ax=self._axes)
+        return self._bmap
+
+    def refresh(self):
+        '''Shows overlay changes. Call it once after a batch of draw_*
+        calls. Overlay is drawn along with the figure by default.'''
+
+    def redraw(self):
+        '''Shows background changes, e.g. a new view or airport layer.
+        Background is drawn along with the figure by default.'''
+
+    def add_overlay(self, *artists):
+        '''Adds artists to the overlay, see refresh.
+
+        Args:
+            artists (matplotlib.artist.Artist): artists already added to
+                the map axes.'''
+        for artist in artists:
+            artist.set_animated(self._animated)
+        self._overlay.extend(artists)
+
+    def _overlay_artists(self) -> list:
+        '''Returns every overlay artist in drawing order.'''
+        return self._reach + self._overlay
+
+    def clear_routes(self):
+        '''Removes every overlay artist, e.g. routes and markers.'''
+        for artist in self._overlay:
+            artist.remove()
+        self._overlay = []
+        self._geodesics = {}
+        self.refresh()
+
+    def zoom(self, factor, lat=0, lon=0):
+        '''Zooms the view keeping a position in place.
+
+        Args:
+            factor (float): view size multiplier, < 1 zooms in.
+            lat (float): latitude kept in place.
+            lon (float): longitude kept in place.'''
+        (west, east), (south, north) = self._axes.get_xlim(), \
+            self._axes.get_ylim()
+        width = min(max((east - west) * factor, MIN_SPAN), 360)
+        factor = width / (east - west)
+        self.set_view(lon - (lon - west) * factor,
+                      lat - (lat - south) * factor, width)
+
+    def reset_view(self):
+        '''Shows the whole world.'''
+        self.set_view(-180, -90, 360)
+
+    def set_view(self, west, south, width):
+        '''Moves the view, keeps it inside the world and 2:1 wide.
+
+        Args:
+            west (float): longitude of left edge.
+            south (float): latitude of bottom edge.
+            width (float): view width in degrees.'''
+        width = min(max(width, MIN_SPAN), 360)
+        height = width / 2
+        west = min(max(west, -180), 180 - width)
+        south = min(max(south, -90), 90 - height)
+        self._axes.set_xlim(west, west + width)
+        self._axes.set_ylim(south, south + height)
+        self._update_view()
+        self.redraw()
+
+    def _update_view(self):
+        '''Matches tiles, geodesics and airports to the current view and
+        size.'''
+        self.__update_tiles()
+        self.__update_geodesics()
+        if self._airport_layer is not None:
+            self._airport_layer.update()
+
+    def show_airports(self, airports=(), visible=True):
+        '''Shows or hides every airport as a background layer, thinned to
+        fit the view. The layer is built once, on first show.
+
+        Args:
+            airports (iterable): Airport objects, used on first show.
+            visible (bool): False hides the layer.'''
+        if self._airport_layer is None:
+            if not visible:
+                return
+            self._airport_layer = AirportLayer(self._axes, airports)
+        self._airport_layer.visible = visible
+        self.redraw()
+
+    def filter_airports(self, types=None, scheduled=False):
+        '''Limits the airport layer, see AirportLayer.set_filter'''
+        if self._airport_layer is None:
+            return
+        self._airport_layer.set_filter(types, scheduled)
+        self.redraw()
+
+    def _degrees_per_pixel(self) -> float:
+        xmin, xmax = self._axes.get_xlim()
+        return (xmax - xmin) / max(self._axes.bbox.width, 1)
+
+    def __update_tiles(self):
+        '''Shows the visible tiles of the zoom level matching the view.'''
+        if self._tiles is None:
+            return
+        zoom = zoom_for(self._degrees_per_pixel(), self._tiles.max_zoom)
+        wanted = {(zoom, col, row) for col, row in visible_tiles(
+            zoom, self._axes.get_xlim(), self._axes.get_ylim())}
+        for key in list(self._tile_images):
+            if key not in wanted:
+                self._tile_images.pop(key).remove()
+        for key in wanted.difference(self._tile_images):
+            image = self._tiles.get(*key)
+            if image is None:
+                continue
+            west, south, east, north = tile_bounds(*key)
+            artist = AxesImage(self._axes,
+                               extent=(west, east, south, north),
+                               origin='upper',
+                               zorder=1)
+            artist.set_data(image)
+            self._axes.add_image(artist)
+            self._tile_images[key] = artist
+
+    def __geodesic_step(self) -> float:
+        '''Returns geodesic vertex distance in km for current view.'''
+        step = self._degrees_per_pixel() * GEODESIC_PIXELS * 111.2
+        return min(max(step, GEODESIC_STEP[0]), GEODESIC_STEP[1])
+
+    def __update_geodesics(self):
+        '''Densifies geodesics again for the current view.'''
+        step = self.__geodesic_step()
+        for lines, (starts, ends, colors) in self._geodesics.items():
+            segments = great_circles(starts, ends, step)
+            lines.set_segments([line for leg, line in segments])
+            lines.set_color([colors[leg] for leg, line in segments])
+
+    def __drawAxes(self):
+        '''Draws meridians and parallels on map, in both self._axes.'''
+        # every 30 degrees, prime meridian excluded
+        meridians = [lon for lon in range(-180, 181, 30) if lon]
+        lines = graticule(meridians, range(-60, 61, 30))
+        self._axes.add_collection(LineCollection(lines,
+                                                 linewidths=.3,
+                                                 colors='k',
+                                                 linestyles=(0, (1, 1))))
+
+    def draw_routes(self, routes, colors=('b',), linewidth=2,
+                    marker_size=40):
+        '''Draws routes on the overlay: every leg as a densified great
+        circle in one LineCollection, every airport in one scatter.
+        Call refresh() to show them.
+
+        Args:
+            routes (list): routes, each a list of (latitude, longitude)
+                points in travel order.
+            colors (list): leg colors, n-th leg of a route gets the n-th
+                color, cycled.
+            linewidth (int): width of geodesics.
+            marker_size (int): area of airport markers.
+        Returns:
+            tuple: (LineCollection, PathCollection) added artists.'''
+        starts, ends, leg_colors, points, point_colors = [], [], [], [], []
+        for route in routes:
+            for i, point in enumerate(route):
+                color = colors[i % len(colors)]
+                # a tour ends where it starts, one marker is enough
+                if i == 0 or tuple(point) != tuple(route[0]):
+                    points.append(point)
+                    point_colors.append(color)
+                if i < len(route) - 1:
+                    starts.append(point)
+                    ends.append(route[i+1])
+                    leg_colors.append(color)
+        lines = self.__geodesics(starts, ends, leg_colors, linewidth)
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        markers = self._axes.scatter(points[:, 1], points[:, 0],
+                                     s=marker_size,
+                                     c=point_colors or None,
+                                     edgecolors='white',
+                                     linewidths=1,
+                                     zorder=5)
+        self.add_overlay(markers)
+        return lines, markers
+
+    def show_reach(self, lat=None, lon=None, radius=0, points=()):
+        '''Shows the range boundary around a position and highlights the
+        points within it, replacing the previous ones. Hidden if lat is
+        None. Call refresh() to show it.
+
+        Args:
+            lat (float): latitude of the center.
+            lon (float): longitude of the center.
+            radius (float): range in km.
+            points (list): (latitude, longitude) of reachable points.'''
+        if not self._reach:
+            boundary = LineCollection([], linewidths=1,
+                                      colors=REACH_COLOR,
+                                      linestyles='--',
+                                      zorder=3.5)
+            self._axes.add_collection(boundary)
+            hits = self._axes.scatter([], [], s=6,
+                                      c=REACH_COLOR,
+                                      linewidths=0,
+                                      zorder=3.5)
+            self._reach = [boundary, hits]
+            for artist in self._reach:
+                artist.set_animated(self._animated)
+        boundary, hits = self._reach
+        if lat is not None:
+            boundary.set_segments(range_circle(lat, lon, radius))
+            points = np.asarray(points, dtype=float).reshape(-1, 2)
+            hits.set_offsets(points[:, ::-1])
+        for artist in self._reach:
+            artist.set_visible(lat is not None)
+
+    def draw_geodesic(self, point1, point2, linewidth=2, color='b'):
+        '''draw geodesic route between two points.
+
+        Args:
+            point1 (tuple): latitude, longitude
+            point2 (tuple): latitude, longitude'''
+        self.__geodesics([point1], [point2], [color], linewidth)
+
+    def __geodesics(self, starts, ends, colors, linewidth):
+        '''Adds great circle legs to the overlay as one LineCollection.'''
+        lines = LineCollection([], linewidths=linewidth, zorder=4)
+        self._geodesics[lines] = (starts, ends, colors)
+        self.__update_geodesics()
+        self._axes.add_collection(lines)
+        self.add_overlay(lines)
+        return lines
+
+    def shadeNight(self, alpha=.1, dtime=None):
+        '''Shades night on map based on a given datetime.
+
+        Args:
+            alpha (float): shading opacity. from 0 to 1.
+            dtime (datetime): specific date/time to shade map.'''
+        # basemap resets the view to the whole world
+        xlim, ylim = self._axes.get_xlim(), self._axes.get_ylim()
+        shade = self._map.nightshade(dtime if dtime else datetime.utcnow(),
+                                     alpha=alpha)
+        self._axes.set_xlim(xlim)
+        self._axes.set_ylim(ylim)
+        self.add_overlay(shade)
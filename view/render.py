@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+render module draws route maps to images without a GUI, using Agg.
+The static background is rendered once per view and cached as a raster,
+every image restores it and only draws its own routes on top.
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from data.fileIO import IO
+from view.mapaxes import MapAxes
+# zlib level of png images, fast with little size penalty for flat maps
+PNG_COMPRESSION = 3
+
+
+###############################################################################
+class MapRenderer(MapAxes):
+    '''Headless world map. Draw routes with draw_routes, then save.'''
+    # animated artists are skipped by full draws of the background
+    _animated = True
+
+    def __init__(self, width=1000, height=500, dpi=100, **kwargs):
+        '''Constructor. Loads the map geometry.
+
+        Args:
+            width (int): image width in pixels.
+            height (int): image height in pixels.
+            dpi (int): pixels per inch, scales lines and text.
+
+        Keyword Args:
+            fig_background (str): image background, "white" by default.
+            geometry (str): path to map geometry cache.
+            tiles (TileCache): raster background, used if available.'''
+        figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(figure)
+        MapAxes.__init__(self, figure, **kwargs)
+        # no ticks or labels, let the map fill the image
+        figure.subplots_adjust(left=0, bottom=0, right=1, top=1)
+        figure.patch.set_facecolor(kwargs.get('fig_background', 'white'))
+        self._background = None
+        self._update_view()
+
+    def redraw(self):
+        '''Renders the background again on next render.'''
+        self._background = None
+
+    def add_title(self, text, fontsize=10):
+        '''Adds a caption to the upper left corner of the overlay.'''
+        title = self._axes.text(.01, .98, text,
+                                transform=self._axes.transAxes,
+                                fontsize=fontsize,
+                                verticalalignment='top',
+                                zorder=6,
+                                bbox=dict(boxstyle='round',
+                                          facecolor='white',
+                                          alpha=.8))
+        self.add_overlay(title)
+        return title
+
+    def render(self) -> np.ndarray:
+        '''Draws the overlay over the cached background.
+
+        Returns:
+            numpy.ndarray: height x width x 4 RGBA uint8 image, valid until
+                the next render.'''
+        bbox = self._axes.figure.bbox
+        if self._background is None:
+            self.canvas.draw()
+            self._background = self.canvas.copy_from_bbox(bbox)
+        else:
+            self.canvas.restore_region(self._background)
+        for artist in self._overlay_artists():
+            self._axes.draw_artist(artist)
+        return np.asarray(self.canvas.buffer_rgba())
+
+    def save(self, file_path):
+        '''Renders the map to a png file.
+
+        Args:
+            file_path (str): path to image file.'''
+        from matplotlib.image import imsave
+        image = self.render()
+        with IO.atomic_write(file_path, 'wb') as data:
+            imsave(data, image, format='png',
+                   pil_kwargs={'compress_level': PNG_COMPRESSION})
@@ -25,7 +25,7 @@ class SplashScreen:
                 untill "with" quits'''
         self.__root = root
         self.__file = file
-        self.__wait = wait + time.clock()
+        self.__wait = wait + time.perf_counter()
 
     def __enter__(self):
         # Hide the root while it is built.
@@ -59,7 +59,7 @@ class SplashScreen:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         # Ensure that required time has passed.
-        now = time.clock()
+        now = time.perf_counter()
         if now < self.__wait:
             time.sleep(self.__wait - now)
         # Free used resources in reverse order.
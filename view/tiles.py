@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+tiles module renders the world map as a pyramid of raster tiles.
+Zoom level z covers the lon/lat map with 2^(z+1) x 2^z square tiles of
+TILE_SIZE pixels, finer zoom levels use finer coastlines. Tiles are
+rendered offline and cached on disk, the map zooms up to the finest level
+built and scales up coarser tiles for missing ones. Usage:
+    python -m view.tiles --max-zoom 5 -j 4
+@since:19/10/2026
+@author:Tirdad Kiafar
+"""
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from data.fileIO import IO
+from view.geometry import load_geometry, geometry_path, graticule, \
+    GEOMETRY_PATH, LAYERS
+TILES_DIR = r'./data/tiles'
+TILE_SIZE = 256
+MAX_ZOOM = 5
+# coastline resolution of each zoom level
+RESOLUTIONS = ('c', 'c', 'l', 'l', 'i', 'i')
+# decoded tiles kept in memory
+MEMORY_TILES = 256
+
+
+def tile_span(zoom) -> float:
+    '''Returns the size of a tile in degrees.'''
+    return 180.0 / 2 ** zoom
+
+
+def tile_bounds(zoom, col, row) -> tuple:
+    '''Returns (west, south, east, north) of a tile in degrees.'''
+    span = tile_span(zoom)
+    west, south = -180 + col * span, -90 + row * span
+    return west, south, west + span, south + span
+
+
+def zoom_for(degrees_per_pixel, max_zoom=MAX_ZOOM) -> int:
+    '''Returns the coarsest zoom level sharp enough for a view.
+
+    Args:
+        degrees_per_pixel (float): view resolution.
+        max_zoom (int): finest zoom level available.'''
+    for zoom in range(max_zoom + 1):
+        if tile_span(zoom) / TILE_SIZE <= degrees_per_pixel:
+            return zoom
+    return max_zoom
+
+
+def visible_tiles(zoom, xlim, ylim) -> list:
+    '''Returns (col, row) of tiles intersecting a view.
+
+    Args:
+        zoom (int): zoom level.
+        xlim (tuple): (west, east) longitudes of the view.
+        ylim (tuple): (south, north) latitudes of the view.'''
+    span = tile_span(zoom)
+    cols, rows = 2 ** (zoom + 1), 2 ** zoom
+    col0 = max(int((xlim[0] + 180) // span), 0)
+    col1 = min(int(np.ceil((xlim[1] + 180) / span)), cols)
+    row0 = max(int((ylim[0] + 90) // span), 0)
+    row1 = min(int(np.ceil((ylim[1] + 90) / span)), rows)
+    return [(col, row) for row in range(row0, row1)
+            for col in range(col0, col1)]
+
+
+###############################################################################
+class TileRenderer:
+    '''Renders tiles with Agg out of the cached map geometry. Only the
+    polylines crossing a tile are drawn.'''
+    def __init__(self, geometry=GEOMETRY_PATH):
+        '''Constructor
+
+        Args:
+            geometry (str): path to geometry cache of resolution "c",
+                other resolutions are cached next to it.'''
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import LineCollection
+        self._geometry_path = geometry
+        # resolution: {layer: (polylines, Nx4 bounding boxes)}
+        self._layers = {}
+        figure = Figure(figsize=(1, 1), dpi=TILE_SIZE)
+        figure.patch.set_alpha(0.0)
+        self._canvas = FigureCanvasAgg(figure)
+        self._axes = figure.add_axes((0, 0, 1, 1), frameon=False)
+        self._axes.set_axis_off()
+        # same styles as Map vector layers
+        self._lines = {
+            'countries': LineCollection([], linewidths=.3, colors='black',
+                                        zorder=2),
+            'coasts': LineCollection([], linewidths=.3, colors='black',
+                                     zorder=3)}
+        for lines in self._lines.values():
+            self._axes.add_collection(lines)
+        meridians = [lon for lon in range(-180, 181, 30) if lon]
+        self._axes.add_collection(LineCollection(
+            graticule(meridians, range(-60, 61, 30)), linewidths=.3,
+            colors='k', linestyles=(0, (1, 1))))
+
+    def __layers(self, resolution) -> dict:
+        if resolution not in self._layers:
+            geometry = load_geometry(
+                geometry_path(resolution, self._geometry_path), resolution)
+            layers = {}
+            for name in LAYERS:
+                lines = geometry[name]
+                boxes = np.array([(line[:, 0].min(), line[:, 1].min(),
+                                   line[:, 0].max(), line[:, 1].max())
+                                  for line in lines])
+                layers[name] = (lines, boxes)
+            self._layers[resolution] = layers
+        return self._layers[resolution]
+
+    def render(self, zoom, col, row) -> np.ndarray:
+        '''Renders a tile.
+
+        Returns:
+            numpy.ndarray: TILE_SIZE x TILE_SIZE x 4 RGBA uint8 image.'''
+        resolution = RESOLUTIONS[min(zoom, len(RESOLUTIONS) - 1)]
+        west, south, east, north = tile_bounds(zoom, col, row)
+        for name, (lines, boxes) in self.__layers(resolution).items():
+            hits = np.flatnonzero((boxes[:, 0] <= east) &
+                                  (boxes[:, 2] >= west) &
+                                  (boxes[:, 1] <= north) &
+                                  (boxes[:, 3] >= south))
+            self._lines[name].set_segments([lines[i] for i in hits])
+        self._axes.set_xlim(west, east)
+        self._axes.set_ylim(south, north)
+        self._canvas.draw()
+        return np.array(self._canvas.buffer_rgba())
+
+
+###############################################################################
+class TileCache:
+    '''Tile pyramid on disk plus the last used tiles decoded in memory.'''
+    def __init__(self, directory=TILES_DIR, max_zoom=None,
+                 renderer=None):
+        '''Constructor
+
+        Args:
+            directory (str): tiles directory, tiles are z/col_row.png
+            max_zoom (int): finest zoom level, the finest level built on
+                disk if None.
+            renderer (TileRenderer): renders and stores missing tiles, for
+                offline use as it blocks for seconds. Without it missing
+                tiles are scaled up out of coarser levels.'''
+        self._directory = directory
+        self._max_zoom = max_zoom
+        self._renderer = renderer
+        self._memory = OrderedDict()
+
+    @property
+    def available(self) -> bool:
+        '''True if the pyramid was built, see build_pyramid'''
+        return os.path.isdir(os.path.join(self._directory, '0'))
+
+    @property
+    def max_zoom(self) -> int:
+        '''Returns the finest zoom level, -1 if none was built.'''
+        if self._max_zoom is not None:
+            return self._max_zoom
+        zoom = -1
+        while os.path.isdir(os.path.join(self._directory, str(zoom + 1))):
+            zoom += 1
+        return zoom
+
+    def path(self, zoom, col, row) -> str:
+        return os.path.join(self._directory, str(zoom),
+                            '{}_{}.png'.format(col, row))
+
+    def get(self, zoom, col, row):
+        '''Returns a tile image out of memory, disk or the renderer, else a
+        coarser tile scaled up.
+
+        Returns:
+            numpy.ndarray: RGBA image, None if missing.'''
+        key = (zoom, col, row)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        path = self.path(zoom, col, row)
+        if IO.exists(path):
+            from matplotlib.image import imread
+            image = imread(path)
+        elif self._renderer is not None:
+            image = self._renderer.render(zoom, col, row)
+            self.store(zoom, col, row, image)
+        else:
+            image = self.__upscale(zoom, col, row)
+            if image is None:
+                return None
+        self._memory[key] = image
+        if len(self._memory) > MEMORY_TILES:
+            self._memory.popitem(last=False)
+        return image
+
+    def __upscale(self, zoom, col, row):
+        '''Returns the quarter of the parent tile covering a tile, scaled
+        up twice. None at zoom level 0 or if the parent is missing.'''
+        if zoom == 0:
+            return None
+        parent = self.get(zoom - 1, col // 2, row // 2)
+        if parent is None:
+            return None
+        half = parent.shape[0] // 2
+        # images go from north to south, rows from south to north
+        top, left = (1 - row % 2) * half, col % 2 * half
+        quarter = parent[top:top + half, left:left + half]
+        return quarter.repeat(2, axis=0).repeat(2, axis=1)
+
+    def store(self, zoom, col, row, image):
+        '''Writes a tile image to disk.'''
+        from matplotlib.image import imsave
+        path = self.path(zoom, col, row)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with IO.atomic_write(path, 'wb') as data:
+                imsave(data, image, format='png')
+        except OSError:
+            pass
+
+
+# renderer of build worker processes
+_renderer = None
+
+
+def _render_tiles(directory, geometry, tiles) -> int:
+    '''Renders and stores a chunk of (zoom, col, row) tiles.'''
+    global _renderer
+    if _renderer is None:
+        _renderer = TileRenderer(geometry)
+    cache = TileCache(directory)
+    for zoom, col, row in tiles:
+        cache.store(zoom, col, row, _renderer.render(zoom, col, row))
+    return len(tiles)
+
+
+def build_pyramid(directory=TILES_DIR, max_zoom=MAX_ZOOM,
+                  geometry=GEOMETRY_PATH, jobs=None, chunk=32) -> int:
+    '''Renders every tile of zoom levels 0 to max_zoom.
+
+    Args:
+        directory (str): tiles directory.
+        max_zoom (int): finest zoom level.
+        geometry (str): path to geometry cache.
+        jobs (int): worker processes, None for one per cpu.
+        chunk (int): tiles rendered by a worker at once.
+    Returns:
+        int: number of tiles.'''
+    # build geometry caches once, before workers need them
+    for resolution in sorted(set(RESOLUTIONS[:max_zoom + 1])):
+        load_geometry(geometry_path(resolution, geometry), resolution)
+    tiles = [(zoom, col, row) for zoom in range(max_zoom + 1)
+             for row in range(2 ** zoom) for col in range(2 ** (zoom + 1))]
+    chunks = [tiles[i:i + chunk] for i in range(0, len(tiles), chunk)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_render_tiles, directory, geometry, part)
+                   for part in chunks]
+        return sum(future.result() for future in futures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=TILES_DIR)
+    parser.add_argument('--max-zoom', type=int, default=MAX_ZOOM)
+    parser.add_argument('--geometry', default=GEOMETRY_PATH)
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    count = build_pyramid(args.dir, args.max_zoom, args.geometry, args.jobs)
+    print('{} tiles in {:.1f}s'.format(count, time.perf_counter() - start),
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
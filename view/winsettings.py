@@ -19,7 +19,8 @@ class WinSettings(tk.Toplevel):
         Args:
             master (tkinter.widget): Parent of the window.
             defaults (dict): dictionary of default value. Must have these keys:
-                "airport_by_name","auto_save","disable_map"'''
+                "airport_by_name","auto_save","disable_map",
+                "first_airport","show_airports","scheduled_only"'''
         tk.Toplevel.__init__(self, master)
         # getting screen dimentions
         scrW = self.winfo_screenwidth()
@@ -58,6 +59,8 @@ class WinSettings(tk.Toplevel):
         self._varAutoSave = tk.StringVar()
         self._varDisableMap = tk.StringVar()
         self._varFirstAP = tk.StringVar()
+        self._varShowAirports = tk.StringVar()
+        self._varScheduled = tk.StringVar()
 
     def __addFrmAirports(self):
         # create a normal label to replace the labelFrame blue text widget
@@ -92,6 +95,17 @@ class WinSettings(tk.Toplevel):
                                                onvalue='True',
                                                offvalue='False',
                                                variable=self._varDisableMap)
+        self._chk_airports = ttk.Checkbutton(self,
+                                             text='Show All Airports on Map',
+                                             onvalue='True',
+                                             offvalue='False',
+                                             variable=self._varShowAirports)
+        tx = 'Only Airports with Scheduled Service'
+        self._chk_scheduled = ttk.Checkbutton(self,
+                                              text=tx,
+                                              onvalue='True',
+                                              offvalue='False',
+                                              variable=self._varScheduled)
 
     def __placeWidgets(self):
         '''Places widgets on window.'''
@@ -102,6 +116,9 @@ class WinSettings(tk.Toplevel):
         self._chk_firstAP.grid(row=2, column=0, padx=10, pady=5, stick='nesw')
         self._chk_disablemap.grid(row=3, column=0,
                                   padx=10, pady=5, stick='nesw')
+        self._chk_airports.grid(row=4, column=0, padx=10, pady=5, stick='nesw')
+        self._chk_scheduled.grid(row=5, column=0,
+                                 padx=10, pady=5, stick='nesw')
 
     def __setDefaults(self):
         '''Setting default (current) values.'''
@@ -109,6 +126,8 @@ class WinSettings(tk.Toplevel):
         self._varFirstAP.set(self._defaults['first_airport'])
         self._varAutoSave.set(self._defaults['auto_save'])
         self._varDisableMap.set(self._defaults['disable_map'])
+        self._varShowAirports.set(self._defaults['show_airports'])
+        self._varScheduled.set(self._defaults['scheduled_only'])
 
 
 ###############################################################################
@@ -117,7 +136,9 @@ def test():
     defaults = {'airport_by_name': 'True',
                 'auto_save': 'True',
                 'disable_map': 'False',
-                'first_airport': 'True'}
+                'first_airport': 'True',
+                'show_airports': 'False',
+                'scheduled_only': 'False'}
     win = WinSettings(root, defaults)
     root.mainloop()
 